@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk DOCX table writer against python-docx's add_row loop
+
+Usage: python benchmarks/bench_docx.py [--rows 1000,10000,100000]
+
+For each size, synthetic records are written to the Word export's detail
+table both ways and the resulting document XML is compared, so the run
+fails loudly if the two writers ever stop producing identical output.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from docx import Document
+from lxml import etree
+
+from docx_table import append_rows
+from export_data import doc_row
+from synthetic import synthetic_records
+
+HEADER = ['Destination Country', 'Date', 'Date Range End', 'Number Removed', 'Origin Nationalities', 'Notes']
+
+
+def new_table():
+    doc = Document()
+    table = doc.add_table(rows=1, cols=len(HEADER))
+    table.style = 'Medium Grid 1 Accent 1'
+    for cell, text in zip(table.rows[0].cells, HEADER):
+        cell.text = text
+    return doc, table
+
+
+def legacy_writer(rows):
+    """The old export_to_doc loop"""
+    doc, table = new_table()
+    for row in rows:
+        row_cells = table.add_row().cells
+        for cell, text in zip(row_cells, row):
+            cell.text = text
+    return doc
+
+
+def bulk_writer(rows):
+    doc, table = new_table()
+    append_rows(table, rows)
+    return doc
+
+
+def timed(writer, rows):
+    start = time.perf_counter()
+    doc = writer(rows)
+    return time.perf_counter() - start, doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help='Comma-separated table sizes')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'add_row ms':>11} {'bulk ms':>9} {'speedup':>8} {'rows/s':>11} {'identical':>10}")
+    for rows in [int(n) for n in args.rows.split(',')]:
+        table_rows = [doc_row(entry) for entry in synthetic_records(rows)]
+        legacy_time, legacy = timed(legacy_writer, table_rows)
+        bulk_time, bulk = timed(bulk_writer, table_rows)
+        identical = etree.tostring(legacy.element) == etree.tostring(bulk.element)
+        print(f"{rows:>8} {legacy_time * 1000:>11.1f} {bulk_time * 1000:>9.1f} {legacy_time / bulk_time:>7.1f}x "
+              f"{rows / bulk_time:>11.0f} {str(identical):>10}")
+        if not identical:
+            sys.exit(f"Bulk writer output differs from add_row at {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sentence-level extraction engine against the old whole-document regexes
+
+Usage: python benchmarks/bench_extraction.py [--sizes 2000,10000,200000] [--legacy-limit 20000]
+
+The legacy lazy-dot pattern is quadratic on the worst case, so it is only
+timed up to --legacy-limit characters (a 50k worst-case article takes
+about two minutes).
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from extraction import extract_counts
+
+LEGACY_PATTERNS = [
+    r'(\d+)\s+(?:people|migrants|individuals)\s+(?:to|sent to)\s+([A-Z][a-z]+)',
+    r'([A-Z][a-z]+).*?(\d+)\s+(?:people|migrants|individuals)',
+    r'sent\s+(\d+)\s+(?:people|migrants|individuals).*?to\s+([A-Z][a-z]+)'
+]
+
+WORDS = ['the', 'administration', 'deportation', 'flight', 'court', 'officials', 'said',
+         'Uganda', 'asylum', 'policy', 'Ghana', 'were', 'detained', 'in', 'camp', 'Rwanda']
+
+
+def legacy_extract(text):
+    """The pre-engine behaviour: three re.findall calls over the whole document"""
+    pairs = []
+    for pattern in LEGACY_PATTERNS:
+        for number, country in re.findall(pattern, text, re.IGNORECASE):
+            try:
+                pairs.append((int(number), country))
+            except ValueError:
+                continue
+    return pairs
+
+
+def synthetic_article(size, seed=0, worst_case=False):
+    """
+    Build an article of roughly `size` characters
+
+    The worst case has count mentions without a trailing "people" keyword,
+    which forces the lazy-dot pattern to try every start position.
+    """
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        if worst_case:
+            words.insert(rng.randint(0, len(words)), str(rng.randint(2, 300)))
+        elif rng.random() < 0.3:
+            words.insert(rng.randint(0, len(words)),
+                         f"{rng.randint(2, 300)} migrants to {rng.choice(['Ghana', 'Uganda', 'Rwanda'])}")
+        sentence = ' '.join(words).capitalize() + '.'
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)
+
+
+def time_call(func, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='2000,10000,200000',
+                        help='Comma-separated article sizes in characters')
+    parser.add_argument('--legacy-limit', type=int, default=20000,
+                        help='Largest worst-case article to run the legacy patterns on')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'case':>8} {'legacy ms':>12} {'engine ms':>12} {'speedup':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        for worst_case in (False, True):
+            text = synthetic_article(size, worst_case=worst_case)
+            engine = time_call(extract_counts, text, args.repeat)
+            label = 'worst' if worst_case else 'typical'
+            if worst_case and size > args.legacy_limit:
+                print(f"{size:>10} {label:>8} {'skipped':>12} {engine * 1000:>12.2f} {'-':>9}")
+                continue
+            legacy = time_call(legacy_extract, text, args.repeat)
+            print(f"{size:>10} {label:>8} {legacy * 1000:>12.2f} {engine * 1000:>12.2f} {legacy / engine:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized table ingestion against the old BeautifulSoup cell loop
+
+Usage: python benchmarks/bench_table_ingest.py [--rows 1000,10000,50000]
+
+Two synthetic pages are timed per size: an event-level table (one row per
+person removed, with departure country, date and citizenship columns) and
+a summary table of "Country: 123" cells, the only layout the old scraper
+could read.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from bs4 import BeautifulSoup
+
+from table_ingest import ingest_frame, read_html_tables
+
+COUNTRIES = ['Mexico', 'Guatemala', 'Honduras', 'El Salvador', 'Costa Rica', 'Panama',
+             'Eswatini', 'South Sudan', 'Rwanda', 'Ghana', 'Uganda', 'Uzbekistan']
+
+
+def legacy_ingest(html):
+    """The old scrape_deportation_data loop, minus the network fetch"""
+    soup = BeautifulSoup(html, 'html.parser')
+    records = []
+    for table in soup.find_all('table'):
+        for row in table.find_all('tr'):
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 3:
+                for text in [cell.get_text().strip() for cell in cells]:
+                    if ':' in text and any(char.isdigit() for char in text):
+                        parts = text.split(':')
+                        if len(parts) == 2:
+                            try:
+                                number = int(re.search(r'\d+', parts[1].strip()).group())
+                                records.append((parts[0].strip().upper(), number))
+                            except (ValueError, AttributeError):
+                                continue
+    return records
+
+
+def vectorized_ingest(html):
+    records = []
+    for frame in read_html_tables(html):
+        records.extend(ingest_frame(frame, 'Benchmark', 'http://localhost/'))
+    return records
+
+
+def event_table(rows, rng):
+    lines = ['<table><tr><th>Departure Country</th><th>Removal Date</th><th>Citizenship Country</th></tr>']
+    for _ in range(rows):
+        lines.append(f"<tr><td>{rng.choice(COUNTRIES)}</td><td>2025-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}</td>"
+                     f"<td>{rng.choice(COUNTRIES)}</td></tr>")
+    lines.append('</table>')
+    return '<html><body>' + ''.join(lines) + '</body></html>'
+
+
+def pair_table(rows, rng):
+    lines = ['<table><tr><th>Region</th><th>Q1</th><th>Q2</th></tr>']
+    for _ in range(rows):
+        lines.append(f"<tr><td>{rng.choice(COUNTRIES)}: {rng.randint(1, 500)}</td>"
+                     f"<td>{rng.choice(COUNTRIES)}: {rng.randint(1, 500)}</td><td>n/a</td></tr>")
+    lines.append('</table>')
+    return '<html><body>' + ''.join(lines) + '</body></html>'
+
+
+def timed(func, html):
+    start = time.perf_counter()
+    result = func(html)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,50000', help='Comma-separated table sizes')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'rows':>8} {'table':>7} {'legacy ms':>11} {'records':>8} {'vector ms':>11} {'records':>8} {'rows/s':>11}")
+    for rows in [int(n) for n in args.rows.split(',')]:
+        for label, builder in (('events', event_table), ('pairs', pair_table)):
+            html = builder(rows, rng)
+            legacy_time, legacy = timed(legacy_ingest, html)
+            vector_time, vector = timed(vectorized_ingest, html)
+            print(f"{rows:>8} {label:>7} {legacy_time * 1000:>11.1f} {len(legacy):>8} "
+                  f"{vector_time * 1000:>11.1f} {len(vector):>8} {rows / vector_time:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
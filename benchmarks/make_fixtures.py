@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Regenerate the saved HTML fixtures in benchmarks/fixtures from the dataset in data/removals
+
+Usage: python benchmarks/make_fixtures.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from synthetic import article_page, events_table_page, tracker_page
+
+from shards import load_records
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+ICE_STATISTICS_PAGE = '''<!DOCTYPE html><html><body>
+<section class="stats-overview"><h2>Enforcement and Removal Operations</h2>
+<div class="stat-block">ICE conducted 271,484 removals in FY2024, including 1,312 third-country removals.</div>
+<div class="stat-block">Deportation flights: 1,450 removal flights departed in FY2024.</div>
+</section></body></html>'''
+
+OHSS_PAGE = '''<!DOCTYPE html><html><body><h1>Immigration Enforcement Monthly Tables</h1><ul>
+<li><a href="ohss_removals_2025_09.csv">Removals by Citizenship, September 2025 (CSV)</a></li>
+</ul></body></html>'''
+
+OHSS_TABLE = '''Table 5. Removals by Country of Citizenship,,
+Country of Citizenship,Aug 2025,Sep 2025
+Mexico,"14,020","13,871"
+Guatemala,"3,415","3,502"
+Honduras,"2,890","2,744"
+El Salvador,"1,102",998
+Venezuela,412,D
+Total,"21,839","21,115"
+'''
+
+
+def main():
+    records = [record for record in load_records(os.path.join(ROOT, 'data', 'removals')) if record.get('date')]
+
+    # The dataset repeats the tracker's sections; keep the first copy of each
+    seen, unique = set(), []
+    for record in records:
+        if record['destination_country'] not in seen:
+            seen.add(record['destination_country'])
+            unique.append(record)
+
+    pages = {
+        'hard_g_history.html': tracker_page(unique),
+        'amnesty_usa.html': article_page(unique),
+        'deportation_data.html': events_table_page(unique),
+        'ice_statistics.html': ICE_STATISTICS_PAGE,
+        'dhs_ohss.html': OHSS_PAGE,
+        'ohss_removals_2025_09.csv': OHSS_TABLE,
+    }
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, content in pages.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"Wrote {os.path.join('benchmarks', 'fixtures', name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the scrapers, exporters and API routes
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # default sizes, compare to baselines
+    python benchmarks/run_benchmarks.py --sizes 100,1000000 --stages export_to_json,api_summary
+    python benchmarks/run_benchmarks.py --update-baselines  # record new baselines
+
+Scrapers are pointed at a local stand-in server that serves the saved pages
+in benchmarks/fixtures plus synthetic pages scaled to each size, so no run
+touches the network. Exporters and API routes run on synthetic datasets
+from benchmarks/synthetic.py inside a scratch directory.
+
+Each stage reports wall-clock latency, throughput in records per second
+and peak Python heap (tracemalloc, measured in a second, separate run so
+tracing does not distort the latency). Results are compared with
+benchmarks/baselines.json; anything slower or larger than the baseline by
+more than --tolerance is flagged as a regression. Baselines are machine
+specific, so refresh them on the machine that does the comparing.
+"""
+
+import argparse
+import functools
+import gc
+import http.server
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BENCH_DIR, '..', 'scripts')
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINES_FILE = os.path.join(BENCH_DIR, 'baselines.json')
+
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import article_page, events_table_page, synthetic_records, tracker_page
+
+from shards import DATASET_DIR, write_shards
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# Stages that are too slow to run at every size cap out here unless --no-caps is given
+SIZE_CAPS = {
+    'parse_date_range': 1000,
+    'scrape_hard_g_history': 1000,
+    'scrape_amnesty_usa': 10000,
+    'scrape_deportation_data': 100000,
+    'export_to_pdf': 10000,
+    'export_to_doc': 10000,
+}
+
+DATE_SAMPLES = ['Date(s): Sept. 5-6, 2025', 'Date(s): Sept. 30-Oct. 1, 2025', 'Date(s): July 4, 2025',
+                'Date(s): Oct. 7, 2025', 'Date(s): March 15-16, 2025', None]
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Serve a directory over HTTP on a free local port from a background thread"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        handler = functools.partial(QuietHandler, directory=directory)
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{name}"
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return self.url(name)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+
+
+def measure(run, records, memory=True, repeat=1):
+    """
+    Time run() (best of repeat calls), then optionally call it once more
+    under tracemalloc for the peak heap
+    """
+    latency = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        latency = elapsed if latency is None else min(latency, elapsed)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'latency_ms': round(latency * 1000, 3),
+        'throughput': round(records / latency, 1) if latency > 0 else None,
+        'peak_kb': round(peak / 1024, 1) if peak is not None else None,
+    }
+
+
+def write_dataset(records):
+    shutil.rmtree(DATASET_DIR, ignore_errors=True)
+    write_shards(records)
+
+
+def build_stages(server):
+    """
+    Return {stage name: setup(size) -> (run, records)}; a size of 'fixture'
+    runs a scraper on its saved page
+    """
+    from multi_source_scraper import MultiSourceScraper
+    import export_data
+    import api
+
+    scraper = MultiSourceScraper()
+
+    def scraper_stage(source, method, builder, fixture):
+        def setup(size):
+            if size == 'fixture':
+                url = server.url(fixture)
+            else:
+                url = server.write(f"{source}_{size}.html", builder(synthetic_records(size)))
+            scraper.sources[source]['url'] = url
+
+            def run():
+                # Without the section memo, so every run measures the extraction
+                shutil.rmtree('data/cache/sections', ignore_errors=True)
+                getattr(scraper, method)()
+            return run, size if size != 'fixture' else 1
+        return setup
+
+    def parse_dates(size):
+        samples = [DATE_SAMPLES[i % len(DATE_SAMPLES)] for i in range(size)]
+        return lambda: [scraper.parse_date_range(sample) for sample in samples], size
+
+    def scrape_ohss(size):
+        scraper.sources['dhs_ohss']['url'] = server.url('dhs_ohss.html')
+
+        def run():
+            # Cold cache every time, so the download and parse are measured
+            shutil.rmtree('data/cache', ignore_errors=True)
+            scraper.scrape_dhs_ohss()
+        return run, 1
+
+    def export_stage(function):
+        def setup(size):
+            data = synthetic_records(size)
+            return lambda: function(data, filename=f"exports/bench_{function.__name__}"), size
+        return setup
+
+    def api_stage(path):
+        def setup(size):
+            write_dataset(synthetic_records(size))
+            client = api.app.test_client()
+
+            def run():
+                response = client.get(path)
+                assert response.status_code == 200, response.status_code
+                response.get_data()
+
+            # Measure steady-state requests, not the first one that loads the file
+            run()
+            return run, size
+        return setup
+
+    return {
+        'parse_date_range': parse_dates,
+        'scrape_hard_g_history': scraper_stage('hard_g_history', 'scrape_hard_g_history',
+                                               tracker_page, 'hard_g_history.html'),
+        'scrape_amnesty_usa': scraper_stage('amnesty_usa', 'scrape_amnesty_usa',
+                                            article_page, 'amnesty_usa.html'),
+        'scrape_deportation_data': scraper_stage('deportation_data', 'scrape_deportation_data',
+                                                 events_table_page, 'deportation_data.html'),
+        'scrape_ice_statistics': scraper_stage('ice_statistics', 'scrape_ice_statistics',
+                                               None, 'ice_statistics.html'),
+        'scrape_dhs_ohss': scrape_ohss,
+        'export_to_json': export_stage(export_data.export_to_json),
+        'export_to_csv': export_stage(export_data.export_to_csv),
+        'export_to_md': export_stage(export_data.export_to_md),
+        'export_to_txt': export_stage(export_data.export_to_txt),
+        'export_to_pdf': export_stage(export_data.export_to_pdf),
+        'export_to_doc': export_stage(export_data.export_to_doc),
+        'api_removals': api_stage('/api/v1/removals'),
+        'api_ndjson': api_stage('/api/v1/removals.ndjson'),
+        'api_csv': api_stage('/api/v1/removals.csv'),
+        'api_summary': api_stage('/api/v1/removals/summary'),
+        'api_timeseries': api_stage('/api/v1/removals/timeseries?interval=week&group_by=country'),
+        'api_search': api_stage('/api/v1/removals/search?q=flight+detention+ghana'),
+        'api_country': api_stage('/api/v1/removals/country/ghana'),
+    }
+
+
+# Stages that only run on their saved fixture page
+FIXTURE_ONLY = {'scrape_ice_statistics', 'scrape_dhs_ohss'}
+# Scraper stages also run once on their saved fixture page
+WITH_FIXTURE = {'scrape_hard_g_history', 'scrape_amnesty_usa', 'scrape_deportation_data'}
+
+
+def stage_sizes(stage, sizes, caps):
+    if stage in FIXTURE_ONLY:
+        return ['fixture']
+    cap = SIZE_CAPS.get(stage) if caps else None
+    chosen = [size for size in sizes if cap is None or size <= cap]
+    return (['fixture'] if stage in WITH_FIXTURE else []) + chosen
+
+
+# Differences smaller than these are timer and allocator noise, whatever the ratio
+MIN_DELTA = {'latency_ms': 5.0, 'peak_kb': 64.0}
+
+
+def compare(result, baseline, tolerance):
+    """Return a list of human-readable regressions of result against baseline"""
+    regressions = []
+    for metric in ('latency_ms', 'peak_kb'):
+        current, previous = result.get(metric), baseline.get(metric)
+        if current is None or not previous:
+            continue
+        if current > previous * (1 + tolerance) and current - previous > MIN_DELTA[metric]:
+            regressions.append(f"{metric} {previous:g} -> {current:g} (+{(current / previous - 1) * 100:.0f}%)")
+    return regressions
+
+
+def load_baselines():
+    try:
+        with open(BASELINES_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite for scrapers, exporters and API routes')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated dataset sizes (records), e.g. 100,1000,10000,100000,1000000')
+    parser.add_argument('--stages', help='Comma-separated stage names (default: all)')
+    parser.add_argument('--no-caps', action='store_true', help='Run slow stages at every size')
+    parser.add_argument('--repeat', type=int, default=1, help='Keep the best latency of this many runs')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown or growth before a result counts as a regression')
+    parser.add_argument('--update-baselines', action='store_true', help='Store these results as the new baselines')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on any regression')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    baselines = load_baselines()
+    results = {}
+    regressions = []
+
+    workdir = tempfile.mkdtemp(prefix='removals-bench-')
+    served = os.path.join(workdir, 'served')
+    shutil.copytree(FIXTURES_DIR, served)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    try:
+        with StandInServer(served) as server:
+            stages = build_stages(server)
+            selected = args.stages.split(',') if args.stages else list(stages)
+
+            print(f"{'stage':<24} {'size':>8} {'latency ms':>12} {'records/s':>12} {'peak MB':>9}  vs baseline")
+            for stage in selected:
+                for size in stage_sizes(stage, sizes, not args.no_caps):
+                    run, records = stages[stage](size)
+                    try:
+                        result = measure(run, records, memory=not args.no_memory, repeat=args.repeat)
+                    except Exception as e:
+                        print(f"{stage:<24} {size:>8}  failed: {e}")
+                        continue
+
+                    results.setdefault(stage, {})[str(size)] = result
+                    found = compare(result, baselines.get(stage, {}).get(str(size), {}), args.tolerance)
+                    regressions.extend(f"{stage} @ {size}: {item}" for item in found)
+
+                    peak = f"{result['peak_kb'] / 1024:.1f}" if result['peak_kb'] is not None else '-'
+                    throughput = f"{result['throughput']:.0f}" if result['throughput'] else '-'
+                    status = 'REGRESSION' if found else ('ok' if str(size) in baselines.get(stage, {}) else 'new')
+                    print(f"{stage:<24} {size:>8} {result['latency_ms']:>12.1f} {throughput:>12} {peak:>9}  {status}")
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baselines:
+        for stage, by_size in results.items():
+            baselines.setdefault(stage, {}).update(by_size)
+        with open(BASELINES_FILE, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaselines updated in {os.path.relpath(BASELINES_FILE)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
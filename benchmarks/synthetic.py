@@ -0,0 +1,119 @@
+"""
+Synthetic removal records and source pages for the benchmarks
+
+Everything is generated from a seeded random.Random, so the same size and
+seed always produce the same data.
+"""
+
+import html
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from gazetteer import COUNTRIES
+
+DESTINATIONS = ['QATAR', 'GHANA', 'EGYPT', 'ESWATINI', 'SOUTH SUDAN', 'GUATEMALA', 'HONDURAS',
+                'UZBEKISTAN', 'RWANDA', 'BHUTAN', 'EL SALVADOR', 'COSTA RICA', 'PANAMA', 'MEXICO',
+                'UGANDA', 'KOSOVO', 'PARAGUAY', 'EQUATORIAL GUINEA']
+
+SOURCES = ['Hard G History', 'Amnesty USA', 'Deportation Data Project', 'DHS OHSS', 'ICE Statistics']
+
+FILLER = ('officials said the flight landed after a stop in detention and lawyers were not told '
+          'about the transfer until days later while families waited for news').split()
+
+MONTH_ABBREVIATIONS = ['Jan.', 'Feb.', 'March', 'April', 'May', 'June', 'July', 'Aug.', 'Sept.',
+                       'Oct.', 'Nov.', 'Dec.']
+
+
+def demonym(entry):
+    demonyms = entry[1]
+    return demonyms if isinstance(demonyms, str) else demonyms[0]
+
+
+def synthetic_records(count, seed=0):
+    """Return count removal records shaped like the records in data/removals/"""
+    rng = random.Random(seed)
+    start = date(2025, 1, 20)
+    records = []
+
+    for index in range(count):
+        day = start + timedelta(days=rng.randint(0, 300))
+        span = rng.choice([0, 0, 0, 1, 2, 6])
+        nationalities = sorted({demonym(rng.choice(COUNTRIES)) for _ in range(rng.randint(1, 3))})
+        number = rng.choice([None, rng.randint(1, 400)])
+        words = [rng.choice(FILLER) for _ in range(rng.randint(20, 60))]
+        notes = (f"Who: {number or 'Several'} {nationalities[0]}s. " + ' '.join(words).capitalize() + '.')
+
+        records.append({
+            "destination_country": rng.choice(DESTINATIONS),
+            "date": day.isoformat(),
+            "date_range_end": (day + timedelta(days=span)).isoformat() if span else None,
+            "number_removed": number,
+            "origin_nationalities": nationalities,
+            "source_urls": [f"https://example.org/report/{index}"],
+            "notes": notes,
+            "data_source": rng.choice(SOURCES),
+            "source_url": "https://example.org/",
+            "scraped_at": f"{day.isoformat()}T02:00:00"
+        })
+
+    return records
+
+
+def date_text(record):
+    """Render a record's dates the way the tracker writes them ('Sept. 5-6, 2025')"""
+    start = date.fromisoformat(record['date'])
+    month = MONTH_ABBREVIATIONS[start.month - 1]
+    if not record.get('date_range_end'):
+        return f"Date(s): {month} {start.day}, {start.year}"
+    end = date.fromisoformat(record['date_range_end'])
+    if end.month == start.month:
+        return f"Date(s): {month} {start.day}-{end.day}, {start.year}"
+    return f"Date(s): {month} {start.day}-{MONTH_ABBREVIATIONS[end.month - 1]} {end.day}, {start.year}"
+
+
+def tracker_page(records):
+    """A Hard G History style page with one h2 section per record"""
+    parts = ['<!DOCTYPE html><html><head><title>Tracking third-country removals</title></head><body>',
+             '<header><h2></h2><p>Subscribe</p></header><article class="gh-content">',
+             '<p>This is a running list of third-country removals.</p>']
+    for record in records:
+        parts.append(f"<h2>{html.escape(record['destination_country'])}</h2>")
+        if record.get('date'):
+            parts.append(f"<p>{html.escape(date_text(record))}</p>")
+        parts.append(f"<p>{html.escape(record['notes'])}</p>")
+        links = ' '.join(f'<a href="{url}">{url}</a>' for url in record.get('source_urls', []))
+        parts.append(f"<p>More: {links}</p>")
+    parts.append('</article></body></html>')
+    return '\n'.join(parts)
+
+
+def article_page(records, seed=0):
+    """An Amnesty USA style blog post mentioning removals in running text"""
+    rng = random.Random(seed)
+    sentences = []
+    for record in records:
+        country = record['destination_country'].title()
+        number = record['number_removed'] or rng.randint(2, 300)
+        sentences.append(rng.choice([
+            f"The administration sent {number} people on a chartered flight to {country}.",
+            f"At least {number} migrants to {country} were held without access to lawyers.",
+            f"In {country}, about {number} individuals remain in detention.",
+        ]))
+        sentences.append(' '.join(rng.choice(FILLER) for _ in range(rng.randint(10, 30))).capitalize() + '.')
+    body = ''.join(f"<p>{html.escape(' '.join(sentences[i:i + 4]))}</p>" for i in range(0, len(sentences), 4))
+    return f'<!DOCTYPE html><html><body><article>{body}</article></body></html>'
+
+
+def events_table_page(records):
+    """A deportationdata.org style page with an event-level table"""
+    rows = ''.join(
+        f"<tr><td>{html.escape(record['destination_country'].title())}</td><td>{record['date']}</td>"
+        f"<td>{html.escape(record['origin_nationalities'][0])}</td></tr>"
+        for record in records
+    )
+    return ('<!DOCTYPE html><html><body><table><thead><tr><th>Departure Country</th><th>Removal Date</th>'
+            f'<th>Citizenship Country</th></tr></thead><tbody>{rows}</tbody></table></body></html>')
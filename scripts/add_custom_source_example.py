@@ -3,7 +3,10 @@
 Example script showing how to add custom data sources to the multi-source scraper
 """
 
+from datetime import datetime
+
 from multi_source_scraper import MultiSourceScraper
+from gazetteer import GAZETTEER
 
 def example_custom_scraper():
     """
@@ -18,49 +21,58 @@ def example_custom_scraper():
         enabled=True
     )
 
-    # Example 2: Add a source with a custom scraper function
-    def custom_news_scraper():
+    # Example 2: Add an async scraper. It receives the runner's shared HTTP
+    # client, so the article fetches below run concurrently with each other
+    # and with every other source.
+    async def custom_news_scraper(client):
         """
         Custom scraper for a specific news website
         """
         try:
-            import requests
+            import asyncio
+            import re
+            from urllib.parse import urljoin
             from bs4 import BeautifulSoup
 
             url = "https://example-news.com/deportation-article"
-            response = requests.get(url, timeout=30)
+            response = await client.get(url)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
 
-            # Custom parsing logic for this specific site
-            articles = soup.find_all('article', class_='deportation-news')
+            # Follow every article link on the index page at once
+            article_urls = [urljoin(url, link['href']) for link in soup.select('a.deportation-news[href]')]
+            responses = await asyncio.gather(*(client.get(article_url) for article_url in article_urls),
+                                             return_exceptions=True)
 
             removals_data = []
 
-            for article in articles:
-                headline = article.find('h2').get_text() if article.find('h2') else ""
+            for article_url, article_response in zip(article_urls, responses):
+                if isinstance(article_response, Exception) or not article_response.ok:
+                    continue
+
+                article = BeautifulSoup(article_response.content, 'html.parser')
+                headline = article.find('h1').get_text() if article.find('h1') else ""
                 content = article.find('div', class_='content').get_text() if article.find('div', class_='content') else ""
 
                 # Extract deportation numbers and countries from content
-                import re
                 numbers = re.findall(r'\d+', content)
-                countries = re.findall(r'\b[A-Z][a-z]+\b', content)
+                countries = GAZETTEER.countries(content)
 
                 if numbers and countries:
                     for number in numbers:
                         if int(number) > 10:  # Filter small numbers
                             entry = {
-                                "destination_country": countries[0] if countries else "UNKNOWN",
+                                "destination_country": countries[0].upper(),
                                 "date": None,
                                 "date_range_end": None,
                                 "number_removed": int(number),
                                 "origin_nationalities": ["Various"],
-                                "source_urls": [url],
+                                "source_urls": [article_url],
                                 "notes": f"From article: {headline[:100]}...",
                                 "data_source": "Example News Source",
                                 "source_url": url,
-                                "scraped_at": "2025-10-07T15:48:50.581Z"  # Would use datetime.now().isoformat() in real implementation
+                                "scraped_at": datetime.now().isoformat()
                             }
                             removals_data.append(entry)
                             break  # Only add one entry per article
@@ -78,7 +90,38 @@ def example_custom_scraper():
         enabled=True
     )
 
-    # Example 3: Add government or NGO sources
+    # Example 3: Add a scraper that yields records as it finds them. The runner
+    # can merge each record without waiting for the whole feed to be read.
+    async def custom_feed_scraper(client):
+        """
+        Yield one record per item of a JSON feed
+        """
+        url = "https://example-news.com/removals.json"
+        response = await client.get(url)
+        response.raise_for_status()
+
+        for item in response.json():
+            yield {
+                "destination_country": item.get('country', 'UNKNOWN').upper(),
+                "date": item.get('date'),
+                "date_range_end": None,
+                "number_removed": item.get('count'),
+                "origin_nationalities": item.get('nationalities') or ["Various"],
+                "source_urls": [url],
+                "notes": item.get('summary', ''),
+                "data_source": "Example Feed",
+                "source_url": url,
+                "scraped_at": datetime.now().isoformat()
+            }
+
+    scraper.add_custom_source(
+        name="Example Feed",
+        url="https://example-news.com/removals.json",
+        scraper_function=custom_feed_scraper,
+        enabled=True
+    )
+
+    # Example 4: Add government or NGO sources
     scraper.add_custom_source(
         name="Human Rights Watch",
         url="https://www.hrw.org/topic/immigration/us-immigration",
@@ -1,58 +1,95 @@
-from flask import Flask, jsonify, request
-import json
-import os
+from flask import Flask, Response, g, jsonify, request
+import time
+
+import queries
+from dataset_store import DatasetStore, update_hit_ratio
+from metrics import CONTENT_TYPE, LATENCY, REGISTRY, REQUESTS, RESPONSE_SIZE
+from shards import DATASET_DIR, load_records
 
 app = Flask(__name__)
 
+store = DatasetStore(DATASET_DIR)
+
+def json_response(body):
+    """Response for an already rendered JSON body (see queries.cached)"""
+    return Response(body, mimetype='application/json')
+
 def load_removals_data():
-    """Load removals data from JSON file"""
-    try:
-        with open('data/removals.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Load removals data from the dataset shards"""
+    return load_records(DATASET_DIR)
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    # Label by route pattern, not the raw path, so /country/<country> is one series
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    LATENCY.observe(time.perf_counter() - start, route=route, method=request.method)
+    REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    if response.content_length is not None:
+        RESPONSE_SIZE.observe(response.content_length, route=route)
+    return response
 
 @app.route('/api/v1/removals')
 def get_all_removals():
     """Get all removal data with metadata"""
-    data = load_removals_data()
-    return jsonify({
-        "metadata": {
-            "total_entries": len(data),
-            "last_updated": os.path.getmtime('data/removals.json') if os.path.exists('data/removals.json') else None,
-            "version": "1.0"
-        },
-        "data": data
-    })
+    return json_response(queries.cached(store.get(), 'removals'))
+
+@app.route('/api/v1/removals.ndjson')
+def stream_ndjson():
+    """Stream all removal data as newline-delimited JSON"""
+    return Response(queries.iter_ndjson(store.get()), mimetype='application/x-ndjson')
+
+@app.route('/api/v1/removals.csv')
+def stream_csv():
+    """Stream all removal data as CSV"""
+    return Response(queries.iter_csv(store.get()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=third_nation_removals.csv'})
 
 @app.route('/api/v1/removals/summary')
 def get_summary():
     """Get summary statistics"""
-    data = load_removals_data()
+    return json_response(queries.cached(store.get(), 'summary'))
 
-    # Count by destination country
-    by_country = {}
-    total_people = 0
+@app.route('/api/v1/removals/timeseries')
+def get_timeseries():
+    """Get removals bucketed by day, week or month"""
+    try:
+        return json_response(queries.cached(store.get(), 'timeseries', request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    for entry in data:
-        country = entry.get('destination_country', 'Unknown')
-        by_country[country] = by_country.get(country, 0) + (entry.get('number_removed') or 0)
-        if entry.get('number_removed'):
-            total_people += entry['number_removed']
+@app.route('/api/v1/removals/search')
+def search_removals():
+    """Full-text search over notes and destination countries"""
+    try:
+        return json_response(queries.cached(store.get(), 'search', request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify({
-        "total_removals": len(data),
-        "total_people": total_people,
-        "by_destination_country": by_country,
-        "ongoing_programs": len([e for e in data if e.get('ongoing', False)])
-    })
+@app.route('/api/v1/removals/changes')
+def get_changes():
+    """Inserts and updates after a sequence number, for incremental sync"""
+    try:
+        return json_response(queries.cached(store.get(), 'changes', request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/v1/removals/country/<country>')
 def get_by_country(country):
     """Get removals by destination country"""
-    data = load_removals_data()
-    filtered = [e for e in data if e.get('destination_country', '').lower() == country.lower()]
-    return jsonify(filtered)
+    return json_response(queries.cached(store.get(), 'country', {'country': country}))
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics (of every worker, under serve.py)"""
+    update_hit_ratio()
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
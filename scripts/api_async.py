@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ASGI version of the API (Starlette + uvicorn)
+
+Usage:
+    python scripts/api_async.py --bind 0.0.0.0:8000 --reload-interval 5
+
+Serves the same routes as api.py, with the same response bodies. Request
+handlers never touch the data file: they read the store's current
+snapshot. A background task checks the file every few seconds and, when
+it changed, loads and indexes the new version in a worker thread while
+the event loop keeps answering requests from the old snapshot. The new
+snapshot replaces the old one with a single assignment, so no request
+sees a half-loaded dataset. Queries also run in worker threads: rendering
+a response the cache does not hold yet can serialize the whole dataset.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import queries
+from dataset_store import DatasetStore, update_hit_ratio
+from metrics import CONTENT_TYPE, LATENCY, REGISTRY, REQUESTS, RESPONSE_SIZE
+from shards import DATASET_DIR
+
+RELOAD_INTERVAL = 5.0
+
+store = DatasetStore(DATASET_DIR, auto_reload=False)
+
+
+class FlaskCompatibleJSONResponse(JSONResponse):
+    """JSON encoded the way Flask's jsonify does, so both APIs return identical bytes"""
+
+    def render(self, content):
+        return queries.render(content)
+
+
+def json_response(body):
+    """Response for an already rendered JSON body (see queries.cached)"""
+    return Response(body, media_type='application/json')
+
+
+async def cached(name, args=None):
+    """queries.cached on the current snapshot, off the event loop"""
+    return await asyncio.to_thread(queries.cached, store.get(), name, args)
+
+
+async def reload_when_changed(interval):
+    """Poll the data file and swap in a new snapshot, loaded off the event loop, when it changes"""
+    while True:
+        await asyncio.sleep(interval)
+        if not store.changed():
+            continue
+        try:
+            await asyncio.to_thread(store.reload)
+        except Exception as e:
+            print(f"Could not reload {store.path}: {e}")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load before accepting requests, then keep watching in the background
+    await asyncio.to_thread(store.reload)
+    task = asyncio.create_task(reload_when_changed(app.state.reload_interval))
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+async def get_all_removals(request):
+    """Get all removal data with metadata"""
+    return json_response(await cached('removals'))
+
+
+async def stream_ndjson(request):
+    """Stream all removal data as newline-delimited JSON"""
+    return StreamingResponse(queries.iter_ndjson(store.get()), media_type='application/x-ndjson')
+
+
+async def stream_csv(request):
+    """Stream all removal data as CSV"""
+    return StreamingResponse(queries.iter_csv(store.get()), media_type='text/csv',
+                             headers={'Content-Disposition': 'attachment; filename=third_nation_removals.csv'})
+
+
+async def get_summary(request):
+    """Get summary statistics"""
+    return json_response(await cached('summary'))
+
+
+async def get_timeseries(request):
+    """Get removals bucketed by day, week or month"""
+    try:
+        return json_response(await cached('timeseries', request.query_params))
+    except ValueError as e:
+        return FlaskCompatibleJSONResponse({"error": str(e)}, status_code=400)
+
+
+async def search_removals(request):
+    """Full-text search over notes and destination countries"""
+    try:
+        return json_response(await cached('search', request.query_params))
+    except ValueError as e:
+        return FlaskCompatibleJSONResponse({"error": str(e)}, status_code=400)
+
+
+async def get_changes(request):
+    """Inserts and updates after a sequence number, for incremental sync"""
+    try:
+        return json_response(await cached('changes', request.query_params))
+    except ValueError as e:
+        return FlaskCompatibleJSONResponse({"error": str(e)}, status_code=400)
+
+
+async def get_by_country(request):
+    """Get removals by destination country"""
+    return json_response(await cached('country', request.path_params))
+
+
+async def metrics(request):
+    """Prometheus metrics for this process"""
+    update_hit_ratio()
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the same request metrics as api.py's hooks"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {'status': 500, 'size': 0}
+
+        async def send_and_record(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            # The router stores the matched route in the scope; label by its pattern
+            route = scope.get('route')
+            route = route.path.replace('{', '<').replace('}', '>') if route is not None else 'unmatched'
+            LATENCY.observe(time.perf_counter() - start, route=route, method=scope['method'])
+            REQUESTS.inc(route=route, method=scope['method'], status=response['status'])
+            RESPONSE_SIZE.observe(response['size'], route=route)
+
+
+def create_app(reload_interval=RELOAD_INTERVAL):
+    app = Starlette(routes=[
+        Route('/api/v1/removals', get_all_removals),
+        Route('/api/v1/removals.ndjson', stream_ndjson),
+        Route('/api/v1/removals.csv', stream_csv),
+        Route('/api/v1/removals/summary', get_summary),
+        Route('/api/v1/removals/timeseries', get_timeseries),
+        Route('/api/v1/removals/search', search_removals),
+        Route('/api/v1/removals/changes', get_changes),
+        Route('/api/v1/removals/country/{country}', get_by_country),
+        Route('/metrics', metrics),
+    ], lifespan=lifespan)
+    app.state.reload_interval = reload_interval
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Serve the removals API with uvicorn')
+    parser.add_argument('--bind', default='0.0.0.0:8000')
+    parser.add_argument('--reload-interval', type=float, default=RELOAD_INTERVAL,
+                        help='Seconds between checks of the data file')
+    args = parser.parse_args()
+
+    host, port = args.bind.rsplit(':', 1)
+    uvicorn.run(create_app(args.reload_interval), host=host, port=int(port), access_log=False)
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Compact binary copy of the dataset and its indexes, for mmap
+
+Parsing the shards and building the indexes is most of an API process's
+startup time. The pipeline therefore also writes data/removals.snapshot,
+which the API maps with mmap instead (see dataset_store.py): nothing is
+parsed up front, records are decoded only when a response needs them,
+and every process that maps the file shares its pages through the page
+cache.
+
+The file is a header, a section table and 8-byte aligned sections of
+fixed-width arrays in native byte order:
+
+- a string table (offsets and one UTF-8 blob); every string, and every
+  list as JSON, is stored once
+- one column per field: a type tag (uint8) and a value (int64: a string
+  id, an integer, or a float's bits) per record; a layout per record
+  (uint16) lists its fields in their original order, so records decode
+  to exactly the dicts they were built from
+- prebuilt indexes: rows per destination country, the time series
+  rollups, and BM25 postings with each record's length normalisation
+
+A small JSON section holds the rest: column names, layouts, the summary
+and the SHA-256 of the dataset manifest the file was built from. A file
+built from another version of the dataset is ignored.
+
+    python scripts/binary_snapshot.py build
+    python scripts/binary_snapshot.py info
+"""
+
+import array
+import bisect
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from datetime import date
+
+from search_index import B, K1, record_terms, tokenize
+from shards import DATASET_DIR, load_records, manifest_path, partition
+from timeseries import TimeSeries
+
+BINARY_FILE = 'data/removals.snapshot'
+
+MAGIC = b'RMSNAP01'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<8sII')
+SECTION = struct.Struct('<16sQQ')
+
+# Value tags
+NONE, STRING, INTEGER, FLOAT, TRUE, FALSE, JSON = range(7)
+
+NO_GROUP = -1
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def manifest_digest(root=DATASET_DIR):
+    """SHA-256 of the dataset manifest, or None before the dataset is sharded"""
+    try:
+        with open(manifest_path(root), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def shard_order(records):
+    """The records in the order they are read back from the shards"""
+    return [record for _, shard_records in sorted(partition(records).items()) for record in shard_records]
+
+
+class StringTable:
+    """Interns strings while a file is built"""
+
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array.array('Q', [0])
+        self.blob = bytearray()
+
+    def add(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+            self.blob += text.encode('utf-8')
+            self.offsets.append(len(self.blob))
+        return string_id
+
+
+def float_bits(value):
+    return struct.unpack('<q', struct.pack('<d', value))[0]
+
+
+def bits_float(value):
+    return struct.unpack('<d', struct.pack('<q', value))[0]
+
+
+def encode_value(value, strings):
+    """(tag, int64 value) for one field value"""
+    if value is None:
+        return NONE, 0
+    if value is True:
+        return TRUE, 0
+    if value is False:
+        return FALSE, 0
+    if isinstance(value, str):
+        return STRING, strings.add(value)
+    if isinstance(value, int) and INT64_MIN <= value <= INT64_MAX:
+        return INTEGER, value
+    if isinstance(value, float):
+        return FLOAT, float_bits(value)
+    return JSON, strings.add(json.dumps(value))
+
+
+def build_sections(records, digest):
+    """Return [(section name, bytes)] for a list of records (in shard order)"""
+    count = len(records)
+    strings = StringTable()
+
+    columns, layouts, layout_ids = {}, [], {}
+    layout = array.array('H')
+    for record in records:
+        keys = tuple(record)
+        for key in keys:
+            columns.setdefault(key, len(columns))
+        layout_id = layout_ids.get(keys)
+        if layout_id is None:
+            layout_id = layout_ids[keys] = len(layouts)
+            layouts.append(list(keys))
+        layout.append(layout_id)
+
+    # Column-major: the value of column c for record i is at c * count + i
+    tags = bytearray(count * len(columns))
+    values = array.array('q', bytes(8 * count * len(columns)))
+    for index, record in enumerate(records):
+        for key, value in record.items():
+            position = columns[key] * count + index
+            tags[position], values[position] = encode_value(value, strings)
+
+    country_rows = {}
+    for index, record in enumerate(records):
+        country_rows.setdefault((record.get('destination_country') or '').lower(), []).append(index)
+    rows = array.array('I')
+    countries = {}
+    for country, indexes in country_rows.items():
+        countries[country] = [len(rows), len(rows) + len(indexes)]
+        rows.extend(indexes)
+
+    series = TimeSeries.build(records)
+    buckets, groups, events, people = array.array('q'), array.array('q'), array.array('q'), array.array('d')
+    tables = []
+    for (interval, grouping), table in series.tables.items():
+        start = len(buckets)
+        for bucket in sorted(table):
+            for group, (group_events, group_people) in table[bucket].items():
+                buckets.append(bucket.toordinal())
+                groups.append(NO_GROUP if group is None else strings.add(group))
+                events.append(group_events)
+                people.append(group_people)
+        tables.append([interval, grouping, start, len(buckets)])
+
+    # Postings in record order, as SearchIndex.build() adds them, so ties rank the same
+    postings, lengths = {}, array.array('I')
+    for index, record in enumerate(records):
+        terms = record_terms(record)
+        lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            postings.setdefault(term, []).append((index, frequency))
+    average_length = sum(lengths) / count if count else 0
+    average_length = average_length or 1
+    norms = array.array('d', (K1 * (1 - B + B * length / average_length) for length in lengths))
+    term_ids, term_offsets = array.array('Q'), array.array('Q', [0])
+    documents, frequencies = array.array('I'), array.array('I')
+    for term in sorted(postings):
+        term_ids.append(strings.add(term))
+        for index, frequency in postings[term]:
+            documents.append(index)
+            frequencies.append(frequency)
+        term_offsets.append(len(documents))
+
+    from dataset_store import build_summary
+    meta = {
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'dataset': digest,
+        'records': count,
+        'columns': list(columns),
+        'layouts': layouts,
+        'summary': build_summary(records),
+        'countries': countries,
+        'timeseries': tables,
+        'undated': series.undated,
+    }
+    return [
+        ('meta', json.dumps(meta).encode('utf-8')),
+        ('strings.offsets', strings.offsets.tobytes()),
+        ('strings', bytes(strings.blob)),
+        ('layout', layout.tobytes()),
+        ('tags', bytes(tags)),
+        ('values', values.tobytes()),
+        ('country.rows', rows.tobytes()),
+        ('ts.buckets', buckets.tobytes()),
+        ('ts.groups', groups.tobytes()),
+        ('ts.events', events.tobytes()),
+        ('ts.people', people.tobytes()),
+        ('search.terms', term_ids.tobytes()),
+        ('search.offsets', term_offsets.tobytes()),
+        ('search.docs', documents.tobytes()),
+        ('search.freqs', frequencies.tobytes()),
+        ('search.norms', norms.tobytes()),
+    ]
+
+
+def write_binary(records, path=BINARY_FILE, root=DATASET_DIR):
+    """
+    Write the binary snapshot of records, as stored in root; returns False if it was already current
+    """
+    digest = manifest_digest(root)
+    if digest is not None and read_digest(path) == digest:
+        return False
+    sections = build_sections(shard_order(records), digest)
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    table, padded = [], []
+    for name, content in sections:
+        offset += -offset % 8
+        table.append(SECTION.pack(name.encode('ascii'), offset, len(content)))
+        padded.append(content)
+        offset += len(content)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        f.write(b''.join(table))
+        for content in padded:
+            f.write(bytes(-f.tell() % 8))
+            f.write(content)
+    # Replacing (not rewriting) the file leaves processes that mapped the old one unaffected
+    os.replace(tmp_path, path)
+    return True
+
+
+class MappedFile:
+    """The sections of a mapped snapshot file, as memoryviews"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        magic, version, count = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} removals snapshot")
+        self.sections = {}
+        for index in range(count):
+            name, offset, length = SECTION.unpack_from(view, HEADER.size + index * SECTION.size)
+            self.sections[name.rstrip(b'\0').decode('ascii')] = view[offset:offset + length]
+        self.meta = json.loads(bytes(self.sections['meta']))
+        if self.meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {self.meta['byteorder']}-endian machine")
+
+    def array(self, name, typecode):
+        return self.sections[name].cast(typecode)
+
+
+def read_digest(path=BINARY_FILE):
+    """Manifest digest a snapshot file was built from (None if it is missing or unreadable)"""
+    try:
+        return MappedFile(path).meta['dataset']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class MappedStrings:
+    def __init__(self, mapped):
+        self.offsets = mapped.array('strings.offsets', 'Q')
+        self.blob = mapped.sections['strings']
+        self.cache = {}
+
+    def __getitem__(self, string_id):
+        text = self.cache.get(string_id)
+        if text is None:
+            text = self.cache[string_id] = str(self.blob[self.offsets[string_id]:self.offsets[string_id + 1]], 'utf-8')
+        return text
+
+
+class MappedRecords(Sequence):
+    """
+    The records of a snapshot file, decoded on first access; treat them as read-only
+
+    Behaves like the list of records in a JSON-loaded snapshot: indexing
+    returns a dict and slicing a list of dicts.
+    """
+
+    def __init__(self, mapped, strings):
+        meta = mapped.meta
+        self.count = meta['records']
+        self.strings = strings
+        self.tags = mapped.sections['tags']
+        self.values = mapped.array('values', 'q')
+        self.layout = mapped.array('layout', 'H')
+        columns = {name: index for index, name in enumerate(meta['columns'])}
+        self.layouts = [[(key, columns[key] * self.count) for key in keys] for keys in meta['layouts']]
+        self.decoded = [None] * self.count
+        self.json_values = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('record index out of range')
+        return self.record(index)
+
+    def __iter__(self):
+        return (self.record(i) for i in range(self.count))
+
+    def record(self, index):
+        record = self.decoded[index]
+        if record is None:
+            record = {}
+            for key, column in self.layouts[self.layout[index]]:
+                record[key] = self.value(self.tags[column + index], self.values[column + index])
+            self.decoded[index] = record
+        return record
+
+    def value(self, tag, value):
+        if tag == STRING:
+            return self.strings[value]
+        if tag == INTEGER:
+            return value
+        if tag == NONE:
+            return None
+        if tag == FLOAT:
+            return bits_float(value)
+        if tag == JSON:
+            # Decoded once per distinct value, like the string itself
+            decoded = self.json_values.get(value)
+            if decoded is None:
+                decoded = self.json_values[value] = json.loads(self.strings[value])
+            return decoded
+        return tag == TRUE
+
+
+class MappedCountries:
+    """Destination country (lower-cased) -> its records, like Snapshot.by_country"""
+
+    def __init__(self, mapped, records):
+        self.ranges = mapped.meta['countries']
+        self.rows = mapped.array('country.rows', 'I')
+        self.records = records
+
+    def get(self, country, default=None):
+        bounds = self.ranges.get(country)
+        if bounds is None:
+            return default
+        return [self.records[index] for index in self.rows[bounds[0]:bounds[1]]]
+
+    def __contains__(self, country):
+        return country in self.ranges
+
+    def __len__(self):
+        return len(self.ranges)
+
+
+class MappedTables(dict):
+    """TimeSeries.tables whose rollups are read from the file the first time they are queried"""
+
+    def __init__(self, mapped, strings):
+        super().__init__()
+        self.ranges = {(interval, grouping): (start, end) for interval, grouping, start, end in mapped.meta['timeseries']}
+        self.strings = strings
+        self.buckets = mapped.array('ts.buckets', 'q')
+        self.groups = mapped.array('ts.groups', 'q')
+        self.events = mapped.array('ts.events', 'q')
+        self.people = mapped.array('ts.people', 'd')
+
+    def __missing__(self, name):
+        start, end = self.ranges[name]
+        table = {}
+        for row in range(start, end):
+            group = self.groups[row]
+            groups = table.setdefault(date.fromordinal(self.buckets[row]), {})
+            groups[None if group == NO_GROUP else self.strings[group]] = (self.events[row], self.people[row])
+        self[name] = table
+        return table
+
+
+class MappedTerms(Sequence):
+    """The sorted search terms, for bisect"""
+
+    def __init__(self, ids, strings):
+        self.ids = ids
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.strings[self.ids[index]]
+
+
+class MappedSearchIndex:
+    """
+    SearchIndex.search() over the postings in the file
+
+    Scores are computed in the same order as a freshly built SearchIndex,
+    so results (and ties) come out the same.
+    """
+
+    def __init__(self, mapped, strings, records):
+        self.records = records
+        self.terms = MappedTerms(mapped.array('search.terms', 'Q'), strings)
+        self.offsets = mapped.array('search.offsets', 'Q')
+        self.documents = mapped.array('search.docs', 'I')
+        self.frequencies = mapped.array('search.freqs', 'I')
+        self.norms = mapped.array('search.norms', 'd')
+
+    def postings(self, term):
+        index = bisect.bisect_left(self.terms, term)
+        if index == len(self.terms) or self.terms[index] != term:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.documents[start:end], self.frequencies[start:end]), end - start
+
+    def search(self, query, limit=20):
+        terms = list(dict.fromkeys(tokenize(query)))
+        count = len(self.records)
+        if not terms or not count:
+            return 0, []
+
+        norms = self.norms
+        scores = {}
+        for term in terms:
+            found = self.postings(term)
+            if found is None:
+                continue
+            documents, matches = found
+            idf = math.log(1 + (count - matches + 0.5) / (matches + 0.5))
+            weight = idf * (K1 + 1)
+            get = scores.get
+            for doc_id, frequency in documents:
+                scores[doc_id] = get(doc_id, 0.0) + weight * frequency / (frequency + norms[doc_id])
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return len(scores), [(score, self.records[doc_id]) for doc_id, score in best]
+
+
+def load_binary(path=BINARY_FILE, root=DATASET_DIR):
+    """
+    Map a snapshot file; returns (records, by_country, summary, timeseries, search)
+
+    Returns None if the file is missing, unreadable, or was built from
+    another version of the dataset than the one in root.
+    """
+    digest = manifest_digest(root)
+    if digest is None:
+        return None
+    try:
+        mapped = MappedFile(path)
+    except (OSError, ValueError, KeyError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Ignoring {path}: {e}")
+        return None
+    if mapped.meta['dataset'] != digest:
+        return None
+
+    strings = MappedStrings(mapped)
+    records = MappedRecords(mapped, strings)
+    series = TimeSeries(MappedTables(mapped, strings), {}, mapped.meta['undated'])
+    return (records, MappedCountries(mapped, records), mapped.meta['summary'], series,
+            MappedSearchIndex(mapped, strings, records))
+
+
+def is_mapped(snapshot):
+    """True for a Snapshot loaded from a snapshot file (its indexes cannot be updated in place)"""
+    return isinstance(snapshot.records, MappedRecords)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build or inspect the binary dataset snapshot')
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('--path', default=BINARY_FILE)
+    parser.add_argument('--root', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if manifest_digest(args.root) is None:
+            sys.exit(f"{args.root} is not sharded yet; run python scripts/shards.py migrate first")
+        written = write_binary(load_records(args.root), args.path, args.root)
+        print(f"{'Wrote' if written else 'Already current:'} {args.path} ({os.path.getsize(args.path) / 1024:.1f} KB)")
+    else:
+        try:
+            mapped = MappedFile(args.path)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Could not read {args.path}: {e}")
+        current = mapped.meta['dataset'] == manifest_digest(args.root)
+        print(f"{args.path}: {mapped.meta['records']} records, {len(mapped.meta['columns'])} columns, "
+              f"{'current' if current else 'stale'}")
+        for name, view in mapped.sections.items():
+            print(f"  {name:<16} {len(view):>12} bytes")
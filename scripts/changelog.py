@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Append-only log of dataset changes, for clients that sync incrementally
+
+Every update that inserts a record, or replaces one whose normalized
+content changed, appends one JSON line per change to data/changes.jsonl:
+
+    {"seq": 42, "op": "insert", "key": [country, date, source], "record": {...}, "at": "..."}
+
+Sequence numbers only ever grow, so a client that remembers the last seq
+it applied asks /api/v1/removals/changes?since=<seq> for what it missed
+and upserts the records by key.
+
+The API keeps the log in memory as a ChangeLog and, when the file grows,
+only parses the lines appended since it last read it.
+
+Start a log for an existing dataset (one insert per record) with:
+
+    python scripts/changelog.py init
+"""
+
+import bisect
+import json
+import os
+from datetime import datetime
+
+from fingerprints import record_key
+
+CHANGES_FILE = 'data/changes.jsonl'
+
+INSERT = 'insert'
+UPDATE = 'update'
+
+
+def last_seq(path=CHANGES_FILE):
+    """Sequence number of the last change in the log (0 if empty or missing)"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            # Lines are short next to this; read back far enough to hold the last whole one
+            block = 65536
+            while True:
+                start = max(0, end - block)
+                f.seek(start)
+                lines = f.read().splitlines()
+                complete = [line for line in lines if line.strip()]
+                if len(complete) > 1 or start == 0:
+                    break
+                block *= 4
+    except FileNotFoundError:
+        return 0
+    return json.loads(complete[-1])['seq'] if complete else 0
+
+
+def append_changes(changes, path=CHANGES_FILE):
+    """
+    Append (op, record) changes to the log, numbering them after the last one
+
+    Returns the sequence number of the last change written.
+    """
+    seq = last_seq(path)
+    if not changes:
+        return seq
+    at = datetime.now().isoformat()
+    lines = []
+    for op, record in changes:
+        seq += 1
+        lines.append(json.dumps({'seq': seq, 'op': op, 'key': list(record_key(record)), 'record': record, 'at': at}))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        f.write('\n'.join(lines) + '\n')
+    return seq
+
+
+class ChangeLog:
+    """
+    The changes in the log file, in sequence order; treat instances as read-only
+
+    size is how many bytes of the file were parsed, so updated() can carry
+    on from there.
+    """
+
+    def __init__(self, seqs=None, changes=None, size=0):
+        self.seqs = seqs if seqs is not None else []
+        self.changes = changes if changes is not None else []
+        self.size = size
+
+    @property
+    def latest(self):
+        return self.seqs[-1] if self.seqs else 0
+
+    @classmethod
+    def load(cls, path=CHANGES_FILE):
+        return cls().updated(path)
+
+    def updated(self, path=CHANGES_FILE):
+        """
+        Return the log with the lines appended to path since this one was read
+
+        A file smaller than what was already read has been rewritten and is
+        parsed from the start; a half-written last line is left for later.
+        """
+        try:
+            file_size = os.path.getsize(path)
+        except OSError:
+            return ChangeLog()
+        if file_size == self.size:
+            return self
+
+        base = self if file_size > self.size else ChangeLog()
+        with open(path, 'rb') as f:
+            f.seek(base.size)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return base
+
+        seqs, changes = list(base.seqs), list(base.changes)
+        for line in data[:end].splitlines():
+            if line.strip():
+                change = json.loads(line)
+                seqs.append(change['seq'])
+                changes.append(change)
+        return ChangeLog(seqs, changes, base.size + end)
+
+    def since(self, seq, limit):
+        """The first limit changes with a sequence number above seq"""
+        start = bisect.bisect_right(self.seqs, seq)
+        return self.changes[start:start + limit]
+
+
+def init(records, path=CHANGES_FILE):
+    """Start an empty log with an insert for every record of the dataset"""
+    if last_seq(path):
+        print(f"{path} already has changes; leaving it as it is")
+        return 0
+    seq = append_changes([(INSERT, record) for record in records], path)
+    print(f"Recorded {seq} inserts in {path}")
+    return seq
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from shards import load_records
+
+    parser = argparse.ArgumentParser(description='Manage the dataset change log')
+    parser.add_argument('command', choices=['init'])
+    parser.add_argument('--path', default=CHANGES_FILE)
+    args = parser.parse_args()
+
+    init(load_records(), args.path)
@@ -0,0 +1,225 @@
+"""
+In-memory copy of the dataset shared by the API routes
+
+The dataset (the shards under data/removals, see shards.py) is read once
+into an immutable snapshot holding the records, an index by destination
+country and the summary statistics. Every call to DatasetStore.get()
+checks the manifest's modification time and size with one os.stat and
+only reloads when they changed, so requests between updates are served
+straight from memory. A reload only reads the shards whose hash changed,
+and the lines appended to the change log (see changelog.py).
+
+If the pipeline wrote a binary snapshot of the current dataset (see
+binary_snapshot.py), it is mapped instead of parsing the shards, so a
+process starts serving almost immediately and shares the file's pages
+with every other process that maps it.
+
+Reloads are single-flight: when the dataset changes under load, the first
+request to notice runs the one reload and the others keep being served
+the previous snapshot until it is ready (or, before the first load, wait
+for it). Each snapshot also carries a cache of rendered responses (see
+queries.cached), which it drops when it is replaced.
+"""
+
+import os
+import time
+from collections import namedtuple
+
+from binary_snapshot import BINARY_FILE, is_mapped, load_binary
+from changelog import CHANGES_FILE, ChangeLog
+from metrics import REGISTRY
+from search_index import SearchIndex
+from shards import DATASET_DIR, dataset_signature, load_manifest, load_records, load_shards
+from singleflight import ResponseCache, SingleFlight
+from timeseries import TimeSeries
+
+RELOADS = REGISTRY.counter('removals_dataset_reloads_total',
+                           'Times the dataset was (re)loaded, by whether it was mapped from the binary snapshot',
+                           ['mapped'])
+RELOAD_SECONDS = REGISTRY.histogram('removals_dataset_reload_duration_seconds', 'Time spent loading the dataset file')
+CACHE_LOOKUPS = REGISTRY.counter('removals_dataset_cache_lookups_total',
+                                 'Dataset lookups, by whether the in-memory snapshot was current (hit), '
+                                 'reloaded (miss), shared with a concurrent reload (shared) or served '
+                                 'while another request reloads (stale)',
+                                 ['result'])
+HIT_RATIO = REGISTRY.gauge('removals_dataset_cache_hit_ratio', 'Share of dataset lookups served from the in-memory snapshot')
+RECORDS = REGISTRY.gauge('removals_dataset_records', 'Records in the current dataset snapshot')
+QUERY_RESULTS = REGISTRY.counter('removals_query_cache_total',
+                                 'Query responses, by whether they were built (miss), served from the snapshot\'s '
+                                 'cache (hit) or shared with a concurrent identical request (shared)',
+                                 ['result'])
+
+# Rendered responses kept per snapshot (one per distinct query)
+RESPONSE_CACHE_SIZE = 256
+
+# records:    the list of records, in shard order (a read-only sequence when mapped)
+# by_country: lower-cased destination country -> list of its records (use .get())
+# summary:    the /summary response body
+# mtime:      modification time of the manifest the snapshot was loaded from (None if missing)
+# signature:  (mtime_ns, size) of the manifest, the change log and the binary snapshot, used to detect changes
+# timeseries: daily/weekly/monthly rollups (see timeseries.py)
+# search:     full-text index of notes and destinations (see search_index.py)
+# shards:     shard name -> (SHA-256, records) as loaded (empty before migration)
+# changes:    the change log (see changelog.py)
+# responses:  rendered response bodies by query (see queries.cached); the one mutable part
+Snapshot = namedtuple('Snapshot', ['records', 'by_country', 'summary', 'mtime', 'signature', 'timeseries', 'search',
+                                   'shards', 'changes', 'responses'])
+
+
+def update_hit_ratio():
+    """Refresh the hit ratio gauge from the lookup counters (called when metrics are rendered)"""
+    hits = CACHE_LOOKUPS.get(result='hit') + CACHE_LOOKUPS.get(result='stale')
+    misses = CACHE_LOOKUPS.get(result='miss') + CACHE_LOOKUPS.get(result='shared')
+    HIT_RATIO.set(hits / (hits + misses) if hits + misses else 0.0)
+
+
+def build_summary(records):
+    """Summary statistics for /api/v1/removals/summary"""
+    by_country = {}
+    total_people = 0
+
+    for entry in records:
+        country = entry.get('destination_country', 'Unknown')
+        by_country[country] = by_country.get(country, 0) + (entry.get('number_removed') or 0)
+        if entry.get('number_removed'):
+            total_people += entry['number_removed']
+
+    return {
+        "total_removals": len(records),
+        "total_people": total_people,
+        "by_destination_country": by_country,
+        "ongoing_programs": len([e for e in records if e.get('ongoing', False)])
+    }
+
+
+def build_snapshot(records, mtime=None, signature=None, previous=None, shards=None, changes=None):
+    """
+    Index a list of records into a Snapshot
+
+    With the previous snapshot, the rollups and the search index are
+    updated from its own rather than rebuilt.
+    """
+    by_country = {}
+    for entry in records:
+        by_country.setdefault((entry.get('destination_country') or '').lower(), []).append(entry)
+    if previous is not None:
+        timeseries = previous.timeseries.updated(records)
+        search = previous.search.updated(records)
+    else:
+        timeseries = TimeSeries.build(records)
+        search = SearchIndex.build(records)
+    return Snapshot(records, by_country, build_summary(records), mtime, signature, timeseries, search, shards or {},
+                    changes or ChangeLog(), ResponseCache(RESPONSE_CACHE_SIZE, QUERY_RESULTS))
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def store_signature(path, changes_path, binary_path=BINARY_FILE):
+    binary = file_signature(binary_path) if binary_path else None
+    return (dataset_signature(path), file_signature(changes_path), binary)
+
+
+def load_snapshot(path=DATASET_DIR, previous=None, changes_path=CHANGES_FILE, binary_path=BINARY_FILE):
+    """
+    Read and index the dataset; a missing or invalid dataset gives an empty snapshot
+
+    A binary snapshot of the current dataset is mapped rather than read.
+    Otherwise shards whose hash matches the previous snapshot's are reused
+    as they are. Only new lines of the change log are parsed.
+    """
+    signature = store_signature(path, changes_path, binary_path)
+    mtime = signature[0][0] / 1e9 if signature[0] else None
+    changes = previous.changes.updated(changes_path) if previous is not None else ChangeLog.load(changes_path)
+
+    mapped = load_binary(binary_path, path) if binary_path else None
+    if mapped is not None:
+        records, by_country, summary, timeseries, search = mapped
+        return Snapshot(records, by_country, summary, mtime, signature, timeseries, search, {}, changes,
+                        ResponseCache(RESPONSE_CACHE_SIZE, QUERY_RESULTS))
+
+    if previous is not None and is_mapped(previous):
+        # Mapped indexes cannot be updated in place; build them from scratch
+        previous = previous._replace(timeseries=TimeSeries(), search=SearchIndex())
+    if load_manifest(path) is None:
+        shards = {}
+        records = load_records(path)
+    else:
+        shards = load_shards(path, previous=previous.shards if previous is not None else None)
+        records = [record for _, shard_records in shards.values() for record in shard_records]
+    return build_snapshot(records, mtime, signature, previous, shards, changes)
+
+
+class DatasetStore:
+    """
+    Holds the current Snapshot of the dataset and replaces it when the dataset changes
+
+    Snapshots are never modified after they are built (apart from their
+    response cache), so a request keeps a consistent view even if a reload
+    happens while it is running. At most one reload runs at a time;
+    concurrent reload() calls share it.
+
+    With auto_reload=False the dataset is only read by the first get() and
+    by explicit reload() calls, for servers where something else watches
+    it (see serve.py).
+    """
+
+    def __init__(self, path=DATASET_DIR, auto_reload=True, changes_path=CHANGES_FILE, binary_path=BINARY_FILE):
+        self.path = path
+        self.changes_path = changes_path
+        self.binary_path = binary_path
+        self.auto_reload = auto_reload
+        self.snapshot = None
+        self.reloads = SingleFlight()
+
+    def is_current(self, snapshot):
+        return snapshot is not None and (not self.auto_reload or self.signature() == snapshot.signature)
+
+    def signature(self):
+        return store_signature(self.path, self.changes_path, self.binary_path)
+
+    def changed(self):
+        """Return True if the dataset differs from the one the current snapshot was loaded from"""
+        snapshot = self.snapshot
+        return snapshot is None or self.signature() != snapshot.signature
+
+    def get(self):
+        """Return the current snapshot, reloading the dataset first if it changed"""
+        snapshot = self.snapshot
+        if self.is_current(snapshot):
+            CACHE_LOOKUPS.inc(result='hit')
+            return snapshot
+
+        if snapshot is not None and self.reloads.in_flight('reload'):
+            # Another request is already loading the new version; don't queue behind it
+            CACHE_LOOKUPS.inc(result='stale')
+            return snapshot
+
+        snapshot, shared = self.reloads.do('reload', self.load_if_stale)
+        CACHE_LOOKUPS.inc(result='shared' if shared else 'miss')
+        return snapshot
+
+    def load_if_stale(self):
+        # The reload that just finished may already have loaded this version
+        snapshot = self.snapshot
+        if self.is_current(snapshot):
+            return snapshot
+        return self.load()
+
+    def reload(self):
+        """Load the dataset into a new snapshot and make it current, or join the reload already running"""
+        return self.reloads.do('reload', self.load)[0]
+
+    def load(self):
+        start = time.perf_counter()
+        snapshot = load_snapshot(self.path, self.snapshot, self.changes_path, self.binary_path)
+        RELOAD_SECONDS.observe(time.perf_counter() - start)
+        RELOADS.inc(mapped=str(is_mapped(snapshot)).lower())
+        RECORDS.set(len(snapshot.records))
+        self.snapshot = snapshot
+        return snapshot
@@ -0,0 +1,127 @@
+"""
+Content-addressed cache of export artifacts
+
+Each export is stored as exports/third_nation_removals_<key>.<ext>, where
+the key hashes the format, its exporter version and the fields of the
+records that exporter reads. Running the export again on unchanged data
+finds every key in exports/manifest.json and reuses the files instead of
+writing new ones, and a change to, say, source_urls only regenerates the
+formats that print source URLs.
+
+exports/third_nation_removals_latest.<ext> always holds the current
+artifact of each format, for links that should not change with the data.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+EXPORTS_DIR = 'exports'
+MANIFEST_FILE = os.path.join(EXPORTS_DIR, 'manifest.json')
+BASENAME = 'third_nation_removals'
+
+
+def input_hash(data, fields):
+    """
+    Hash of the given fields of every record, in order (fields=None: whole records)
+
+    A missing field and a field set to None hash differently, since
+    exporters that use entry.get(field, default) tell them apart.
+    """
+    digest = hashlib.sha256()
+    for record in data:
+        if fields is not None:
+            record = {field: record[field] for field in fields if field in record}
+        digest.update(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def artifact_key(format_name, version, digest):
+    return hashlib.sha256(f"{format_name}:{version}:{digest}".encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(filepath=MANIFEST_FILE):
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'formats': {}}
+
+
+def save_manifest(manifest, filepath=MANIFEST_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, filepath)
+
+
+def point_latest(path, latest_path):
+    """Make latest_path a copy of path (a hard link where possible), replacing it atomically"""
+    if os.path.exists(latest_path) and os.path.samefile(path, latest_path):
+        # Already linked; renaming a link onto its own file would leave the temporary link behind
+        return
+    tmp_path = latest_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(path, tmp_path)
+    except OSError:
+        shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, latest_path)
+
+
+def export_cached(data, exporters, force=False):
+    """
+    Export data with every (format name, extension, version, fields, function) in exporters
+
+    Formats whose key is already in the manifest, with the file still in
+    place, are reused; the others are written by their function to a
+    temporary name and moved into place. The artifact a format had before
+    is deleted once it is replaced. Formats that fail are reported and
+    left as they were. Returns [(format name, path, reused)].
+    """
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    manifest = load_manifest()
+    entries = manifest.setdefault('formats', {})
+    results = []
+
+    for format_name, extension, version, fields, export_func in exporters:
+        key = artifact_key(format_name, version, input_hash(data, fields))
+        path = os.path.join(EXPORTS_DIR, f"{BASENAME}_{key}.{extension}")
+        latest_path = os.path.join(EXPORTS_DIR, f"{BASENAME}_latest.{extension}")
+        previous = entries.get(format_name, {})
+
+        reused = not force and previous.get('key') == key and os.path.exists(path)
+        if not reused:
+            tmp_path = f"{path}.partial"
+            try:
+                if not export_func(data, tmp_path):
+                    continue
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"Error exporting to {format_name.upper()}: {e}")
+                continue
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            old_path = previous.get('file')
+            if old_path and old_path != path and os.path.exists(old_path):
+                os.remove(old_path)
+            entries[format_name] = {
+                'key': key,
+                'version': version,
+                'file': path,
+                'records': len(data),
+                'bytes': os.path.getsize(path),
+                'generated_at': datetime.now().isoformat()
+            }
+
+        point_latest(path, latest_path)
+        entries[format_name]['latest'] = latest_path
+        save_manifest(manifest)
+        results.append((format_name, path, reused))
+
+    return results
@@ -1,16 +1,15 @@
 import json
 import csv
+import importlib.util
 import pandas as pd
 from datetime import datetime
 import os
 
+from shards import load_records
+
 def load_removals_data():
-    """Load removals data from JSON file"""
-    try:
-        with open('data/removals.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Load removals data from the dataset shards"""
+    return load_records()
 
 def export_to_json(data, filename=None):
     """Export data to JSON format"""
@@ -23,6 +22,21 @@ def export_to_json(data, filename=None):
     
     return filename
 
+CSV_FIELDS = ['destination_country', 'date', 'date_range_end', 'number_removed',
+              'origin_nationalities', 'source_urls', 'notes']
+
+def flatten_entry(entry):
+    """Flatten one record into a CSV row (lists joined with ', ')"""
+    return {
+        'destination_country': entry.get('destination_country', ''),
+        'date': entry.get('date', ''),
+        'date_range_end': entry.get('date_range_end', ''),
+        'number_removed': entry.get('number_removed', ''),
+        'origin_nationalities': ', '.join(entry.get('origin_nationalities', [])),
+        'source_urls': ', '.join(entry.get('source_urls', [])),
+        'notes': entry.get('notes', '')
+    }
+
 def export_to_csv(data, filename=None):
     """Export data to CSV format"""
     if filename is None:
@@ -31,22 +45,11 @@ def export_to_csv(data, filename=None):
     os.makedirs('exports', exist_ok=True)
     
     # Flatten the data for CSV export
-    flattened_data = []
-    for entry in data:
-        flat_entry = {
-            'destination_country': entry.get('destination_country', ''),
-            'date': entry.get('date', ''),
-            'date_range_end': entry.get('date_range_end', ''),
-            'number_removed': entry.get('number_removed', ''),
-            'origin_nationalities': ', '.join(entry.get('origin_nationalities', [])),
-            'source_urls': ', '.join(entry.get('source_urls', [])),
-            'notes': entry.get('notes', '')
-        }
-        flattened_data.append(flat_entry)
+    flattened_data = [flatten_entry(entry) for entry in data]
     
     with open(filename, 'w', newline='') as f:
         if flattened_data:
-            writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
             writer.writeheader()
             writer.writerows(flattened_data)
     
@@ -168,145 +171,44 @@ def export_to_txt(data, filename=None):
     
     return filename
 
-def export_to_pdf(data, filename=None):
-    """Export data to PDF format"""
-    try:
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib import colors
-        from reportlab.lib.units import inch
-    except ImportError:
-        print("Error: reportlab is required for PDF export. Install with: pip install reportlab")
+def export_to_pdf(data, filename=None, max_workers=None):
+    """
+    Export data to PDF format
+
+    Every record is included; large datasets are rendered in chunks across
+    a process pool (see pdf_export.py).
+    """
+    # pdf_export imports them where they are used, in its worker processes; only check they are installed
+    if importlib.util.find_spec('reportlab') is None or importlib.util.find_spec('pypdf') is None:
+        print("Error: reportlab and pypdf are required for PDF export. Install with: pip install reportlab pypdf")
         return None
+    from pdf_export import render_pdf
     
     if filename is None:
         filename = f"exports/third_nation_removals_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
     os.makedirs('exports', exist_ok=True)
     
-    doc = SimpleDocTemplate(filename, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title = Paragraph("Third-Nation Removals Data", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    # Generation date
-    gen_date = Paragraph(f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
-    story.append(gen_date)
-    story.append(Spacer(1, 12))
-    
-    # Summary statistics
-    total_removals = len(data)
-    total_people = sum(entry.get('number_removed', 0) for entry in data if entry.get('number_removed'))
-    countries = list(set(entry.get('destination_country', '') for entry in data))
-    
-    summary_title = Paragraph("Summary", styles['Heading2'])
-    story.append(summary_title)
-    story.append(Spacer(1, 6))
-    
-    summary_data = [
-        ['Metric', 'Value'],
-        ['Total removal events', str(total_removals)],
-        ['Total people removed', str(total_people)],
-        ['Destination countries', str(len(countries))]
-    ]
-    
-    summary_table = Table(summary_data)
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(summary_table)
-    story.append(Spacer(1, 12))
-    
-    # Country breakdown
-    country_title = Paragraph("By Destination Country", styles['Heading2'])
-    story.append(country_title)
-    story.append(Spacer(1, 6))
-    
-    country_data = {}
-    for entry in data:
-        country = entry.get('destination_country', '')
-        if country not in country_data:
-            country_data[country] = {
-                'events': 0,
-                'people': 0
-            }
-        country_data[country]['events'] += 1
-        if entry.get('number_removed'):
-            country_data[country]['people'] += entry['number_removed']
-    
-    country_table_data = [['Country', 'Events', 'People Removed']]
-    for country, stats in sorted(country_data.items()):
-        country_table_data.append([country, str(stats['events']), str(stats['people'])])
-    
-    country_table = Table(country_table_data)
-    country_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(country_table)
-    story.append(Spacer(1, 12))
-    
-    # Detailed data (first 20 entries to keep PDF manageable)
-    detailed_title = Paragraph("Detailed Data (First 20 Entries)", styles['Heading2'])
-    story.append(detailed_title)
-    story.append(Spacer(1, 6))
-    
-    detailed_table_data = [
-        ['Country', 'Date', 'Number', 'Nationalities', 'Notes (Truncated)']
+    return render_pdf(data, filename, max_workers=max_workers)
+
+def doc_row(entry):
+    """Cell texts of one record in the Word export's detail table"""
+    return [
+        entry.get('destination_country') or '',
+        entry.get('date') or '',
+        entry.get('date_range_end') or '',
+        str(entry.get('number_removed', '')),
+        ', '.join(entry.get('origin_nationalities') or []),
+        entry.get('notes') or ''
     ]
-    
-    for entry in data[:20]:
-        destination = entry.get('destination_country', '')
-        date = entry.get('date', '')
-        number = str(entry.get('number_removed', ''))
-        nationalities = ', '.join(entry.get('origin_nationalities', []))
-        notes = entry.get('notes', '').replace('\n', ' ')[:50] + ('...' if len(entry.get('notes', '')) > 50 else '')
-        
-        detailed_table_data.append([destination, date, number, nationalities, notes])
-    
-    detailed_table = Table(detailed_table_data, colWidths=[1.2*inch, 0.8*inch, 0.6*inch, 1.2*inch, 2*inch])
-    detailed_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP')
-    ]))
-    
-    story.append(detailed_table)
-    
-    # Build PDF
-    doc.build(story)
-    
-    return filename
 
 def export_to_doc(data, filename=None):
     """Export data to Word document format"""
     try:
         from docx import Document
         from docx.shared import Inches
+
+        from docx_table import append_rows
     except ImportError:
         print("Error: python-docx is required for DOC export. Install with: pip install python-docx")
         return None
@@ -360,11 +262,8 @@ def export_to_doc(data, filename=None):
     hdr_cells[1].text = 'Events'
     hdr_cells[2].text = 'People Removed'
     
-    for country, stats in sorted(country_data.items()):
-        row_cells = table.add_row().cells
-        row_cells[0].text = country
-        row_cells[1].text = str(stats['events'])
-        row_cells[2].text = str(stats['people'])
+    append_rows(table, ([country, str(stats['events']), str(stats['people'])]
+                        for country, stats in sorted(country_data.items())))
     
     # Detailed data
     doc.add_heading('Detailed Data', level=1)
@@ -380,22 +279,37 @@ def export_to_doc(data, filename=None):
     hdr_cells[4].text = 'Origin Nationalities'
     hdr_cells[5].text = 'Notes'
     
-    for entry in data:
-        row_cells = detailed_table.add_row().cells
-        row_cells[0].text = entry.get('destination_country', '')
-        row_cells[1].text = entry.get('date', '')
-        row_cells[2].text = entry.get('date_range_end', '')
-        row_cells[3].text = str(entry.get('number_removed', ''))
-        row_cells[4].text = ', '.join(entry.get('origin_nationalities', []))
-        row_cells[5].text = entry.get('notes', '')
+    append_rows(detailed_table, (doc_row(entry) for entry in data))
     
     # Save document
     doc.save(filename)
     
     return filename
 
-def main():
-    """Main function to export data in various formats"""
+# Bump a format's version whenever its exporter's output changes, so cached artifacts are rebuilt
+EXPORTERS = [
+    # (format, extension, version, record fields read (None: all), exporter)
+    ('json', 'json', 1, None, export_to_json),
+    ('csv', 'csv', 1, CSV_FIELDS, export_to_csv),
+    ('md', 'md', 1, ['destination_country', 'date', 'date_range_end', 'number_removed',
+                     'origin_nationalities', 'notes'], export_to_md),
+    ('txt', 'txt', 1, ['destination_country', 'date', 'date_range_end', 'number_removed',
+                       'origin_nationalities', 'source_urls', 'notes'], export_to_txt),
+    ('pdf', 'pdf', 1, ['destination_country', 'date', 'number_removed', 'origin_nationalities',
+                       'notes'], export_to_pdf),
+    ('doc', 'docx', 1, ['destination_country', 'date', 'date_range_end', 'number_removed',
+                        'origin_nationalities', 'notes'], export_to_doc)
+]
+
+def main(force=False, formats=None):
+    """
+    Export data in various formats
+
+    Formats whose inputs did not change since the last run are reused from
+    the export cache (see export_cache.py) unless force is set.
+    """
+    from export_cache import export_cached
+
     data = load_removals_data()
     
     if not data:
@@ -404,29 +318,22 @@ def main():
     
     print(f"Loaded {len(data)} removal records.")
     
-    # Export to all formats
-    formats = [
-        ('json', export_to_json),
-        ('csv', export_to_csv),
-        ('md', export_to_md),
-        ('txt', export_to_txt),
-        ('pdf', export_to_pdf),
-        ('doc', export_to_doc)
-    ]
-    
-    exported_files = []
+    exporters = [exporter for exporter in EXPORTERS if not formats or exporter[0] in formats]
+    results = export_cached(data, exporters, force=force)
     
-    for format_name, export_func in formats:
-        try:
-            filename = export_func(data)
-            if filename:
-                exported_files.append(filename)
-                print(f"Exported to {format_name.upper()}: {filename}")
-        except Exception as e:
-            print(f"Error exporting to {format_name.upper()}: {e}")
+    for format_name, filename, reused in results:
+        print(f"{'Unchanged' if reused else 'Exported to'} {format_name.upper()}: {filename}")
     
-    print(f"\nExport complete. {len(exported_files)} files created.")
-    return exported_files
+    created = sum(1 for _, _, reused in results if not reused)
+    print(f"\nExport complete. {created} files created, {len(results) - created} reused.")
+    return [filename for _, filename, _ in results]
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export removals data in various formats')
+    parser.add_argument('--force', action='store_true', help='Regenerate every format even if unchanged')
+    parser.add_argument('--formats', help='Comma-separated formats to export (default: all)')
+    args = parser.parse_args()
+
+    main(force=args.force, formats=args.formats.split(',') if args.formats else None)
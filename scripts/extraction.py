@@ -0,0 +1,111 @@
+"""
+Shared extraction rules for the free-text scrapers
+
+The patterns are compiled once at import time and applied sentence by
+sentence, so the cost of a scan grows linearly with the article length
+instead of backtracking across the whole document.
+"""
+
+import re
+
+from gazetteer import GAZETTEER
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or a blank line
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+
+# "<N> people" anchor shared by all three rules
+COUNT_ANCHOR = re.compile(r'\b(\d+)\s+(?:people|migrants|individuals)\b', re.IGNORECASE)
+
+# "<N> people to|sent to <Country>" - the country itself comes from the gazetteer
+COUNT_TO = re.compile(
+    r'\b(\d+)\s+(?:people|migrants|individuals)\s+(?:sent\s+)?to\s+(?:the\s+)?',
+    re.IGNORECASE
+)
+
+# "sent <N> people ... to <Country>", split into a verb anchor and a forward lookup
+SENT_COUNT = re.compile(r'\bsent\s+(\d+)\s+(?:people|migrants|individuals)\b', re.IGNORECASE)
+TO = re.compile(r'\bto\s+(?:the\s+)?', re.IGNORECASE)
+
+
+def sentence_spans(text):
+    """
+    Yield (start, end) offsets of the non-empty sentences of text
+    """
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if text[start:match.start()].strip():
+            yield start, match.start()
+        start = match.end()
+
+    if text[start:].strip():
+        yield start, len(text)
+
+
+def split_sentences(text):
+    """
+    Yield the non-empty sentences of text without building an intermediate list
+    """
+    for start, end in sentence_spans(text):
+        yield text[start:end].strip()
+
+
+def extract_counts(text):
+    """
+    Extract (number, country) pairs mentioned in free text
+
+    Countries are tagged by the gazetteer in a single pass over the whole
+    text; the count rules then run one sentence at a time and each count is
+    reported once, by the most specific rule that matches it. The old
+    '([A-Z][a-z]+).*?(\\d+)\\s+people' pattern is replaced by a linear scan:
+    find each count anchor, then take the first country mentioned between
+    the previous match and the anchor.
+    """
+    pairs = []
+    # The United States is the removing country, never a destination
+    countries = [entity for entity in GAZETTEER.tag(text)
+                 if entity.kind == 'country' and entity.country != 'United States']
+    country_index = 0
+
+    for start, end in sentence_spans(text):
+        while country_index < len(countries) and countries[country_index].start < start:
+            country_index += 1
+        sentence_countries = []
+        while country_index < len(countries) and countries[country_index].start < end:
+            sentence_countries.append(countries[country_index])
+            country_index += 1
+        if not sentence_countries:
+            continue
+
+        by_start = {entity.start: entity for entity in sentence_countries}
+        claimed = set()
+
+        for match in COUNT_TO.finditer(text, start, end):
+            entity = by_start.get(match.end())
+            if entity:
+                pairs.append((int(match.group(1)), entity.country))
+                claimed.add(match.start(1))
+
+        previous_end = start
+        for match in SENT_COUNT.finditer(text, start, end):
+            if match.start() < previous_end or match.start(1) in claimed:
+                continue
+            for to_match in TO.finditer(text, match.end(), end):
+                entity = by_start.get(to_match.end())
+                if entity:
+                    pairs.append((int(match.group(1)), entity.country))
+                    claimed.add(match.start(1))
+                    previous_end = entity.end
+                    break
+
+        previous_end = start
+        for match in COUNT_ANCHOR.finditer(text, start, end):
+            if match.start(1) in claimed:
+                previous_end = match.end()
+                continue
+            for entity in sentence_countries:
+                if previous_end <= entity.start and entity.end <= match.start():
+                    pairs.append((int(match.group(1)), entity.country))
+                    previous_end = match.end()
+                    break
+
+    return pairs
@@ -0,0 +1,84 @@
+"""
+Per-source fingerprints of extracted records
+
+A fingerprint is a hash of a source's normalized records, so a page that
+only changed in ads or timestamps - and therefore yields the same records -
+keeps the same fingerprint and can be skipped by every downstream stage.
+
+Records whose date could not be parsed carry date_estimated: their date is
+the day they were scraped, so it is left out of both the fingerprint and
+the merge key; otherwise they would change every day.
+"""
+
+import hashlib
+import json
+
+FINGERPRINTS_FILE = 'data/source_fingerprints.json'
+
+# Fields that change on every run without the record itself changing
+VOLATILE_FIELDS = {'scraped_at'}
+
+# Fields that are only the day of the scrape when date_estimated is set
+ESTIMATED_FIELDS = {'date', 'date_range_end'}
+
+
+def normalize_record(record):
+    """Return a copy of record without volatile fields and with trimmed strings"""
+    normalized = {}
+    for key, value in record.items():
+        if key in VOLATILE_FIELDS or (key in ESTIMATED_FIELDS and record.get('date_estimated')):
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, list):
+            value = [item.strip() if isinstance(item, str) else item for item in value]
+        normalized[key] = value
+    return normalized
+
+
+def record_key(record):
+    """The merge key: (destination_country, date, data_source); estimated dates count as None"""
+    date = None if record.get('date_estimated') else record.get('date')
+    return (record.get('destination_country'), date, record.get('data_source'))
+
+
+def keyed_records(records):
+    """
+    Yield ((merge key, occurrence), record) for a list of records
+
+    Records that share a merge key (possible in files written before the
+    merge deduplicated) are numbered so each one keeps a distinct key.
+    """
+    seen = {}
+    for record in records:
+        key = record_key(record)
+        seen[key] = seen.get(key, 0) + 1
+        yield (key, seen[key]), record
+
+
+def fingerprint_records(records):
+    """
+    Return a stable hash of a list of records, independent of their order
+    """
+    lines = sorted(json.dumps(normalize_record(record), sort_keys=True, ensure_ascii=False)
+                   for record in records)
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def load_fingerprints(filepath=FINGERPRINTS_FILE):
+    """Load the stored fingerprints, keyed by source name"""
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_fingerprints(fingerprints, filepath=FINGERPRINTS_FILE):
+    """Save fingerprints, keyed by source name"""
+    with open(filepath, 'w') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
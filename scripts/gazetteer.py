@@ -0,0 +1,414 @@
+"""
+Country and nationality gazetteer
+
+Every country name, demonym and common alias is compiled into a single
+Aho-Corasick automaton, so tagging a piece of text is one linear pass no
+matter how many names the gazetteer holds.
+"""
+
+from collections import deque, namedtuple
+
+# (country, demonyms, aliases) - the first demonym is the canonical one and
+# aliases are alternative names for the country itself
+COUNTRIES = [
+    ('Afghanistan', ('Afghan', 'Afghani'), ()),
+    ('Albania', 'Albanian', ()),
+    ('Algeria', 'Algerian', ()),
+    ('Andorra', 'Andorran', ()),
+    ('Angola', 'Angolan', ()),
+    ('Antigua and Barbuda', ('Antiguan', 'Barbudan'), ('Antigua',)),
+    ('Argentina', ('Argentine', 'Argentinian', 'Argentinean'), ()),
+    ('Armenia', 'Armenian', ()),
+    ('Australia', 'Australian', ()),
+    ('Austria', 'Austrian', ()),
+    ('Azerbaijan', ('Azerbaijani', 'Azeri'), ()),
+    ('Bahamas', 'Bahamian', ()),
+    ('Bahrain', 'Bahraini', ()),
+    ('Bangladesh', 'Bangladeshi', ()),
+    ('Barbados', ('Barbadian', 'Bajan'), ()),
+    ('Belarus', ('Belarusian', 'Belarussian'), ()),
+    ('Belgium', 'Belgian', ()),
+    ('Belize', 'Belizean', ()),
+    ('Benin', 'Beninese', ()),
+    ('Bhutan', 'Bhutanese', ()),
+    ('Bolivia', 'Bolivian', ()),
+    ('Bosnia and Herzegovina', ('Bosnian', 'Herzegovinian'), ('Bosnia',)),
+    ('Botswana', ('Motswana', 'Batswana', 'Botswanan'), ()),
+    ('Brazil', 'Brazilian', ()),
+    ('Brunei', 'Bruneian', ()),
+    ('Bulgaria', 'Bulgarian', ()),
+    ('Burkina Faso', ('Burkinabe', 'Burkinabè'), ()),
+    ('Burundi', 'Burundian', ()),
+    ('Cabo Verde', ('Cabo Verdean', 'Cape Verdean'), ('Cape Verde',)),
+    ('Cambodia', ('Cambodian', 'Khmer'), ()),
+    ('Cameroon', 'Cameroonian', ()),
+    ('Canada', 'Canadian', ()),
+    ('Central African Republic', 'Central African', ('CAR',)),
+    ('Chad', 'Chadian', ()),
+    ('Chile', 'Chilean', ()),
+    ('China', 'Chinese', ("People's Republic of China", 'PRC')),
+    ('Colombia', 'Colombian', ()),
+    ('Comoros', 'Comorian', ()),
+    ('Congo', 'Congolese', ('Republic of the Congo', 'Congo-Brazzaville')),
+    ('Democratic Republic of the Congo', 'Congolese',
+     ('DRC', 'DR Congo', 'Democratic Republic of Congo', 'Congo-Kinshasa')),
+    ('Costa Rica', 'Costa Rican', ()),
+    ("Cote d'Ivoire", 'Ivorian', ("Côte d'Ivoire", 'Ivory Coast')),
+    ('Croatia', ('Croatian', 'Croat'), ()),
+    ('Cuba', 'Cuban', ()),
+    ('Cyprus', 'Cypriot', ()),
+    ('Czech Republic', 'Czech', ('Czechia',)),
+    ('Denmark', ('Danish', 'Dane'), ()),
+    ('Djibouti', 'Djiboutian', ()),
+    ('Dominican Republic', 'Dominican', ()),
+    ('Dominica', 'Dominican', ()),
+    ('Ecuador', ('Ecuadorian', 'Ecuadoran'), ()),
+    ('Egypt', 'Egyptian', ()),
+    ('El Salvador', ('Salvadoran', 'Salvadorean'), ()),
+    ('Equatorial Guinea', ('Equatoguinean', 'Equatorial Guinean'), ()),
+    ('Eritrea', 'Eritrean', ()),
+    ('Estonia', 'Estonian', ()),
+    ('Eswatini', 'Swazi', ('Swaziland',)),
+    ('Ethiopia', 'Ethiopian', ()),
+    ('Fiji', 'Fijian', ()),
+    ('Finland', ('Finnish', 'Finn'), ()),
+    ('France', 'French', ()),
+    ('Gabon', 'Gabonese', ()),
+    ('Gambia', 'Gambian', ()),
+    ('Georgia', 'Georgian', ()),
+    ('Germany', 'German', ()),
+    ('Ghana', 'Ghanaian', ()),
+    ('Greece', 'Greek', ()),
+    ('Grenada', 'Grenadian', ()),
+    ('Guatemala', 'Guatemalan', ()),
+    ('Guinea', 'Guinean', ('Guinea-Conakry',)),
+    ('Guinea-Bissau', 'Bissau-Guinean', ('Guinea Bissau',)),
+    ('Guyana', 'Guyanese', ()),
+    ('Haiti', 'Haitian', ()),
+    ('Honduras', 'Honduran', ()),
+    ('Hungary', 'Hungarian', ()),
+    ('Iceland', ('Icelandic', 'Icelander'), ()),
+    ('India', 'Indian', ()),
+    ('Indonesia', 'Indonesian', ()),
+    ('Iran', ('Iranian', 'Persian'), ()),
+    ('Iraq', 'Iraqi', ()),
+    ('Ireland', 'Irish', ()),
+    ('Israel', 'Israeli', ()),
+    ('Italy', 'Italian', ()),
+    ('Jamaica', 'Jamaican', ()),
+    ('Japan', 'Japanese', ()),
+    ('Jordan', 'Jordanian', ()),
+    ('Kazakhstan', ('Kazakh', 'Kazakhstani'), ()),
+    ('Kenya', 'Kenyan', ()),
+    ('Kiribati', 'I-Kiribati', ()),
+    ('Kosovo', ('Kosovar', 'Kosovan'), ()),
+    ('Kuwait', 'Kuwaiti', ()),
+    ('Kyrgyzstan', ('Kyrgyz', 'Kyrgyzstani'), ()),
+    ('Laos', ('Laotian', 'Lao'), ()),
+    ('Latvia', 'Latvian', ()),
+    ('Lebanon', 'Lebanese', ()),
+    ('Lesotho', ('Basotho', 'Mosotho'), ()),
+    ('Liberia', 'Liberian', ()),
+    ('Libya', 'Libyan', ()),
+    ('Liechtenstein', 'Liechtensteiner', ()),
+    ('Lithuania', 'Lithuanian', ()),
+    ('Luxembourg', ('Luxembourgish', 'Luxembourger'), ()),
+    ('Madagascar', 'Malagasy', ()),
+    ('Malawi', 'Malawian', ()),
+    ('Malaysia', 'Malaysian', ()),
+    ('Maldives', 'Maldivian', ()),
+    ('Mali', 'Malian', ()),
+    ('Malta', 'Maltese', ()),
+    ('Marshall Islands', 'Marshallese', ()),
+    ('Mauritania', 'Mauritanian', ()),
+    ('Mauritius', 'Mauritian', ()),
+    ('Mexico', 'Mexican', ()),
+    ('Micronesia', 'Micronesian', ()),
+    ('Moldova', 'Moldovan', ()),
+    ('Monaco', 'Monegasque', ()),
+    ('Mongolia', 'Mongolian', ()),
+    ('Montenegro', 'Montenegrin', ()),
+    ('Morocco', 'Moroccan', ()),
+    ('Mozambique', 'Mozambican', ()),
+    ('Myanmar', 'Burmese', ('Burma',)),
+    ('Namibia', 'Namibian', ()),
+    ('Nauru', 'Nauruan', ()),
+    ('Nepal', ('Nepali', 'Nepalese'), ()),
+    ('Netherlands', 'Dutch', ('Holland',)),
+    ('New Zealand', 'New Zealander', ()),
+    ('Nicaragua', 'Nicaraguan', ()),
+    ('Niger', 'Nigerien', ()),
+    ('Nigeria', 'Nigerian', ()),
+    ('North Korea', 'North Korean', ('DPRK',)),
+    ('North Macedonia', 'Macedonian', ('Macedonia',)),
+    ('Norway', 'Norwegian', ()),
+    ('Oman', 'Omani', ()),
+    ('Pakistan', 'Pakistani', ()),
+    ('Palau', 'Palauan', ()),
+    ('Palestine', 'Palestinian', ('Gaza', 'West Bank')),
+    ('Panama', 'Panamanian', ()),
+    ('Papua New Guinea', 'Papua New Guinean', ()),
+    ('Paraguay', 'Paraguayan', ()),
+    ('Peru', 'Peruvian', ()),
+    ('Philippines', ('Filipino', 'Philippine'), ()),
+    ('Poland', ('Polish', 'Pole'), ()),
+    ('Portugal', 'Portuguese', ()),
+    ('Qatar', 'Qatari', ()),
+    ('Romania', 'Romanian', ()),
+    ('Russia', 'Russian', ('Russian Federation',)),
+    ('Rwanda', 'Rwandan', ()),
+    ('Saint Kitts and Nevis', ('Kittitian', 'Nevisian'), ('St. Kitts and Nevis',)),
+    ('Saint Lucia', ('Saint Lucian', 'St. Lucian'), ('St. Lucia',)),
+    ('Saint Vincent and the Grenadines', 'Vincentian', ('St. Vincent and the Grenadines',)),
+    ('Samoa', 'Samoan', ()),
+    ('San Marino', 'Sammarinese', ()),
+    ('Sao Tome and Principe', 'Santomean', ('São Tomé and Príncipe',)),
+    ('Saudi Arabia', ('Saudi', 'Saudi Arabian'), ()),
+    ('Senegal', 'Senegalese', ()),
+    ('Serbia', ('Serbian', 'Serb'), ()),
+    ('Seychelles', 'Seychellois', ()),
+    ('Sierra Leone', 'Sierra Leonean', ()),
+    ('Singapore', 'Singaporean', ()),
+    ('Slovakia', ('Slovak', 'Slovakian'), ()),
+    ('Slovenia', ('Slovenian', 'Slovene'), ()),
+    ('Solomon Islands', 'Solomon Islander', ()),
+    ('Somalia', ('Somali', 'Somalian'), ()),
+    ('South Africa', 'South African', ()),
+    ('South Korea', ('South Korean', 'Korean'), ('Korea', 'Republic of Korea')),
+    ('South Sudan', 'South Sudanese', ()),
+    ('Spain', ('Spanish', 'Spaniard'), ()),
+    ('Sri Lanka', 'Sri Lankan', ()),
+    ('Sudan', 'Sudanese', ()),
+    ('Suriname', 'Surinamese', ()),
+    ('Sweden', ('Swedish', 'Swede'), ()),
+    ('Switzerland', 'Swiss', ()),
+    ('Syria', 'Syrian', ()),
+    ('Taiwan', 'Taiwanese', ()),
+    ('Tajikistan', ('Tajik', 'Tajikistani'), ()),
+    ('Tanzania', 'Tanzanian', ()),
+    ('Thailand', 'Thai', ()),
+    ('Timor-Leste', 'Timorese', ('East Timor',)),
+    ('Togo', 'Togolese', ()),
+    ('Tonga', 'Tongan', ()),
+    ('Trinidad and Tobago', ('Trinidadian', 'Tobagonian'), ('Trinidad',)),
+    ('Tunisia', 'Tunisian', ()),
+    ('Turkey', ('Turkish', 'Turk'), ('Türkiye', 'Turkiye')),
+    ('Turkmenistan', 'Turkmen', ()),
+    ('Tuvalu', 'Tuvaluan', ()),
+    ('Uganda', 'Ugandan', ()),
+    ('Ukraine', 'Ukrainian', ()),
+    ('United Arab Emirates', 'Emirati', ('UAE',)),
+    ('United Kingdom', 'British', ('UK', 'U.K.', 'Britain', 'Great Britain', 'England', 'Scotland', 'Wales')),
+    ('United States', 'American', ('US', 'U.S.', 'USA', 'U.S.A.', 'United States of America')),
+    ('Uruguay', 'Uruguayan', ()),
+    ('Uzbekistan', ('Uzbek', 'Uzbekistani'), ()),
+    ('Vanuatu', 'Ni-Vanuatu', ()),
+    ('Venezuela', 'Venezuelan', ()),
+    ('Vietnam', 'Vietnamese', ('Viet Nam',)),
+    ('Yemen', 'Yemeni', ()),
+    ('Zambia', 'Zambian', ()),
+    ('Zimbabwe', 'Zimbabwean', ()),
+]
+
+# Territories that appear as removal destinations in the tracker
+TERRITORIES = [
+    ('Guantanamo Bay', (), ('Guantanamo', 'Guantánamo', 'Guantánamo Bay', 'GTMO')),
+    ('Hong Kong', 'Hong Konger', ()),
+    ('Puerto Rico', 'Puerto Rican', ()),
+]
+
+# Names that are also common words or first names ("Chad Wolf", "the Pole at
+# the gate"); running text only matches them through their other forms
+# ("Chadian", "Poles"). lookup() still accepts them as whole names.
+AMBIGUOUS_NAMES = {'Georgia', 'Jordan', 'Chad', 'Turkey', 'Pole', 'Dane', 'Finn', 'Turk', 'Swede'}
+
+# Demonyms used unchanged in the plural, besides those ending in -ese/-ss/-sh
+INVARIANT_DEMONYMS = {'French', 'Dutch', 'Malagasy', 'Basotho', 'Batswana', 'Motswana',
+                      'Seychellois', 'Ni-Vanuatu', 'I-Kiribati', 'Burkinabe', 'Burkinabè'}
+
+Entity = namedtuple('Entity', ['start', 'end', 'text', 'country', 'demonym', 'kind'])
+
+
+def plural_forms(demonym):
+    """Return the demonym's plural forms, e.g. 'Iranian' -> ['Iranians']"""
+    if demonym in INVARIANT_DEMONYMS or demonym.endswith(('ese', 'ss', 'sh')):
+        return []
+    return [demonym + 's']
+
+
+def lower_aligned(text):
+    """
+    text.lower(), one character for one character
+
+    A few characters grow when lower-cased ('İ' becomes 'i' plus a
+    combining dot); they are kept as they are, so offsets into the result
+    are offsets into text.
+    """
+    if text.isascii():
+        return text.lower()
+    return ''.join(lowered if len(lowered) == 1 else char for char, lowered in ((char, char.lower()) for char in text))
+
+
+class Gazetteer:
+    """
+    Aho-Corasick automaton over country names, demonyms and aliases
+
+    Matching is case-insensitive over a lower-cased copy of the text, but a
+    match is only kept if it starts with a capital letter in the original
+    and sits on word boundaries. All-caps aliases (US, CAR, DRC) must match
+    exactly, so "Us officials" or "Car trips" are not countries, and the
+    AMBIGUOUS_NAMES are left out of running text altogether. Overlapping
+    matches resolve to the leftmost-longest one ("South Sudan" wins over
+    "Sudan").
+    """
+
+    def __init__(self, entries=None):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        # Lower-cased name -> (country, canonical demonym), for lookup()
+        self.names = {}
+
+        for country, demonyms, aliases in entries if entries is not None else COUNTRIES + TERRITORIES:
+            if isinstance(demonyms, str):
+                demonyms = (demonyms,)
+            canonical = demonyms[0] if demonyms else country
+
+            for name in (country,) + tuple(aliases):
+                self._add(name, country, canonical, 'country')
+            for demonym in demonyms:
+                for form in [demonym] + plural_forms(demonym):
+                    self._add(form, country, canonical, 'nationality')
+
+        self._build_failure_links()
+
+    def _add(self, phrase, country, demonym, kind):
+        lowered = lower_aligned(phrase)
+        self.names.setdefault(lowered, (country, demonym))
+        if phrase in AMBIGUOUS_NAMES:
+            return
+        # Acronyms only count in capitals; other names in any case
+        exact = phrase if phrase.isupper() else None
+        state = 0
+        for char in lowered:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = next_state
+        # The first registration of a phrase wins ("Congolese" stays with Congo)
+        if self.output[state] is None:
+            self.output[state] = (len(phrase), country, demonym, kind, exact)
+
+    def _build_failure_links(self):
+        # dict_suffix[s] is the nearest state on s's failure chain with an output
+        self.dict_suffix = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                fail_state = self.fail[next_state]
+                self.dict_suffix[next_state] = fail_state if self.output[fail_state] else self.dict_suffix[fail_state]
+
+    def _raw_matches(self, lowered):
+        goto, fail, output, dict_suffix = self.goto, self.fail, self.output, self.dict_suffix
+        state = 0
+        for index, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state if output[state] else dict_suffix[state]
+            while match_state:
+                length, country, demonym, kind, exact = output[match_state]
+                yield index + 1 - length, index + 1, country, demonym, kind, exact
+                match_state = dict_suffix[match_state]
+
+    def tag(self, text):
+        """
+        Return every country or nationality mention in text as Entity tuples, in order
+        """
+        candidates = []
+        for start, end, country, demonym, kind, exact in self._raw_matches(lower_aligned(text)):
+            if not text[start].isupper():
+                continue
+            if exact and text[start:end] != exact:
+                continue
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            candidates.append((start, -end, country, demonym, kind))
+
+        candidates.sort()
+        entities = []
+        last_end = 0
+        for start, negative_end, country, demonym, kind in candidates:
+            if start < last_end:
+                continue
+            end = -negative_end
+            entities.append(Entity(start, end, text[start:end], country, demonym, kind))
+            last_end = end
+        return entities
+
+    def lookup(self, name):
+        """
+        Return (country, canonical demonym) for a string that is one name, or None
+
+        A table cell or a heading holding just a name is not running text,
+        so ambiguous names and acronyms are accepted in any case here. A
+        string that is not a known name as a whole resolves to its first
+        mention, if any.
+        """
+        found = self.names.get(lower_aligned(name.strip()))
+        if found:
+            return found
+        entities = self.tag(name)
+        return (entities[0].country, entities[0].demonym) if entities else None
+
+    def countries(self, text):
+        """Return the distinct country names mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(entity.country for entity in self.tag(text)))
+
+    def nationalities(self, text, exclude=()):
+        """
+        Return the distinct demonyms implied by text, in order of first mention
+
+        Both nationality words ("Iranians") and country names ("from Nigeria")
+        count. Countries in `exclude` are skipped, which is how the removing
+        country and the destination are kept out of origin lists.
+        """
+        excluded = {name.lower() for name in exclude}
+        demonyms = []
+        for entity in self.tag(text):
+            if entity.country.lower() in excluded or entity.demonym in demonyms:
+                continue
+            demonyms.append(entity.demonym)
+        return demonyms
+
+
+GAZETTEER = Gazetteer()
+
+
+def origin_nationalities(who_text, destination_country=None):
+    """
+    Return the origin nationalities mentioned in a tracker "Who:" line
+
+    The United States and the destination country are never origins of a
+    third-country removal, so mentions of either are ignored.
+    """
+    if not who_text:
+        return []
+    exclude = ['United States']
+    if destination_country:
+        found = GAZETTEER.lookup(destination_country.title())
+        exclude.append(found[0] if found else destination_country)
+    return GAZETTEER.nationalities(who_text, exclude=exclude)
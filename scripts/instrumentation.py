@@ -0,0 +1,226 @@
+"""
+Per-source, per-stage timing for the scrape pipeline
+
+Code wraps each stage of a scrape in span(stage), and the time spent there
+is added to a running total for the source currently being scraped (taken
+from a context variable set by the plugin runner, so spans inside worker
+threads are attributed correctly). Spans that happen many times per run,
+such as date parsing per section, are summed rather than logged one by one.
+
+Stages used by the built-in scrapers:
+    scrape  - the whole scraper call (records)
+    fetch   - HTTP requests (bytes)
+    parse   - HTML/table parsing
+    extract - count and nationality extraction
+    dates   - date parsing
+    merge   - merging into the dataset
+    write   - writing the changed dataset shards
+
+At the end of a run, emit() appends one JSON line per source and stage to
+the timing log (data/cache/timings.jsonl, or REMOVALS_TIMING_LOG; set it
+to '-' for stderr or to an empty string to disable) and print_summary()
+prints a table.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+
+TIMING_LOG = 'data/cache/timings.jsonl'
+PROFILE_FILE = 'data/cache/profile.prof'
+
+# Source the current task or thread is working for
+current_source = contextvars.ContextVar('current_source', default=None)
+
+
+class Timings:
+    """
+    Running totals of elapsed time and counters per (source, stage)
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.run_id = datetime.now().isoformat()
+
+    def reset(self):
+        with self.lock:
+            self.totals = {}
+            self.run_id = datetime.now().isoformat()
+
+    def add(self, source, stage, elapsed_ms, calls=1, **counters):
+        with self.lock:
+            total = self.totals.setdefault((source, stage), {'ms': 0.0, 'calls': 0})
+            total['ms'] += elapsed_ms
+            total['calls'] += calls
+            for name, value in counters.items():
+                total[name] = total.get(name, 0) + value
+
+    @contextmanager
+    def span(self, stage, source=None):
+        """
+        Time the body of a with block; counters put in the yielded dict
+        (e.g. fields['bytes'] = n) are summed as well. Spans nest freely,
+        but a nested span's time is also part of the outer one.
+        """
+        fields = {}
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.add(source or current_source.get() or '-', stage, elapsed_ms, **fields)
+
+    def sources(self):
+        return list(dict.fromkeys(source for source, _ in self.totals))
+
+    def get(self, source, stage, field='ms'):
+        return self.totals.get((source, stage), {}).get(field, 0)
+
+    def emit(self, path=None):
+        """Append one JSON line per (source, stage) to the timing log"""
+        if path is None:
+            path = os.environ.get('REMOVALS_TIMING_LOG', TIMING_LOG)
+        if not path:
+            return
+
+        lines = []
+        for (source, stage), total in self.totals.items():
+            line = {'run': self.run_id, 'source': source, 'stage': stage,
+                    'ms': round(total['ms'], 3), 'calls': total['calls']}
+            line.update((name, value) for name, value in total.items() if name not in ('ms', 'calls'))
+            lines.append(json.dumps(line))
+
+        if path == '-':
+            for line in lines:
+                print(line, file=sys.stderr)
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(''.join(f"{line}\n" for line in lines))
+
+    def print_summary(self):
+        """Print a table of per-source stage timings"""
+        sources = [source for source in self.sources() if source != '-']
+        if not sources and not self.totals:
+            return
+
+        header = f"{'source':<20} {'fetch KB':>9} {'fetch ms':>9} {'parse ms':>9} {'extract ms':>11} " \
+                 f"{'dates ms':>9} {'merge ms':>9} {'total ms':>9} {'records':>8}"
+        print("\nTiming summary")
+        print(header)
+        print('-' * len(header))
+        for source in sources:
+            print(f"{source:<20} {self.get(source, 'fetch', 'bytes') / 1024:>9.1f} "
+                  f"{self.get(source, 'fetch'):>9.1f} {self.get(source, 'parse'):>9.1f} "
+                  f"{self.get(source, 'extract'):>11.1f} {self.get(source, 'dates'):>9.1f} "
+                  f"{self.get(source, 'merge'):>9.1f} {self.get(source, 'scrape'):>9.1f} "
+                  f"{self.get(source, 'scrape', 'records'):>8}")
+
+        for (source, stage), total in self.totals.items():
+            if source == '-':
+                print(f"{stage:<20} {total['ms']:>9.1f} ms")
+
+
+TIMINGS = Timings()
+
+
+def span(stage, source=None):
+    """Time a stage of the current source's scrape (see Timings.span)"""
+    return TIMINGS.span(stage, source)
+
+
+def fetch(url, session=None, **kwargs):
+    """
+    requests.get (or session.get) inside a fetch span that records the
+    response size; streamed responses count their bytes where they are read
+    """
+    with span('fetch') as fields:
+        response = (session or requests).get(url, **kwargs)
+        if not kwargs.get('stream'):
+            fields['bytes'] = len(response.content)
+    return response
+
+
+def add_bytes(count, source=None):
+    """Add bytes read outside fetch() (e.g. from a streamed body) to the fetch totals"""
+    TIMINGS.add(source or current_source.get() or '-', 'fetch', 0.0, calls=0, bytes=count)
+
+
+def timed_iter(iterable, stage):
+    """
+    Yield from iterable, adding the time spent producing each item to stage
+
+    Used for streamed pages, where reading the body overlaps with parsing
+    and so counts as parse time.
+    """
+    iterator = iter(iterable)
+    while True:
+        with span(stage):
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+
+@contextmanager
+def profiled(mode, output=PROFILE_FILE):
+    """
+    Profile the body of a with block with cProfile or pyinstrument
+
+    mode is 'cprofile', 'pyinstrument' or None (no profiling). cProfile
+    stats are saved to output and the top entries printed; pyinstrument is
+    optional (pip install pyinstrument) and prints its call tree.
+    """
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+
+        # Scrapers run in worker threads, so every thread started inside the
+        # block gets a profiler of its own and the stats are merged at the end
+        profilers = [cProfile.Profile()]
+
+        def profile_thread(*args):
+            profiler = cProfile.Profile()
+            profilers.append(profiler)
+            profiler.enable()
+
+        threading.setprofile(profile_thread)
+        profilers[0].enable()
+        try:
+            yield
+        finally:
+            profilers[0].disable()
+            threading.setprofile(None)
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            stats = pstats.Stats(*profilers)
+            stats.dump_stats(output)
+            print(f"\ncProfile stats saved to {output}")
+            stats.sort_stats('cumulative').print_stats(25)
+
+    elif mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Error: pyinstrument is required for --profile pyinstrument. Install with: pip install pyinstrument")
+            yield
+            return
+
+        # Async mode follows the scrape across awaits instead of only the event loop
+        profiler = Profiler(async_mode='enabled')
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            print(profiler.output_text(unicode=True, color=False))
+
+    else:
+        yield
@@ -0,0 +1,303 @@
+"""
+Minimal Prometheus metrics for the API
+
+Counters, gauges and histograms with labels, kept in memory and rendered in
+the Prometheus text exposition format by REGISTRY.render(). Updating a
+metric is a dict lookup and an addition under a lock, cheap enough to do on
+every request.
+
+Values are kept per process. When the API runs in several worker processes
+(serve.py), a scrape reaches only one of them, so the registry switches to
+multiprocess mode, like prometheus_client's with PROMETHEUS_MULTIPROC_DIR:
+every process writes its values to <pid>.json in a shared directory about
+once a second, and render() merges the files. Counters and histograms are
+summed over every process that ever wrote (a restarted worker's requests
+still count); gauges are reported per live process with a pid label.
+Setting PROMETHEUS_MULTIPROC_DIR enables the mode at import; serve.py
+enables it with a fresh directory of its own otherwise.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans sub-millisecond cached lookups to multi-second full dumps
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+MULTIPROC_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+# Seconds between writes of a process's values in multiprocess mode
+FLUSH_INTERVAL = 1.0
+
+# Bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metric:
+    """Base class: a named family of values, one per combination of label values"""
+
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def state(self):
+        """The values as a JSON-serializable list of [label values, value]"""
+        with self.lock:
+            return [[list(label_values), value] for label_values, value in self.values.items()]
+
+    def combine(self, total, value):
+        """Merge one process's value into the total over processes (None at first)"""
+        return value if total is None else total + value
+
+    def render(self, values=None, label_names=None):
+        """Exposition lines for values (default: this process's) labelled with label_names"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        if values is None:
+            with self.lock:
+                values = dict(self.values)
+        label_names = self.label_names if label_names is None else label_names
+        for label_values, value in sorted(values.items()):
+            lines.extend(self.render_value(label_names, label_values, value))
+        return lines
+
+    def render_value(self, label_names, label_values, value):
+        return [f"{self.name}{format_labels(label_names, label_values)} {format_value(value)}"]
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self.key(labels), 0)
+
+
+class Gauge(Metric):
+    """A value that can be set to anything"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+    def get(self, **labels):
+        return self.values.get(self.key(labels), 0)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def state(self):
+        with self.lock:
+            return [[list(label_values), [list(value[0]), value[1], value[2]]]
+                    for label_values, value in self.values.items()]
+
+    def combine(self, total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def render_value(self, label_names, label_values, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            labels = format_labels(label_names, label_values, [('le', format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = format_labels(label_names, label_values)
+        lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.multiprocess_dir = None
+        self.flushed = None
+
+    def register(self, metric):
+        with self.lock:
+            # Modules can be imported twice (e.g. as __main__ and by name); reuse the first
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        if self.multiprocess_dir:
+            self.flush()
+            merged = self.collect()
+        lines = []
+        for metric in metrics:
+            if not self.multiprocess_dir:
+                lines.extend(metric.render())
+            elif metric.kind == 'gauge':
+                lines.extend(metric.render(merged.get(metric.name, {}), metric.label_names + ('pid',)))
+            else:
+                lines.extend(metric.render(merged.get(metric.name, {})))
+        return '\n'.join(lines) + '\n'
+
+    def enable_multiprocess(self, directory, clear=False):
+        """
+        Share values with the other processes writing to directory
+
+        clear removes the files of an earlier server; only the process
+        that starts the server should pass it. Processes forked from this
+        one start from zero and write their own files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        if clear:
+            for path in glob.glob(os.path.join(directory, '*.json')):
+                os.remove(path)
+        first = self.multiprocess_dir is None
+        self.multiprocess_dir = directory
+        if first:
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._start_flusher()
+
+    def _after_fork(self):
+        # The parent's values are in the parent's file; locks may have been held by its threads
+        self.lock = threading.Lock()
+        for metric in self.metrics.values():
+            metric.lock = threading.Lock()
+            metric.values = {}
+        self.flushed = None
+        self._start_flusher()
+
+    def _start_flusher(self):
+        def flush_periodically():
+            while True:
+                time.sleep(FLUSH_INTERVAL)
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"Could not write metrics to {self.multiprocess_dir}: {e}")
+
+        threading.Thread(target=flush_periodically, name='metrics-flush', daemon=True).start()
+
+    def flush(self):
+        """Write this process's values to its file, if they changed since the last write"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        content = json.dumps({metric.name: metric.state() for metric in metrics})
+        if content == self.flushed:
+            return
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        with open(path + '.tmp', 'w') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+        self.flushed = content
+
+    def collect(self):
+        """Return {metric name: {label values: value}} merged over every process's file"""
+        merged = {}
+        for path in glob.glob(os.path.join(self.multiprocess_dir, '*.json')):
+            try:
+                pid = int(os.path.basename(path)[:-len('.json')])
+                with open(path, 'r') as f:
+                    state = json.load(f)
+            except (ValueError, OSError):
+                continue
+            live = pid_alive(pid)
+            for name, entries in state.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged.setdefault(name, {})
+                for label_values, value in entries:
+                    key = tuple(label_values)
+                    if metric.kind == 'gauge':
+                        # A gauge of an exited process no longer describes anything
+                        if not live:
+                            continue
+                        key += (str(pid),)
+                    values[key] = metric.combine(values.get(key), value)
+        return merged
+
+
+REGISTRY = Registry()
+if os.environ.get(MULTIPROC_ENV):
+    REGISTRY.enable_multiprocess(os.environ[MULTIPROC_ENV])
+
+# Request metrics shared by both API servers
+REQUESTS = REGISTRY.counter('removals_api_requests_total', 'API requests served', ['route', 'method', 'status'])
+LATENCY = REGISTRY.histogram('removals_api_request_duration_seconds', 'API request latency', ['route', 'method'])
+RESPONSE_SIZE = REGISTRY.histogram('removals_api_response_size_bytes', 'API response body size', ['route'],
+                                   buckets=SIZE_BUCKETS)
@@ -1,12 +1,69 @@
-import requests
+import asyncio
+import calendar
 from bs4 import BeautifulSoup
 import re
-import json
 from datetime import datetime, timedelta
 import dateparser
-import pandas as pd
-import time
-from urllib.parse import urljoin, urlparse
+import os
+
+from changelog import INSERT, UPDATE, append_changes
+from extraction import extract_counts
+from fingerprints import fingerprint_records, load_fingerprints, normalize_record, record_key, save_fingerprints
+from gazetteer import GAZETTEER, origin_nationalities
+from instrumentation import TIMINGS, add_bytes, fetch, profiled, span, timed_iter
+from ohss_crawler import OHSSCrawler, latest_rows
+from refresh_schedule import RefreshSchedule
+from scraper_plugins import AsyncHTTPClient, iter_source_results
+from table_ingest import find_dataset_links, ingest_frame, load_dataset, read_html_tables
+from section_memo import SectionMemo, section_key
+from section_walker import iter_response_text, iter_sections
+from shards import load_records, write_shards
+
+def source_changed(fingerprints, source_name, data):
+    """
+    Return True if a source's records differ from the last run's, storing their new fingerprint
+    """
+    # An empty result is a failed or blocked scrape, not a change
+    if not data:
+        return False
+    fingerprint = fingerprint_records(data)
+    if fingerprints.get(source_name) == fingerprint:
+        print(f"  {source_name} unchanged since the last run, skipping")
+        return False
+    fingerprints[source_name] = fingerprint
+    return True
+
+def merge_positions(records):
+    """Map each merge key to the position of its first record"""
+    positions = {}
+    for index, record in enumerate(records):
+        positions.setdefault(record_key(record), index)
+    return positions
+
+def merge_source(merged_data, positions, data):
+    """
+    Merge one source's records into merged_data; returns the (op, record) changes
+
+    Records with a new merge key are appended. A record whose key is
+    already there replaces the stored one if their normalized content
+    differs. Within data, the first record with a key wins.
+    """
+    changes = []
+    seen = set()
+    for new_entry in data:
+        key = record_key(new_entry)
+        if key in seen:
+            continue
+        seen.add(key)
+        index = positions.get(key)
+        if index is None:
+            positions[key] = len(merged_data)
+            merged_data.append(new_entry)
+            changes.append((INSERT, new_entry))
+        elif normalize_record(merged_data[index]) != normalize_record(new_entry):
+            merged_data[index] = new_entry
+            changes.append((UPDATE, new_entry))
+    return changes
 
 class MultiSourceScraper:
     """
@@ -41,17 +98,19 @@ class MultiSourceScraper:
                 'enabled': True
             }
         }
+        # Shards rewritten by the last update_removals_data()
+        self.changed_shards = []
 
     def parse_date_range(self, date_text):
         """
         Parse complex date ranges like 'Sept. 5-6, 2025' or 'Sept. 30-Oct. 1, 2025'
-        Returns list of ISO dates
+        Returns list of ISO dates, empty if date_text is not a date
         """
         if not date_text:
-            return [datetime.now().strftime('%Y-%m-%d')]
+            return []
 
         # Remove "Date(s):" prefix if present
-        date_text = re.sub(r'^Date$[^:]*:', '', date_text).strip()
+        date_text = re.sub(r'^\s*Date\(s\)[^:]*:', '', date_text).strip()
 
         # Handle ranges with hyphens
         if '-' in date_text and ',' in date_text:
@@ -107,86 +166,86 @@ class MultiSourceScraper:
         if parsed:
             return [parsed.strftime('%Y-%m-%d')]
 
-        return [datetime.now().strftime('%Y-%m-%d')]
+        return []
+
+    def extract_tracker_section(self, country_name, date_info, who_info):
+        """
+        Extract the count, origin nationalities and ISO dates of one tracker section
+
+        A section whose date cannot be parsed is dated the day of the run,
+        with used_fallback set.
+        """
+        with span('extract'):
+            # Extract number of people
+            number_removed = None
+            if who_info:
+                num_match = re.search(r'(\d+)', who_info)
+                if num_match:
+                    number_removed = int(num_match.group(1))
+
+            # Extract origin nationalities (countries and demonyms, one gazetteer pass)
+            nationalities = origin_nationalities(who_info, country_name)
+
+        # Parse dates
+        with span('dates'):
+            iso_dates = self.parse_date_range(date_info)
+        used_fallback = not iso_dates
+        if used_fallback:
+            iso_dates = [datetime.now().strftime('%Y-%m-%d')]
+
+        return {"number_removed": number_removed, "origin_nationalities": nationalities, "dates": iso_dates,
+                "used_fallback": used_fallback}
 
     def scrape_hard_g_history(self):
         """
         Scrape the Hard G History webpage for third-nation removal data
+
+        Sections whose text is unchanged since the last run reuse their
+        extracted fields from the section memo (see section_memo.py).
         """
-        url = "https://hardghistory.ghost.io/tracking-all-of-trumps-third-country-removals-that-we-know-of/"
+        url = self.sources['hard_g_history']['url']
 
         try:
-            response = requests.get(url, timeout=30)
+            response = fetch(url, timeout=30, stream=True)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find country sections (h2 tags followed by details)
-            country_sections = soup.find_all('h2')
             removals_data = []
+            memo = SectionMemo.load('hard_g_history')
+            today = [datetime.now().strftime('%Y-%m-%d')]
 
-            for section in country_sections:
-                country_name = section.get_text().strip()
-                if not country_name:
-                    continue
+            # Walk the page once, chunk by chunk; each h2 section arrives as soon as the next one starts
+            sections = timed_iter(iter_sections(iter_response_text(response)), 'parse')
 
-                # Get all paragraphs until next h2
-                current = section.next_sibling
-                details = []
-                while current and (current.name != 'h2'):
-                    if current.name == 'p':
-                        details.append(current.get_text().strip())
-                    current = current.next_sibling
-
-                # Parse details
-                date_info = None
-                who_info = None
-                more_info = []
-
-                for detail in details:
-                    if detail.startswith('Date(s):'):
-                        date_info = detail
-                    elif detail.startswith('Who:'):
-                        who_info = detail
-                    elif detail.startswith('More:'):
-                        # Extract URLs from "More:" section
-                        urls = re.findall(r'https?://[^\s)]+', detail)
-                        more_info.extend(urls)
-
-                # Extract number of people
-                number_removed = None
-                if who_info:
-                    num_match = re.search(r'(\d+)', who_info)
-                    if num_match:
-                        number_removed = int(num_match.group(1))
-
-                # Extract origin nationalities
-                origin_nationalities = []
-                if who_info:
-                    # This is a simplified approach - you might want more sophisticated parsing
-                    nationality_keywords = ['Iranians', 'Russians', 'Venezuelans', 'Cubans', 'Afghans']
-                    for keyword in nationality_keywords:
-                        if keyword[:-1].lower() in who_info.lower():
-                            origin_nationalities.append(keyword[:-1])
-
-                # Parse dates
-                iso_dates = self.parse_date_range(date_info)
+            for country_name, date_info, who_info, more_info in sections:
+                key = section_key(country_name, date_info, who_info)
+                fields = memo.get(key)
+                if fields is None:
+                    fields = self.extract_tracker_section(country_name, date_info, who_info)
+                    memo.put(key, fields)
+                iso_dates = fields['dates'] or today
 
                 # Create entry
                 entry = {
                     "destination_country": country_name,
                     "date": iso_dates[0] if iso_dates else None,
                     "date_range_end": iso_dates[-1] if len(iso_dates) > 1 else None,
-                    "number_removed": number_removed,
-                    "origin_nationalities": origin_nationalities or ["Various"],
+                    "number_removed": fields['number_removed'],
+                    "origin_nationalities": list(fields['origin_nationalities']) or ["Various"],
                     "source_urls": more_info,
                     "notes": who_info or "",
                     "data_source": "Hard G History",
                     "source_url": url,
                     "scraped_at": datetime.now().isoformat()
                 }
+                if fields.get('used_fallback'):
+                    # Not the date of the removal; kept out of its fingerprint and merge key
+                    entry['date_estimated'] = True
 
                 removals_data.append(entry)
 
+            add_bytes(response.raw.tell())
+            memo.save()
+            if memo.hits:
+                print(f"  Hard G History: {memo.hits} sections unchanged, {memo.misses} extracted")
             return removals_data
 
         except Exception as e:
@@ -197,53 +256,43 @@ class MultiSourceScraper:
         """
         Scrape Amnesty USA blog post about third-country deportations
         """
-        url = "https://www.amnestyusa.org/blog/third-country-deportations-another-cruel-piece-of-president-trumps-anti-immigrant-agenda/"
+        url = self.sources['amnesty_usa']['url']
 
         try:
-            response = requests.get(url, timeout=30)
+            response = fetch(url, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with span('parse'):
+                soup = BeautifulSoup(response.content, 'html.parser')
 
-            # Extract article content
-            article_content = soup.find('article') or soup.find('div', class_='entry-content')
-            if not article_content:
-                return []
+                # Extract article content
+                article_content = soup.find('article') or soup.find('div', class_='entry-content')
+                if not article_content:
+                    return []
 
-            # Look for mentions of countries and numbers
-            text_content = article_content.get_text()
+                # Look for mentions of countries and numbers
+                text_content = article_content.get_text()
 
             # Extract potential removal data from text
             removals_data = []
 
-            # Look for country mentions with numbers
-            country_patterns = [
-                r'(\d+)\s+(?:people|migrants|individuals)\s+(?:to|sent to)\s+([A-Z][a-z]+)',
-                r'([A-Z][a-z]+).*?(\d+)\s+(?:people|migrants|individuals)',
-                r'sent\s+(\d+)\s+(?:people|migrants|individuals).*?to\s+([A-Z][a-z]+)'
-            ]
-
-            for pattern in country_patterns:
-                matches = re.findall(pattern, text_content, re.IGNORECASE)
-                for match in matches:
-                    if len(match) == 2:
-                        number, country = match
-                        try:
-                            number_removed = int(number)
-                            entry = {
-                                "destination_country": country.upper(),
-                                "date": None,
-                                "date_range_end": None,
-                                "number_removed": number_removed,
-                                "origin_nationalities": ["Various"],
-                                "source_urls": [url],
-                                "notes": f"Extracted from Amnesty USA article",
-                                "data_source": "Amnesty USA",
-                                "source_url": url,
-                                "scraped_at": datetime.now().isoformat()
-                            }
-                            removals_data.append(entry)
-                        except ValueError:
-                            continue
+            # Look for country mentions with numbers, one sentence at a time
+            with span('extract'):
+                counts = extract_counts(text_content)
+
+            for number_removed, country in counts:
+                entry = {
+                    "destination_country": country.upper(),
+                    "date": None,
+                    "date_range_end": None,
+                    "number_removed": number_removed,
+                    "origin_nationalities": ["Various"],
+                    "source_urls": [url],
+                    "notes": f"Extracted from Amnesty USA article",
+                    "data_source": "Amnesty USA",
+                    "source_url": url,
+                    "scraped_at": datetime.now().isoformat()
+                }
+                removals_data.append(entry)
 
             return removals_data
 
@@ -254,51 +303,37 @@ class MultiSourceScraper:
     def scrape_deportation_data(self):
         """
         Scrape deportation data from deportationdata.org
+
+        HTML tables and linked CSV/Parquet datasets are loaded into DataFrames
+        and mapped to the removal schema (see table_ingest.py).
         """
-        url = "https://deportationdata.org/data/ice.html"
+        url = self.sources['deportation_data']['url']
 
         try:
-            response = requests.get(url, timeout=30)
+            response = fetch(url, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
 
             removals_data = []
 
-            # Look for tables with deportation data
-            tables = soup.find_all('table')
-
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 3:
-                        # Try to extract country and numbers
-                        cell_texts = [cell.get_text().strip() for cell in cells]
-
-                        # Look for patterns like "Country Name: 123"
-                        for i, text in enumerate(cell_texts):
-                            if ':' in text and any(char.isdigit() for char in text):
-                                parts = text.split(':')
-                                if len(parts) == 2:
-                                    country = parts[0].strip()
-                                    number_part = parts[1].strip()
-                                    try:
-                                        number = int(re.search(r'\d+', number_part).group())
-                                        entry = {
-                                            "destination_country": country.upper(),
-                                            "date": None,
-                                            "date_range_end": None,
-                                            "number_removed": number,
-                                            "origin_nationalities": ["Various"],
-                                            "source_urls": [url],
-                                            "notes": f"Extracted from deportation data table",
-                                            "data_source": "Deportation Data Project",
-                                            "source_url": url,
-                                            "scraped_at": datetime.now().isoformat()
-                                        }
-                                        removals_data.append(entry)
-                                    except (ValueError, AttributeError):
-                                        continue
+            # Load every table on the page, and any downloadable datasets, in bulk
+            with span('parse'):
+                frames = read_html_tables(response.text)
+                dataset_urls = find_dataset_links(response.content, url)
+
+            for frame in frames:
+                with span('extract'):
+                    removals_data.extend(ingest_frame(frame, "Deportation Data Project", url))
+
+            for dataset_url in dataset_urls:
+                try:
+                    # Download and parse happen in one pandas call
+                    with span('fetch'):
+                        frame = load_dataset(dataset_url)
+                except Exception as e:
+                    print(f"  Could not load dataset {dataset_url}: {e}")
+                    continue
+                with span('extract'):
+                    removals_data.extend(ingest_frame(frame, "Deportation Data Project", dataset_url))
 
             return removals_data
 
@@ -309,37 +344,45 @@ class MultiSourceScraper:
     def scrape_dhs_ohss(self):
         """
         Scrape DHS OHSS monthly tables for immigration enforcement data
+
+        Every linked monthly table is downloaded and parsed (see
+        ohss_crawler.py) and the removal tables are summed into one record
+        per month. Months repeated by several reports are taken from the
+        newest one.
         """
-        url = "https://ohss.dhs.gov/topics/immigration/immigration-enforcement/monthly-tables"
+        url = self.sources['dhs_ohss']['url']
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            rows = OHSSCrawler().crawl(url)
 
-            removals_data = []
+            # Only the removal tables describe removals; the rest are encounters, book-ins, etc.
+            removal_rows = latest_rows([row for row in rows if 'remov' in (row['table'] + row['url']).lower()])
+            print(f"  Parsed {len(rows)} OHSS table rows, {len(removal_rows)} from removal tables")
 
-            # Look for links to monthly reports
-            links = soup.find_all('a', href=True)
-            report_links = []
+            with span('extract'):
+                by_month = {}
+                for row in removal_rows:
+                    month = by_month.setdefault(row['month'], {'total': 0, 'countries': {}, 'urls': set()})
+                    month['total'] += row['count']
+                    month['countries'][row['country']] = month['countries'].get(row['country'], 0) + row['count']
+                    month['urls'].add(row['url'])
 
-            for link in links:
-                href = link['href']
-                if 'monthly' in href.lower() or 'table' in href.lower():
-                    full_url = urljoin(url, href)
-                    report_links.append(full_url)
+            removals_data = []
+            for month_key, month in sorted(by_month.items()):
+                year, month_number = (int(part) for part in month_key.split('-'))
+                last_day = calendar.monthrange(year, month_number)[1]
+                top_countries = sorted(month['countries'].items(), key=lambda item: -item[1])[:10]
+                nationalities = [(GAZETTEER.lookup(country) or (None, country))[1] for country, _ in top_countries]
 
-            # For now, just return metadata about available reports
-            # In a full implementation, you'd scrape each report
-            if report_links:
                 entry = {
                     "destination_country": "MULTIPLE",
-                    "date": None,
-                    "date_range_end": None,
-                    "number_removed": None,
-                    "origin_nationalities": ["Various"],
-                    "source_urls": report_links[:5],  # Limit to first 5
-                    "notes": f"DHS OHSS monthly reports available: {len(report_links)} reports found",
+                    "date": f"{month_key}-01",
+                    "date_range_end": f"{month_key}-{last_day:02d}",
+                    "number_removed": month['total'],
+                    "origin_nationalities": nationalities or ["Various"],
+                    "source_urls": sorted(month['urls']),
+                    "notes": f"DHS OHSS monthly removals by citizenship ({len(month['countries'])} countries); "
+                             f"largest: {', '.join(f'{country} {count}' for country, count in top_countries)}",
                     "data_source": "DHS OHSS",
                     "source_url": url,
                     "scraped_at": datetime.now().isoformat()
@@ -356,21 +399,21 @@ class MultiSourceScraper:
         """
         Scrape ICE statistics page
         """
-        url = "https://www.ice.gov/statistics"
+        url = self.sources['ice_statistics']['url']
 
         try:
-            response = requests.get(url, timeout=30)
+            response = fetch(url, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            removals_data = []
+            with span('parse'):
+                soup = BeautifulSoup(response.content, 'html.parser')
 
-            # Look for statistics and data
-            stats_content = soup.find_all(['div', 'section'], class_=re.compile(r'(stat|data|number)'))
+                # Look for statistics and data
+                stats_content = soup.find_all(['div', 'section'], class_=re.compile(r'(stat|data|number)'))
+                texts = [content.get_text() for content in stats_content]
 
-            for content in stats_content:
-                text = content.get_text()
+            removals_data = []
 
+            for text in texts:
                 # Look for deportation/removal statistics
                 if any(keyword in text.lower() for keyword in ['deport', 'remov', 'third.country']):
                     # Extract numbers and context
@@ -402,71 +445,100 @@ class MultiSourceScraper:
             print(f"Error scraping ICE Statistics: {e}")
             return []
 
-    def scrape_all_sources(self):
+    def due_sources(self, schedule, force=False):
         """
-        Scrape all enabled sources and combine the data
+        Names of the enabled sources that are due for a refresh (see refresh_schedule.py),
+        or all of them with force
         """
-        all_data = []
+        enabled = [name for name, config in self.sources.items() if config['enabled']]
+        if force:
+            return enabled
+        due = schedule.due(enabled)
+        for name in enabled:
+            if name not in due:
+                print(f"  {name} not due until {schedule.sources[name]['next_due'][:16].replace('T', ' ')}, skipping")
+        return due
+
+    async def scrape_sources_async(self, on_record=None, names=None):
+        """
+        Scrape all enabled sources (or those of them in names) concurrently,
+        yielding (source_name, records) as each source finishes
 
-        for source_name, source_config in self.sources.items():
-            if source_config['enabled']:
-                print(f"Scraping {source_name}...")
-                try:
-                    data = source_config['scraper']()
-                    all_data.extend(data)
-                    print(f"  Found {len(data)} records from {source_name}")
-                except Exception as e:
-                    print(f"  Error scraping {source_name}: {e}")
+        All sources share one AsyncHTTPClient, so I/O from different sites is
+        interleaved and callers can start merging before the slowest source
+        is done.
+        """
+        sources = {name: config for name, config in self.sources.items()
+                   if config['enabled'] and (names is None or name in names)}
+        print(f"Scraping {len(sources)} sources concurrently: {', '.join(sources)}")
+
+        async with AsyncHTTPClient() as client:
+            async for source_name, data, error in iter_source_results(sources, client, on_record):
+                if error is not None:
+                    print(f"  Error scraping {source_name}: {error}")
+                    continue
+                print(f"  Found {len(data)} records from {source_name}")
+                yield source_name, data
 
-                # Be respectful to servers
-                time.sleep(1)
+    def scrape_sources(self, names=None):
+        """
+        Scrape all enabled sources (or those of them in names), keeping each
+        source's records separate
+        """
+        async def collect():
+            return {source_name: data async for source_name, data in self.scrape_sources_async(names=names)}
+
+        return asyncio.run(collect())
 
+    def scrape_all_sources(self):
+        """
+        Scrape all enabled sources and combine the data
+        """
+        all_data = []
+        for data in self.scrape_sources().values():
+            all_data.extend(data)
         return all_data
 
     def add_custom_source(self, name, url, scraper_function=None, enabled=True):
         """
         Add a custom data source
+
+        scraper_function may be a plain function or generator function taking
+        no arguments, or an async function or async generator function. Async
+        scrapers that take one argument are given the shared AsyncHTTPClient
+        (await client.get(url)) so their fetches run concurrently with every
+        other source.
         """
         if scraper_function is None:
             # Create a basic scraper that extracts numbers and countries from text
             def basic_scraper():
                 try:
-                    response = requests.get(url, timeout=30)
+                    response = fetch(url, timeout=30)
                     response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    text_content = soup.get_text()
+                    with span('parse'):
+                        soup = BeautifulSoup(response.content, 'html.parser')
+                        text_content = soup.get_text()
 
                     removals_data = []
 
-                    # Look for country mentions with numbers
-                    country_patterns = [
-                        r'(\d+)\s+(?:people|migrants|individuals)\s+(?:to|sent to)\s+([A-Z][a-z]+)',
-                        r'([A-Z][a-z]+).*?(\d+)\s+(?:people|migrants|individuals)',
-                        r'sent\s+(\d+)\s+(?:people|migrants|individuals).*?to\s+([A-Z][a-z]+)'
-                    ]
-
-                    for pattern in country_patterns:
-                        matches = re.findall(pattern, text_content, re.IGNORECASE)
-                        for match in matches:
-                            if len(match) == 2:
-                                number, country = match
-                                try:
-                                    number_removed = int(number)
-                                    entry = {
-                                        "destination_country": country.upper(),
-                                        "date": None,
-                                        "date_range_end": None,
-                                        "number_removed": number_removed,
-                                        "origin_nationalities": ["Various"],
-                                        "source_urls": [url],
-                                        "notes": f"Extracted from {name}",
-                                        "data_source": name,
-                                        "source_url": url,
-                                        "scraped_at": datetime.now().isoformat()
-                                    }
-                                    removals_data.append(entry)
-                                except ValueError:
-                                    continue
+                    # Look for country mentions with numbers, one sentence at a time
+                    with span('extract'):
+                        counts = extract_counts(text_content)
+
+                    for number_removed, country in counts:
+                        entry = {
+                            "destination_country": country.upper(),
+                            "date": None,
+                            "date_range_end": None,
+                            "number_removed": number_removed,
+                            "origin_nationalities": ["Various"],
+                            "source_urls": [url],
+                            "notes": f"Extracted from {name}",
+                            "data_source": name,
+                            "source_url": url,
+                            "scraped_at": datetime.now().isoformat()
+                        }
+                        removals_data.append(entry)
 
                     return removals_data
 
@@ -482,35 +554,97 @@ class MultiSourceScraper:
             'enabled': enabled
         }
 
-    def update_removals_data(self):
+    def update_removals_data(self, force=False):
         """
-        Update the removals.json file with fresh data from all sources
+        Update the dataset shards with fresh data from the sources that are due
+
+        Only sources due for a refresh are fetched (all of them with force);
+        the refresh schedule adapts to how often each one changes (see
+        refresh_schedule.py). Sources whose normalized records match the fingerprint stored by the
+        previous run are skipped; if no source changed, the dataset is not
+        rewritten at all, and otherwise only the shards that gained or
+        changed records are (their names are left in self.changed_shards).
+        Inserted and updated records are appended to the change log (see
+        changelog.py). Returns the names of the sources that changed.
+
+        Per-source stage timings are appended to the timing log and printed
+        as a table at the end (see instrumentation.py).
         """
-        new_data = self.scrape_all_sources()
+        TIMINGS.reset()
+        try:
+            return asyncio.run(self.update_removals_data_async(force))
+        finally:
+            TIMINGS.emit()
+            TIMINGS.print_summary()
+
+    async def update_removals_data_async(self, force=False):
+        """
+        Async version of update_removals_data that merges each source's
+        records as soon as that source finishes
+        """
+        fingerprints = load_fingerprints()
+        schedule = RefreshSchedule.load()
+
+        self.changed_shards = []
+        names = self.due_sources(schedule, force)
+        if not names:
+            print("No source is due for a refresh")
+            return []
 
         # Load existing data if it exists
-        try:
-            with open('data/removals.json', 'r') as f:
-                existing_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            existing_data = []
+        existing_data = load_records()
 
-        # Merge data (avoid duplicates based on destination country, date, and source)
-        existing_keys = {(item.get('destination_country'), item.get('date'), item.get('data_source')) for item in existing_data}
+        # Merge data (one record per destination country, date, and source)
+        positions = merge_positions(existing_data)
         merged_data = existing_data.copy()
 
-        for new_entry in new_data:
-            key = (new_entry.get('destination_country'), new_entry.get('date'), new_entry.get('data_source'))
-            if key not in existing_keys:
-                merged_data.append(new_entry)
-                existing_keys.add(key)
+        changed_sources = []
+        changes = []
+        async for source_name, data in self.scrape_sources_async(names=names):
+            changed = source_changed(fingerprints, source_name, data)
+            if data:
+                schedule.record(source_name, changed)
+            if not changed:
+                continue
+            changed_sources.append(source_name)
+
+            with span('merge', source_name):
+                changes.extend(merge_source(merged_data, positions, data))
+
+        if not changed_sources:
+            print("No source changed since the last run; skipping merge and write")
+            schedule.save()
+            return changed_sources
+
+        # Save updated data; the change log after the shards, so a failed write retried
+        # by the next run does not log the same changes twice
+        with span('write'):
+            self.changed_shards = write_shards(merged_data)
+            append_changes(changes)
+        save_fingerprints(fingerprints)
+        schedule.save()
+
+        inserts = sum(1 for op, _ in changes if op == INSERT)
+        print(f"Updated data with {inserts} new and {len(changes) - inserts} changed entries "
+              f"from {len(changed_sources)} changed sources: {', '.join(changed_sources)}")
+        return changed_sources
 
-        # Save updated data
-        with open('data/removals.json', 'w') as f:
-            json.dump(merged_data, f, indent=2)
+if __name__ == "__main__":
+    import argparse
 
-        print(f"Updated data with {len(new_data)} new entries from {len([s for s in self.sources.values() if s['enabled']])} sources")
+    parser = argparse.ArgumentParser(description='Update the dataset in data/removals from all enabled sources')
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'], default=os.environ.get('REMOVALS_PROFILE'),
+                        help='Profile the run (also set by REMOVALS_PROFILE)')
+    parser.add_argument('--force', action='store_true', help='Fetch every enabled source, due or not')
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     scraper = MultiSourceScraper()
-    scraper.update_removals_data()
\ No newline at end of file
+    with profiled(args.profile):
+        changed_sources = scraper.update_removals_data(force=args.force)
+
+    # Let the workflow skip validation and the commit on quiet days
+    github_output = os.environ.get('GITHUB_OUTPUT')
+    if github_output:
+        with open(github_output, 'a') as f:
+            f.write(f"changed={'true' if changed_sources else 'false'}\n")
+            f.write(f"shards={' '.join(scraper.changed_shards)}\n")
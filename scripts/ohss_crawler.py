@@ -0,0 +1,334 @@
+"""
+Crawler for the DHS OHSS monthly enforcement tables
+
+The monthly-tables page links to one spreadsheet (XLSX) or CSV per month,
+sometimes through an intermediate page per table. The crawler downloads
+every linked file with a bounded thread pool, parses the files into typed
+rows in a process pool, and caches both the downloads and the parsed rows.
+Cached reports are revalidated with a conditional GET (ETag and
+Last-Modified), so a table revised at the same URL is downloaded again,
+and only files whose content is new are parsed.
+
+Parsed rows are dicts with:
+    table   - sheet or file name the row came from (str)
+    country - country of citizenship (str)
+    month   - 'YYYY-MM' (str)
+    count   - number of people (int)
+    url     - report URL (str)
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from instrumentation import fetch, span
+
+CACHE_DIR = 'data/cache/ohss'
+INDEX_FILE = 'index.json'
+
+REPORT_EXTENSIONS = ('.xlsx', '.csv')
+
+# Header cells that mark the country column of a table
+COUNTRY_HEADER = re.compile(r'country|citizenship|nationality', re.IGNORECASE)
+
+# Rows that are sums of the others rather than a country
+TOTAL_ROW = re.compile(r'^\s*(?:grand\s+)?total|^\s*all\s+countries|^\s*unknown\s*$', re.IGNORECASE)
+
+MONTH_FORMATS = ('%b %Y', '%B %Y', '%b-%y', '%b %y', '%Y-%m', '%m/%Y', '%Y %b', '%Y %B')
+
+
+def is_report_url(url):
+    """Return True if url points at a downloadable monthly table"""
+    return urlparse(url).path.lower().endswith(REPORT_EXTENSIONS)
+
+
+def find_links(html, base_url):
+    """
+    Split the links on a page into report files and same-site table pages
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    host = urlparse(base_url).netloc
+    reports, pages = [], []
+
+    for link in soup.find_all('a', href=True):
+        full_url = urljoin(base_url, link['href']).split('#')[0]
+        if is_report_url(full_url):
+            reports.append(full_url)
+        elif urlparse(full_url).netloc == host and re.search(r'monthly|table', full_url, re.IGNORECASE):
+            pages.append(full_url)
+
+    return list(dict.fromkeys(reports)), list(dict.fromkeys(pages))
+
+
+def parse_month(value):
+    """Return 'YYYY-MM' for a month column header, or None if it is not one"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m')
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime().strftime('%Y-%m')
+
+    text = re.sub(r'\s+', ' ', str(value)).strip().replace('.', '')
+    text = re.sub(r'^(?:FY\s*)?', '', text)
+    for month_format in MONTH_FORMATS:
+        try:
+            return datetime.strptime(text, month_format).strftime('%Y-%m')
+        except ValueError:
+            continue
+    return None
+
+
+def parse_count(value):
+    """Return value as an int, treating suppressed cells ('D', '-', '*') as missing"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if value != value else int(value)
+    text = str(value).replace(',', '').strip()
+    return int(float(text)) if re.fullmatch(r'\d+(?:\.\d+)?', text) else None
+
+
+def parse_frame(frame, table, url):
+    """
+    Turn one raw sheet (no header applied) into typed rows
+
+    The header row is the first row with both a country-like cell and month
+    cells (title rows above it are skipped); every month column becomes one
+    row per country.
+    """
+    rows = []
+    values = frame.values.tolist()
+
+    for header_index, header in enumerate(values[:30]):
+        country_columns = [i for i, cell in enumerate(header) if isinstance(cell, str) and COUNTRY_HEADER.search(cell)]
+        if not country_columns:
+            continue
+        country_column = country_columns[0]
+        month_columns = []
+        for i, cell in enumerate(header):
+            month = parse_month(cell) if i != country_column and cell is not None else None
+            if month:
+                month_columns.append((i, month))
+        if month_columns:
+            break
+    else:
+        return rows
+
+    for line in values[header_index + 1:]:
+        country = line[country_column]
+        if not isinstance(country, str) or not country.strip() or TOTAL_ROW.search(country):
+            continue
+        for column, month in month_columns:
+            count = parse_count(line[column])
+            if count is not None:
+                rows.append({'table': table, 'country': country.strip(), 'month': month,
+                             'count': count, 'url': url})
+
+    return rows
+
+
+def table_identity(table):
+    """
+    Name of a table without the dates and numbers in it
+
+    CSV tables are named after their file, which carries the report's
+    month, so the same table in two reports only matches once those are
+    stripped.
+    """
+    name = os.path.splitext(table)[0] if table.lower().endswith(REPORT_EXTENSIONS) else table
+    return re.sub(r'[\d_\-\s]+', ' ', name).strip().lower()
+
+
+def latest_rows(rows):
+    """
+    Keep one row per (table, country, month): the one from the newest report
+
+    Reports overlap, repeating (and sometimes revising) the months before
+    their own, so summing every report would count those months twice. A
+    report is as new as the latest month it contains.
+    """
+    newest_month = {}
+    for row in rows:
+        newest_month[row['url']] = max(newest_month.get(row['url'], ''), row['month'])
+
+    latest = {}
+    for row in rows:
+        key = (table_identity(row['table']), row['country'], row['month'])
+        current = latest.get(key)
+        if current is None or (newest_month[row['url']], row['url']) > (newest_month[current['url']], current['url']):
+            latest[key] = row
+    return list(latest.values())
+
+
+def parse_report(path, url):
+    """
+    Parse a downloaded XLSX or CSV report into typed rows
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    import pandas as pd
+
+    if path.lower().endswith('.csv'):
+        sheets = {os.path.basename(urlparse(url).path): pd.read_csv(path, header=None, dtype=object)}
+    else:
+        sheets = pd.read_excel(path, sheet_name=None, header=None, dtype=object)
+
+    rows = []
+    for table, frame in sheets.items():
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows.extend(parse_frame(frame, str(table), url))
+    return rows
+
+
+class OHSSCrawler:
+    """
+    Download, parse and cache every monthly table linked from the OHSS page
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_downloads=4, max_parsers=None, timeout=60):
+        self.cache_dir = cache_dir
+        self.max_downloads = max_downloads
+        self.max_parsers = max_parsers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, INDEX_FILE), 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+    def _rows_path(self, content_hash):
+        return os.path.join(self.cache_dir, 'rows', f"{content_hash}.json")
+
+    def discover(self, url):
+        """
+        Return every report URL reachable from url, following table pages one level deep
+        """
+        response = fetch(url, session=self.session, timeout=self.timeout)
+        response.raise_for_status()
+        reports, pages = find_links(response.content, url)
+
+        def page_reports(page_url):
+            try:
+                page = fetch(page_url, session=self.session, timeout=self.timeout)
+                page.raise_for_status()
+                return find_links(page.content, page_url)[0]
+            except requests.RequestException as e:
+                print(f"  Could not read OHSS page {page_url}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=self.max_downloads) as pool:
+            # Worker threads run in a copy of this context so their fetches are timed for the right source
+            context = contextvars.copy_context()
+            for found in pool.map(lambda page: context.copy().run(page_reports, page),
+                                  [page for page in pages if page != url]):
+                reports.extend(found)
+
+        return list(dict.fromkeys(reports))
+
+    def download(self, url):
+        """
+        Fetch one report, or revalidate the cached copy; returns the index entry
+
+        A cached report is requested with If-None-Match / If-Modified-Since
+        and kept on 304 Not Modified. Servers that ignore those headers send
+        the file again, and its hash decides whether it changed.
+        """
+        cached = self.index.get(url)
+        if cached and not os.path.exists(os.path.join(self.cache_dir, cached['file'])):
+            cached = None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = fetch(url, session=self.session, timeout=self.timeout, headers=headers)
+        if cached and response.status_code == 304:
+            return cached
+        response.raise_for_status()
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        filename = f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}{extension}"
+
+        if not cached or cached['sha256'] != content_hash:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                f.write(response.content)
+
+        return {
+            'file': filename,
+            'sha256': content_hash,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': datetime.now().isoformat()
+        }
+
+    def crawl(self, url):
+        """
+        Return the typed rows of every report linked from url
+
+        Reports whose content was parsed before are not parsed again.
+        """
+        report_urls = self.discover(url)
+
+        with ThreadPoolExecutor(max_workers=self.max_downloads) as pool:
+            context = contextvars.copy_context()
+            futures = {report_url: pool.submit(context.copy().run, self.download, report_url)
+                       for report_url in report_urls}
+            for report_url, future in futures.items():
+                try:
+                    self.index[report_url] = future.result()
+                except requests.RequestException as e:
+                    print(f"  Could not download OHSS report {report_url}: {e}")
+
+        # Parse every report whose content has not been parsed before
+        to_parse = {entry['sha256']: report_url for report_url, entry in self.index.items()
+                    if report_url in report_urls and not os.path.exists(self._rows_path(entry['sha256']))}
+        if to_parse:
+            os.makedirs(os.path.join(self.cache_dir, 'rows'), exist_ok=True)
+            with span('parse'), ProcessPoolExecutor(max_workers=self.max_parsers) as pool:
+                futures = {
+                    content_hash: pool.submit(parse_report,
+                                              os.path.join(self.cache_dir, self.index[report_url]['file']),
+                                              report_url)
+                    for content_hash, report_url in to_parse.items()
+                }
+                for content_hash, future in futures.items():
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        print(f"  Could not parse OHSS report {to_parse[content_hash]}: {e}")
+                        continue
+                    with open(self._rows_path(content_hash), 'w') as f:
+                        json.dump(rows, f)
+
+        self._save_index()
+
+        rows = []
+        for report_url in report_urls:
+            entry = self.index.get(report_url)
+            if not entry:
+                continue
+            try:
+                with open(self._rows_path(entry['sha256']), 'r') as f:
+                    rows.extend(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return rows
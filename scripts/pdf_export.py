@@ -0,0 +1,184 @@
+"""
+Chunked, parallel PDF report rendering
+
+reportlab slows down sharply on one long table (every page break
+re-measures the rows that are left), which is why the old exporter only
+printed the first 20 records. Here the detail rows are cut into
+fixed-size chunks of short strings, and each chunk is rendered to its own
+PDF in a process pool, as short tables of ROWS_PER_TABLE rows
+each. The front matter (title, summary and country tables) is rendered
+alongside, and the parts are then concatenated with pypdf. Each worker
+only ever holds one chunk of rows, so memory per worker stays bounded
+whatever the dataset size.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+# Detail rows per worker task
+CHUNK_ROWS = 2000
+
+# Rows per detail table; short tables keep page breaking linear
+ROWS_PER_TABLE = 40
+
+DETAIL_HEADER = ['Country', 'Date', 'Number', 'Nationalities', 'Notes (Truncated)']
+
+
+def detail_row(entry):
+    """Flatten one record into the strings of a detail table row"""
+    notes = entry.get('notes') or ''
+    return [
+        entry.get('destination_country') or '',
+        entry.get('date') or '',
+        str(entry.get('number_removed', '')),
+        ', '.join(entry.get('origin_nationalities') or []),
+        notes.replace('\n', ' ')[:50] + ('...' if len(notes) > 50 else '')
+    ]
+
+
+def table_style(detail=False):
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]
+    if detail:
+        commands.insert(4, ('FONTSIZE', (0, 0), (-1, -1), 8))
+        commands.append(('VALIGN', (0, 0), (-1, -1), 'TOP'))
+    return TableStyle(commands)
+
+
+def render_front(summary_rows, country_rows, has_details, path):
+    """Render the title, summary table, country table and detail heading"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph("Third-Nation Removals Data", styles['Title']),
+        Spacer(1, 12),
+        Paragraph(f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']),
+        Spacer(1, 12),
+        Paragraph("Summary", styles['Heading2']),
+        Spacer(1, 6),
+    ]
+
+    summary_table = Table(summary_rows)
+    summary_table.setStyle(table_style())
+    story += [summary_table, Spacer(1, 12), Paragraph("By Destination Country", styles['Heading2']), Spacer(1, 6)]
+
+    country_table = Table(country_rows, repeatRows=1)
+    country_table.setStyle(table_style())
+    story += [country_table, Spacer(1, 12)]
+
+    if has_details:
+        story += [Paragraph("Detailed Data", styles['Heading2']), Spacer(1, 6)]
+
+    SimpleDocTemplate(path, pagesize=A4).build(story)
+    return path
+
+
+def render_detail_chunk(rows, path):
+    """Render one chunk of detail rows as a run of short tables"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table
+
+    widths = [1.2 * inch, 0.8 * inch, 0.6 * inch, 1.2 * inch, 2 * inch]
+    style = table_style(detail=True)
+    story = []
+    for start in range(0, len(rows), ROWS_PER_TABLE):
+        table = Table([DETAIL_HEADER] + rows[start:start + ROWS_PER_TABLE], colWidths=widths, repeatRows=1)
+        table.setStyle(style)
+        story.append(table)
+
+    SimpleDocTemplate(path, pagesize=A4, topMargin=36, bottomMargin=36).build(story)
+    return path
+
+
+def summary_tables(data):
+    total_people = sum(entry.get('number_removed', 0) for entry in data if entry.get('number_removed'))
+    countries = list(set(entry.get('destination_country', '') for entry in data))
+    summary_rows = [
+        ['Metric', 'Value'],
+        ['Total removal events', str(len(data))],
+        ['Total people removed', str(total_people)],
+        ['Destination countries', str(len(countries))]
+    ]
+
+    country_data = {}
+    for entry in data:
+        stats = country_data.setdefault(entry.get('destination_country') or '', {'events': 0, 'people': 0})
+        stats['events'] += 1
+        if entry.get('number_removed'):
+            stats['people'] += entry['number_removed']
+    country_rows = [['Country', 'Events', 'People Removed']]
+    for country, stats in sorted(country_data.items()):
+        country_rows.append([country, str(stats['events']), str(stats['people'])])
+
+    return summary_rows, country_rows
+
+
+def concatenate(parts, filename):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(part)
+    with open(filename, 'wb') as f:
+        writer.write(f)
+    writer.close()
+
+
+def render_pdf(data, filename, max_workers=None, chunk_rows=CHUNK_ROWS):
+    """
+    Render the full report for data to filename
+
+    Runs in-process when everything fits in one chunk; otherwise the front
+    matter and every chunk are rendered in parallel and joined in order.
+    Only a couple of chunks per worker are flattened and queued at a time.
+    """
+    summary_rows, country_rows = summary_tables(data)
+    chunk_count = (len(data) + chunk_rows - 1) // chunk_rows
+
+    def chunk(i):
+        return [detail_row(entry) for entry in data[i * chunk_rows:(i + 1) * chunk_rows]]
+
+    workdir = tempfile.mkdtemp(prefix='removals-pdf-', dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        front = os.path.join(workdir, 'front.pdf')
+        paths = [os.path.join(workdir, f"chunk_{i:05d}.pdf") for i in range(chunk_count)]
+
+        if chunk_count <= 1:
+            render_front(summary_rows, country_rows, chunk_count > 0, front)
+            for i, path in enumerate(paths):
+                render_detail_chunk(chunk(i), path)
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = {pool.submit(render_front, summary_rows, country_rows, True, front)}
+                for i, path in enumerate(paths):
+                    if len(pending) >= 2 * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(pool.submit(render_detail_chunk, chunk(i), path))
+                for future in pending:
+                    future.result()
+
+        concatenate([front] + paths, filename)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return filename
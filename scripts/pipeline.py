@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Run the whole update as one pipeline: scrape, merge, validate, write and export
+
+Usage:
+    python scripts/pipeline.py                 # resumes an unfinished run
+    python scripts/pipeline.py --fresh         # scrape again even after a failed run
+    python scripts/pipeline.py --skip export
+    python scripts/pipeline.py --force         # fetch every source, due or not
+
+Stages form a DAG and pass the dataset to each other in memory, so it is
+read from disk once and never reparsed:
+
+    load ----\\
+              merge -> validate -> write -> snapshot
+    scrape --/                  \\-> export
+
+Stages whose dependencies are done run concurrently in a thread pool (load
+alongside scrape, write alongside export). A stage's cache key hashes its
+name, version and the outputs of the stages it depends on. Its output is
+stored under data/cache/pipeline/ with that key, and a later run with the
+same inputs reuses it instead of running the stage again. load reads the
+dataset as it is now and is never cached. scrape's output is only reused
+to resume a run that did not finish, so a re-run after, say, a failed
+export does not fetch every source again and picks up at the stage that
+failed. A run is resumed at most once, and only within MAX_RESUME_AGE of
+its start: a failure that repeats on the same scraped data (validation
+rejecting it, say) must not stop every later run from scraping again, so
+a resumed run that fails also drops the stored scrape output.
+
+snapshot writes the binary copy of the dataset the API maps (see
+binary_snapshot.py) once the shards it describes are written.
+
+scrape only fetches the sources that are due (see refresh_schedule.py);
+write records the outcome in the schedule. Stages with side effects on
+disk (write, snapshot) are never cached, so a quiet run that merges
+nothing new still records its checks.
+"""
+
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+CACHE_DIR = 'data/cache/pipeline'
+
+# Older unfinished runs are not resumed; their scraped data is out of date
+MAX_RESUME_AGE = timedelta(hours=12)
+
+# Stage caching policies
+ALWAYS = 'always'
+ON_RESUME = 'resume'
+NEVER = 'never'
+
+
+class StageFailed(Exception):
+    """Raised by a stage whose output must not reach its dependents"""
+
+
+def output_hash(output):
+    """Stable hash of a JSON-serializable stage output"""
+    return hashlib.sha256(json.dumps(output, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Stage:
+    """One node of the pipeline: func(inputs) -> JSON-serializable output"""
+
+    def __init__(self, name, func, deps=(), version=1, cache=ALWAYS):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.version = version
+        self.cache = cache
+
+    def key(self, hashes):
+        """Cache key from the output hashes of the dependencies"""
+        parts = [self.name, str(self.version)] + [hashes[dep] for dep in self.deps]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order, concurrently where possible, with cached outputs
+
+    The state of the last run (each stage's key and status) is kept in
+    state.json in the cache directory; a run that did not succeed is
+    resumed by the next one, unless it was itself a resumed run or started
+    more than MAX_RESUME_AGE ago.
+    """
+
+    def __init__(self, stages, cache_dir=CACHE_DIR, max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    def cache_path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage.name}-{key}.json")
+
+    def load_cached(self, stage, key):
+        try:
+            with open(self.cache_path(stage, key), 'r') as f:
+                return True, json.load(f)['output']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return False, None
+
+    def store(self, stage, key, output):
+        """Save a stage's output under its key, replacing its older outputs"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(stage, key)
+        for old_path in glob.glob(os.path.join(self.cache_dir, f"{stage.name}-*.json")):
+            if old_path != path:
+                os.remove(old_path)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'stage': stage.name, 'key': key, 'output': output}, f)
+        os.replace(tmp_path, path)
+
+    def discard(self, stage):
+        """Remove every stored output of a stage"""
+        for path in glob.glob(os.path.join(self.cache_dir, f"{stage.name}-*.json")):
+            os.remove(path)
+
+    def resumable(self, previous, now=None):
+        """Whether the run described by previous (the last state) should be resumed"""
+        if previous.get('status') in (None, 'succeeded') or previous.get('resumed'):
+            return False
+        try:
+            started = datetime.fromisoformat(previous['started'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (now or datetime.now()) - started <= MAX_RESUME_AGE
+
+    def state_path(self):
+        return os.path.join(self.cache_dir, 'state.json')
+
+    def load_state(self):
+        try:
+            with open(self.state_path(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_state(self, state):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.state_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def run(self, skip=(), fresh=False):
+        """
+        Run every stage not in skip (nor depending on one); return {stage name: output}
+
+        Raises StageFailed if any stage failed, after the stages that did not
+        depend on it have finished.
+        """
+        previous = self.load_state()
+        resuming = not fresh and self.resumable(previous)
+        if resuming:
+            print(f"Resuming the unfinished run started {previous.get('started')}")
+        elif not fresh and previous.get('status') not in (None, 'succeeded'):
+            print(f"Not resuming the unfinished run started {previous.get('started')}; starting afresh")
+
+        skipped = set(skip)
+        for name, stage in self.stages.items():
+            if any(dep in skipped for dep in stage.deps):
+                skipped.add(name)
+
+        state = {'started': datetime.now().isoformat(), 'status': 'running', 'resumed': resuming, 'stages': {}}
+        self.save_state(state)
+
+        outputs, hashes, failed = {}, {}, set()
+        pending = [name for name in self.stages if name not in skipped]
+        running = {}
+
+        def start(pool, name):
+            stage = self.stages[name]
+            key = stage.key(hashes)
+            cached = stage.cache == ALWAYS or (stage.cache == ON_RESUME and resuming)
+            if cached:
+                found, output = self.load_cached(stage, key)
+                if found:
+                    print(f"[{name}] reusing cached output")
+                    state['stages'][name] = {'key': key, 'status': 'cached', 'seconds': 0.0}
+                    return None, (key, output)
+            print(f"[{name}] running")
+            inputs = {dep: outputs[dep] for dep in stage.deps}
+            return pool.submit(timed_call, stage.func, inputs), key
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                progressed = False
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(dep in failed for dep in deps):
+                        pending.remove(name)
+                        failed.add(name)
+                        state['stages'][name] = {'status': 'blocked'}
+                        progressed = True
+                        continue
+                    if not all(dep in outputs for dep in deps):
+                        continue
+                    pending.remove(name)
+                    progressed = True
+                    future, result = start(pool, name)
+                    if future is None:
+                        key, output = result
+                        outputs[name], hashes[name] = output, output_hash(output)
+                    else:
+                        running[future] = (name, result)
+
+                if not running:
+                    if not progressed:
+                        raise ValueError(f"Dependency cycle between stages: {', '.join(pending)}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        output, seconds = future.result()
+                    except Exception as e:
+                        print(f"[{name}] failed: {e}")
+                        failed.add(name)
+                        state['stages'][name] = {'key': key, 'status': 'failed', 'error': str(e)}
+                        self.save_state(state)
+                        continue
+                    outputs[name], hashes[name] = output, output_hash(output)
+                    if stage.cache != NEVER:
+                        self.store(stage, key, output)
+                    state['stages'][name] = {'key': key, 'status': 'done', 'seconds': round(seconds, 3)}
+                    self.save_state(state)
+                    print(f"[{name}] done in {seconds:.2f}s")
+
+        state['status'] = 'failed' if failed else 'succeeded'
+        state['finished'] = datetime.now().isoformat()
+        self.save_state(state)
+        if failed and resuming:
+            # The same inputs failed twice; the next run starts from a new scrape
+            for stage in self.stages.values():
+                if stage.cache == ON_RESUME:
+                    self.discard(stage)
+        if failed:
+            raise StageFailed(f"Failed or blocked stages: {', '.join(sorted(failed))}")
+        return outputs
+
+
+def timed_call(func, inputs):
+    start = time.perf_counter()
+    output = func(inputs)
+    return output, time.perf_counter() - start
+
+
+# Stages of the update pipeline
+
+def load_stage(inputs):
+    """The dataset and the source fingerprints as they are on disk now"""
+    from fingerprints import load_fingerprints
+    from shards import load_records
+    return {'records': load_records(), 'fingerprints': load_fingerprints()}
+
+
+def scrape_stage(inputs, force=False):
+    """The records of each source due for a refresh (every source with force)"""
+    from instrumentation import TIMINGS
+    from multi_source_scraper import MultiSourceScraper
+    from refresh_schedule import RefreshSchedule
+
+    scraper = MultiSourceScraper()
+    names = scraper.due_sources(RefreshSchedule.load(), force)
+    if not names:
+        print("No source is due for a refresh")
+        return {}
+    TIMINGS.reset()
+    try:
+        return scraper.scrape_sources(names)
+    finally:
+        TIMINGS.emit()
+        TIMINGS.print_summary()
+
+
+def merge_stage(inputs):
+    """Merge the sources that changed since the last run into the dataset"""
+    from multi_source_scraper import merge_positions, merge_source, source_changed
+
+    existing_data = inputs['load']['records']
+    fingerprints = dict(inputs['load']['fingerprints'])
+    positions = merge_positions(existing_data)
+    merged_data = existing_data.copy()
+
+    changed_sources = []
+    checked_sources = []
+    changes = []
+    for source_name, data in inputs['scrape'].items():
+        if data:
+            checked_sources.append(source_name)
+        if source_changed(fingerprints, source_name, data):
+            changed_sources.append(source_name)
+            changes.extend(merge_source(merged_data, positions, data))
+
+    print(f"Merged {len(changes)} new or changed entries from {len(changed_sources)} changed sources")
+    return {'records': merged_data, 'changes': changes, 'changed_sources': changed_sources,
+            'checked_sources': checked_sources, 'fingerprints': fingerprints}
+
+
+def validate_stage(inputs):
+    from validate import validate_entries
+
+    records = inputs['merge']['records']
+    if not validate_entries(enumerate(records)):
+        raise StageFailed("validation failed")
+    return {'valid': True, 'records': len(records)}
+
+
+def write_stage(inputs):
+    from changelog import append_changes
+    from fingerprints import save_fingerprints
+    from refresh_schedule import RefreshSchedule
+    from shards import write_shards
+
+    merge = inputs['merge']
+    schedule = RefreshSchedule.load()
+    for source_name in merge['checked_sources']:
+        schedule.record(source_name, source_name in merge['changed_sources'])
+
+    if not merge['changed_sources']:
+        print("No source changed since the last run; nothing to write")
+        schedule.save()
+        return {'changed_shards': []}
+    # The change log after the shards: a write that fails is redone by the resumed run,
+    # which would otherwise log the same changes again under new sequence numbers
+    changed_shards = write_shards(merge['records'])
+    append_changes(merge['changes'])
+    save_fingerprints(merge['fingerprints'])
+    schedule.save()
+    return {'changed_shards': changed_shards}
+
+
+def snapshot_stage(inputs):
+    from binary_snapshot import BINARY_FILE, write_binary
+
+    written = write_binary(inputs['merge']['records'])
+    print(f"{'Wrote' if written else 'Kept the current'} {BINARY_FILE}")
+    return {'written': written}
+
+
+def export_stage(inputs):
+    from export_cache import export_cached
+    from export_data import EXPORTERS
+
+    results = export_cached(inputs['merge']['records'], EXPORTERS)
+    return {format_name: filename for format_name, filename, _ in results}
+
+
+def update_pipeline(force=False):
+    return Pipeline([
+        Stage('load', load_stage, cache=NEVER),
+        Stage('scrape', functools.partial(scrape_stage, force=force), cache=ON_RESUME),
+        Stage('merge', merge_stage, ['load', 'scrape']),
+        Stage('validate', validate_stage, ['merge']),
+        Stage('write', write_stage, ['merge', 'validate'], cache=NEVER),
+        Stage('snapshot', snapshot_stage, ['merge', 'write'], cache=NEVER),
+        Stage('export', export_stage, ['merge', 'validate']),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Scrape, merge, validate, write and export in one run')
+    parser.add_argument('--fresh', action='store_true', help='Do not resume an unfinished run')
+    parser.add_argument('--skip', default='', help='Comma-separated stages to skip (with everything after them)')
+    parser.add_argument('--force', action='store_true', help='Fetch every enabled source, due or not')
+    args = parser.parse_args()
+
+    try:
+        outputs = update_pipeline(args.force).run(skip=[name for name in args.skip.split(',') if name], fresh=args.fresh)
+    except StageFailed as e:
+        print(e)
+        sys.exit(1)
+
+    # Let the workflow skip the commit on quiet days
+    github_output = os.environ.get('GITHUB_OUTPUT')
+    if github_output:
+        changed_shards = outputs.get('write', {}).get('changed_shards', [])
+        with open(github_output, 'a') as f:
+            f.write(f"changed={'true' if changed_shards else 'false'}\n")
@@ -0,0 +1,211 @@
+"""
+Route logic shared by the Flask API (api.py) and the ASGI API (api_async.py)
+
+Each function takes a dataset Snapshot (see dataset_store.py) and returns
+the JSON-ready response body, so both servers answer identically.
+
+cached() serves the JSON routes from the snapshot's response cache: a
+body is built and serialized once per snapshot and query, and identical
+requests that arrive while it is being built wait for it rather than
+building it again, so a burst of the same query costs one computation.
+"""
+
+import csv
+import io
+import json
+
+from export_data import CSV_FIELDS, flatten_entry
+from timeseries import GROUPINGS, INTERVALS, parse_day
+
+API_VERSION = "1.0"
+
+# Records per chunk of a streamed response: large enough to keep per-chunk
+# overhead low, small enough that the first bytes leave immediately
+STREAM_BATCH = 500
+
+
+def all_removals(snapshot):
+    """Body of /api/v1/removals: every record with metadata"""
+    return {
+        "metadata": {
+            "total_entries": len(snapshot.records),
+            "last_updated": snapshot.mtime,
+            "version": API_VERSION
+        },
+        "data": list(snapshot.records)
+    }
+
+
+def summary(snapshot):
+    """Body of /api/v1/removals/summary"""
+    return snapshot.summary
+
+
+def by_country(snapshot, country):
+    """Body of /api/v1/removals/country/<country>: records for one destination, any case"""
+    return snapshot.by_country.get(country.lower(), [])
+
+
+def iter_ndjson(snapshot, batch_size=STREAM_BATCH):
+    """Yield the records as newline-delimited JSON, a batch of lines per chunk"""
+    records = snapshot.records
+    for start in range(0, len(records), batch_size):
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records[start:start + batch_size])
+
+
+def iter_csv(snapshot, batch_size=STREAM_BATCH):
+    """Yield the records as CSV (the export_data.py columns), a batch of rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+
+    records = snapshot.records
+    for start in range(0, len(records), batch_size):
+        writer.writerows(flatten_entry(record) for record in records[start:start + batch_size])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        # Header only: no records
+        yield buffer.getvalue()
+
+
+def timeseries(snapshot, args):
+    """
+    Body of /api/v1/removals/timeseries
+
+    args is the query string mapping: interval (day, week or month;
+    default month), group_by (country or source), start and end
+    (YYYY-MM-DD), and country or source (not both, and only the
+    group_by dimension when grouping). Raises ValueError for bad values.
+    """
+    interval = args.get('interval', 'month')
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+    grouping = args.get('group_by') or None
+    if grouping not in GROUPINGS:
+        raise ValueError("group_by must be country or source")
+
+    bounds = {}
+    for name in ('start', 'end'):
+        value = args.get(name)
+        bounds[name] = parse_day(value)
+        if value and bounds[name] is None:
+            raise ValueError(f"{name} must be a YYYY-MM-DD date")
+
+    series = snapshot.timeseries
+    return {
+        "interval": interval,
+        "group_by": grouping,
+        "undated_events": series.undated,
+        "buckets": series.query(interval, grouping, bounds['start'], bounds['end'],
+                                args.get('country'), args.get('source'))
+    }
+
+
+# Results per search response
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def search(snapshot, args):
+    """
+    Body of /api/v1/removals/search
+
+    args: q (the query) and limit (default 20, at most 100). Raises
+    ValueError for a missing query or bad limit.
+    """
+    query = (args.get('q') or '').strip()
+    if not query:
+        raise ValueError("q is required")
+    try:
+        limit = int(args.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be a number")
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+    total, results = snapshot.search.search(query, limit)
+    return {
+        "query": query,
+        "total_matches": total,
+        "results": [{"score": round(score, 4), "record": record} for score, record in results]
+    }
+
+
+# Changes per change feed response
+CHANGES_LIMIT = 1000
+MAX_CHANGES_LIMIT = 10000
+
+
+def changes(snapshot, args):
+    """
+    Body of /api/v1/removals/changes
+
+    args: since (the last sequence number the client applied; default 0,
+    everything) and limit (default 1000, at most 10000). Clients pass
+    next_since back as since until has_more is false. Raises ValueError
+    for bad values.
+    """
+    try:
+        since = int(args.get('since', 0))
+        limit = int(args.get('limit', CHANGES_LIMIT))
+    except ValueError:
+        raise ValueError("since and limit must be numbers")
+    if since < 0:
+        raise ValueError("since must not be negative")
+    limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+
+    log = snapshot.changes
+    page = log.since(since, limit)
+    next_since = page[-1]['seq'] if page else since
+    return {
+        "since": since,
+        "latest_seq": log.latest,
+        "next_since": next_since,
+        "has_more": next_since < log.latest,
+        "changes": page
+    }
+
+
+def render(body):
+    """JSON bytes as Flask's jsonify writes them (sorted keys, compact, ASCII, trailing newline)"""
+    return json.dumps(body, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def removals_query(snapshot, args):
+    return all_removals(snapshot)
+
+
+def summary_query(snapshot, args):
+    return summary(snapshot)
+
+
+def country_query(snapshot, args):
+    return by_country(snapshot, args['country'])
+
+
+# Route name -> (query function, the arguments it reads)
+QUERIES = {
+    'removals': (removals_query, ()),
+    'summary': (summary_query, ()),
+    'country': (country_query, ('country',)),
+    'timeseries': (timeseries, ('interval', 'group_by', 'start', 'end', 'country', 'source')),
+    'search': (search, ('q', 'limit')),
+    'changes': (changes, ('since', 'limit')),
+}
+
+
+def cached(snapshot, name, args=None):
+    """
+    Rendered body of query name for args, from the snapshot's response cache
+
+    Only the arguments the query reads are part of the cache key, so extra
+    query string parameters do not fragment it. Raises ValueError like the
+    query itself; errors are not cached.
+    """
+    query, params = QUERIES[name]
+    args = args or {}
+    key = (name,) + tuple(args.get(param) for param in params)
+    used = {param: args[param] for param in params if args.get(param) is not None}
+    return snapshot.responses.get(key, lambda: render(query(snapshot, used)))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-source refresh intervals, adapted to how often each source changes
+
+Sources change at very different rates (Hard G History several times a
+week, DHS OHSS monthly, ICE statistics rarely), so an update run only
+fetches the sources that are due. After each fetch a source's interval
+is adjusted from its fingerprint (see fingerprints.py):
+
+- unchanged: the interval backs off by BACKOFF, up to MAX_INTERVAL_DAYS
+- changed: the interval drops to half the time since its previous change
+  (MIN_INTERVAL_DAYS after its first), so a source is checked about twice
+  per change
+
+A fetch that failed or found nothing leaves the schedule alone, so the
+source is retried on the next run. Sources not in the schedule yet are
+due immediately.
+
+The schedule is kept in data/cache/refresh_schedule.json, next to the
+other caches the workflow keeps between runs; if it is lost, the next run
+simply fetches every source. Show it with:
+
+    python scripts/refresh_schedule.py
+    python scripts/refresh_schedule.py reset dhs_ohss   # due on the next run
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+SCHEDULE_FILE = 'data/cache/refresh_schedule.json'
+SCHEDULE_VERSION = 1
+
+MIN_INTERVAL_DAYS = 1.0
+MAX_INTERVAL_DAYS = 14.0
+BACKOFF = 1.5
+
+# Runs start at slightly different times; a source due within this long counts as due
+DUE_SLACK = timedelta(hours=3)
+
+
+class RefreshSchedule:
+    """
+    Refresh state by source name
+
+    Each source has its interval_days, next_due, last_checked and
+    last_changed (ISO timestamps) and counts of checks and changes.
+    """
+
+    def __init__(self, sources=None, path=SCHEDULE_FILE):
+        self.sources = sources if sources is not None else {}
+        self.path = path
+
+    @classmethod
+    def load(cls, path=SCHEDULE_FILE):
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path=path)
+        if state.get('version') != SCHEDULE_VERSION:
+            return cls(path=path)
+        return cls(state.get('sources', {}), path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'version': SCHEDULE_VERSION, 'sources': self.sources}, f, indent=2, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
+
+    def is_due(self, name, now=None):
+        state = self.sources.get(name)
+        if state is None:
+            return True
+        now = now or datetime.now()
+        return datetime.fromisoformat(state['next_due']) <= now + DUE_SLACK
+
+    def due(self, names, now=None):
+        """The names that are due, in their given order"""
+        now = now or datetime.now()
+        return [name for name in names if self.is_due(name, now)]
+
+    def record(self, name, changed, now=None):
+        """Adjust a source's interval after a successful fetch; changed is whether its fingerprint changed"""
+        now = now or datetime.now()
+        state = self.sources.get(name) or {'interval_days': MIN_INTERVAL_DAYS, 'last_changed': None,
+                                           'checks': 0, 'changes': 0}
+
+        if changed:
+            if state['last_changed']:
+                since_change = now - datetime.fromisoformat(state['last_changed'])
+                interval = since_change.total_seconds() / 86400 / 2
+            else:
+                interval = MIN_INTERVAL_DAYS
+            state['last_changed'] = now.isoformat()
+            state['changes'] += 1
+        else:
+            interval = state['interval_days'] * BACKOFF
+
+        interval = max(MIN_INTERVAL_DAYS, min(interval, MAX_INTERVAL_DAYS))
+        state['interval_days'] = round(interval, 3)
+        state['last_checked'] = now.isoformat()
+        state['next_due'] = (now + timedelta(days=interval)).isoformat()
+        state['checks'] += 1
+        self.sources[name] = state
+
+    def reset(self, names=None):
+        """Forget the state of names (default: every source), making them due"""
+        for name in list(self.sources) if names is None else names:
+            self.sources.pop(name, None)
+
+
+def print_schedule(schedule, now=None):
+    now = now or datetime.now()
+    if not schedule.sources:
+        print(f"No sources scheduled yet in {schedule.path}; every source is due")
+        return
+    print(f"{'source':<24} {'interval':>9} {'next due':<17} {'last changed':<17} {'changes':>12}")
+    for name, state in sorted(schedule.sources.items()):
+        next_due = 'now' if schedule.is_due(name, now) else state['next_due'][:16].replace('T', ' ')
+        last_changed = (state['last_changed'] or 'never')[:16].replace('T', ' ')
+        changes = f"{state['changes']}/{state['checks']}"
+        print(f"{name:<24} {state['interval_days']:>8.1f}d {next_due:<17} {last_changed:<17} {changes:>12}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show or reset the per-source refresh schedule')
+    parser.add_argument('command', nargs='?', choices=['show', 'reset'], default='show')
+    parser.add_argument('sources', nargs='*', help='Sources to reset (default: all)')
+    parser.add_argument('--path', default=SCHEDULE_FILE)
+    args = parser.parse_args()
+
+    schedule = RefreshSchedule.load(args.path)
+    if args.command == 'reset':
+        schedule.reset(args.sources or None)
+        schedule.save()
+    print_schedule(schedule)
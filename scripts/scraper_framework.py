@@ -1,10 +1,13 @@
 import requests
-from bs4 import BeautifulSoup
 import re
-import json
 from datetime import datetime, timedelta
 import dateparser
 
+from changelog import INSERT, append_changes
+from gazetteer import origin_nationalities
+from section_walker import iter_response_text, iter_sections
+from shards import load_records, write_shards
+
 def parse_date_range(date_text):
     """
     Parse complex date ranges like 'Sept. 5-6, 2025' or 'Sept. 30-Oct. 1, 2025'
@@ -14,7 +17,7 @@ def parse_date_range(date_text):
         return [datetime.now().strftime('%Y-%m-%d')]
 
     # Remove "Date(s):" prefix if present
-    date_text = re.sub(r'^Date$[^:]*:', '', date_text).strip()
+    date_text = re.sub(r'^\s*Date\(s\)[^:]*:', '', date_text).strip()
 
     # Handle ranges with hyphens
     if '-' in date_text and ',' in date_text:
@@ -79,42 +82,14 @@ def scrape_hard_g_history():
     url = "https://hardghistory.ghost.io/tracking-all-of-trumps-third-country-removals-that-we-know-of/"
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, stream=True)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find country sections (h2 tags followed by details)
-        country_sections = soup.find_all('h2')
         removals_data = []
 
-        for section in country_sections:
-            country_name = section.get_text().strip()
-            if not country_name:
-                continue
-
-            # Get all paragraphs until next h2
-            current = section.next_sibling
-            details = []
-            while current and (current.name != 'h2'):
-                if current.name == 'p':
-                    details.append(current.get_text().strip())
-                current = current.next_sibling
-
-            # Parse details
-            date_info = None
-            who_info = None
-            more_info = []
-
-            for detail in details:
-                if detail.startswith('Date(s):'):
-                    date_info = detail
-                elif detail.startswith('Who:'):
-                    who_info = detail
-                elif detail.startswith('More:'):
-                    # Extract URLs from "More:" section
-                    urls = re.findall(r'https?://[^\s)]+', detail)
-                    more_info.extend(urls)
+        # Walk the page once, chunk by chunk; each h2 section arrives as soon as the next one starts
+        sections = iter_sections(iter_response_text(response))
 
+        for country_name, date_info, who_info, more_info in sections:
             # Extract number of people
             number_removed = None
             if who_info:
@@ -122,14 +97,8 @@ def scrape_hard_g_history():
                 if num_match:
                     number_removed = int(num_match.group(1))
 
-            # Extract origin nationalities
-            origin_nationalities = []
-            if who_info:
-                # This is a simplified approach - you might want more sophisticated parsing
-                nationality_keywords = ['Iranians', 'Russians', 'Venezuelans', 'Cubans', 'Afghans']
-                for keyword in nationality_keywords:
-                    if keyword[:-1].lower() in who_info.lower():
-                        origin_nationalities.append(keyword[:-1])
+            # Extract origin nationalities (countries and demonyms, one gazetteer pass)
+            nationalities = origin_nationalities(who_info, country_name)
 
             # Parse dates
             iso_dates = parse_date_range(date_info)
@@ -140,7 +109,7 @@ def scrape_hard_g_history():
                 "date": iso_dates[0] if iso_dates else None,
                 "date_range_end": iso_dates[-1] if len(iso_dates) > 1 else None,
                 "number_removed": number_removed,
-                "origin_nationalities": origin_nationalities or ["Various"],
+                "origin_nationalities": nationalities or ["Various"],
                 "source_urls": more_info,
                 "notes": who_info or ""
             }
@@ -155,30 +124,28 @@ def scrape_hard_g_history():
 
 def update_removals_data():
     """
-    Update the removals.json file with fresh data
+    Update the dataset shards with fresh data
     """
     new_data = scrape_hard_g_history()
 
     # Load existing data if it exists
-    try:
-        with open('data/removals.json', 'r') as f:
-            existing_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        existing_data = []
+    existing_data = load_records()
 
     # Merge data (avoid duplicates based on destination country and date)
     existing_keys = {(item.get('destination_country'), item.get('date')) for item in existing_data}
     merged_data = existing_data.copy()
+    inserted = []
 
     for new_entry in new_data:
         key = (new_entry.get('destination_country'), new_entry.get('date'))
         if key not in existing_keys:
             merged_data.append(new_entry)
+            inserted.append((INSERT, new_entry))
             existing_keys.add(key)
 
-    # Save updated data
-    with open('data/removals.json', 'w') as f:
-        json.dump(merged_data, f, indent=2)
+    # Save updated data, then log it
+    write_shards(merged_data)
+    append_changes(inserted)
 
     print(f"Updated data with {len(new_data)} new entries")
 
@@ -0,0 +1,142 @@
+"""
+Plugin runner for scraper functions
+
+A scraper registered with MultiSourceScraper.add_custom_source can be any of:
+
+- a plain function returning a list of records (the original interface)
+- a generator function yielding records one at a time
+- an async function returning a list of records
+- an async generator function yielding records
+
+Async scrapers that take one argument receive the runner's shared
+AsyncHTTPClient, so their fetches interleave with those of every other
+source. Synchronous scrapers run in worker threads.
+"""
+
+import asyncio
+import inspect
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import current_source, span
+
+
+class AsyncHTTPClient:
+    """
+    Shared HTTP client handed to async scrapers
+
+    Requests are made with a pooled requests.Session in worker threads, with
+    a global cap on concurrent requests and a smaller cap per host so no
+    single site is hammered.
+    """
+
+    def __init__(self, max_connections=10, max_per_host=2, timeout=30):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    async def get(self, url, **kwargs):
+        """Fetch url and return the requests.Response once its body has been read"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+
+        kwargs.setdefault('timeout', self.timeout)
+        async with self._host_semaphores[host], self._semaphore:
+            with span('fetch') as fields:
+                response = await asyncio.to_thread(self.session.get, url, **kwargs)
+                if not kwargs.get('stream'):
+                    fields['bytes'] = len(response.content)
+            return response
+
+    def close(self):
+        self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def accepts_client(scraper):
+    """Return True if the scraper takes the shared HTTP client as an argument"""
+    try:
+        return len(inspect.signature(scraper).parameters) >= 1
+    except (TypeError, ValueError):
+        return False
+
+
+async def iter_scraper_records(scraper, client):
+    """
+    Run any supported kind of scraper and yield its records as they arrive
+    """
+    if inspect.isasyncgenfunction(scraper):
+        args = (client,) if accepts_client(scraper) else ()
+        async for record in scraper(*args):
+            yield record
+
+    elif inspect.iscoroutinefunction(scraper):
+        args = (client,) if accepts_client(scraper) else ()
+        for record in await scraper(*args) or []:
+            yield record
+
+    elif inspect.isgeneratorfunction(scraper):
+        generator = scraper()
+        exhausted = object()
+        while True:
+            record = await asyncio.to_thread(next, generator, exhausted)
+            if record is exhausted:
+                break
+            yield record
+
+    else:
+        for record in await asyncio.to_thread(scraper) or []:
+            yield record
+
+
+async def iter_source_results(sources, client, on_record=None):
+    """
+    Run every enabled source concurrently and yield (name, records, error)
+    as each one finishes
+
+    on_record(name, record), if given, is called for each record the moment
+    its source produces it.
+    """
+    queue = asyncio.Queue()
+
+    async def run(name, config):
+        # Each task has its own context, so spans in this source's scraper
+        # (and the worker threads it starts) are attributed to it
+        current_source.set(name)
+        records = []
+        try:
+            with span('scrape') as fields:
+                async for record in iter_scraper_records(config['scraper'], client):
+                    records.append(record)
+                    if on_record:
+                        on_record(name, record)
+                fields['records'] = len(records)
+        except Exception as e:
+            await queue.put((name, None, e))
+            return
+        await queue.put((name, records, None))
+
+    tasks = [asyncio.create_task(run(name, config))
+             for name, config in sources.items() if config['enabled']]
+    try:
+        for _ in tasks:
+            yield await queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,88 @@
+"""
+Per-section memo of extraction results for tracker pages
+
+A tracker page like Hard G History changes a section or two at a time,
+but every run used to re-extract the counts, nationalities and dates of
+every section. SectionMemo keeps each section's extracted fields under a
+hash of the text they were extracted from, in data/cache/sections/, so
+a run only extracts the sections that were added or edited.
+
+The text is normalized only in ways extraction ignores (surrounding
+whitespace and line endings): the gazetteer matches multi-word names
+literally, so collapsing inner whitespace could change its results.
+
+A date that could not be parsed falls back to the day of the run (the
+extractor sets used_fallback), so it is stored as None and read back as
+the day of the next run. Keys include
+the current year, since dates without one are read as this year's, and
+the memo is dropped when EXTRACTION_VERSION changes, which it should
+whenever the extraction rules do. Entries not used by a run are dropped
+when it saves the memo.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+MEMO_DIR = 'data/cache/sections'
+
+# Bump when the extraction of a section changes, to invalidate every stored result
+EXTRACTION_VERSION = 2
+
+
+def normalize_text(text):
+    return (text or '').replace('\r\n', '\n').strip()
+
+
+def section_key(*texts):
+    """Hash of a section's normalized texts (and the current year)"""
+    digest = hashlib.sha256(str(datetime.now().year).encode('utf-8'))
+    for text in texts:
+        digest.update(b'\x1f')
+        digest.update(normalize_text(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SectionMemo:
+    """Extraction results by section key, for one source"""
+
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, source, memo_dir=MEMO_DIR):
+        path = os.path.join(memo_dir, f"{source}.json")
+        try:
+            with open(path, 'r') as f:
+                memo = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if memo.get('version') != EXTRACTION_VERSION:
+            return cls(path)
+        return cls(path, memo.get('sections', {}))
+
+    def get(self, key):
+        """The stored fields for a section, or None if it has to be extracted"""
+        fields = self.entries.get(key)
+        if fields is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = fields
+        return fields
+
+    def put(self, key, fields):
+        """Store a section's fields; fallback dates are stored as None"""
+        self.used[key] = dict(fields, dates=None) if fields.get('used_fallback') else fields
+
+    def save(self):
+        """Store the results used or added by this run, dropping the rest"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'version': EXTRACTION_VERSION, 'sections': self.used}, f, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
@@ -0,0 +1,165 @@
+"""
+Streaming section walker for the Hard G History tracker page
+
+The tracker lists one country per <h2>, followed by "Date(s):", "Who:" and
+"More:" paragraphs. Instead of building a DOM and walking the siblings of
+every heading, the walker is fed HTML chunk by chunk and emits a
+(country, date, who, more) tuple as soon as the next heading closes the
+previous section.
+"""
+
+import codecs
+import re
+from collections import deque
+from html.parser import HTMLParser
+
+URL_PATTERN = re.compile(r'https?://[^\s)]+')
+
+# Paragraph label (text before the colon) -> section field
+PARAGRAPH_LABELS = {
+    'Date(s)': 'date',
+    'Who': 'who',
+    'More': 'more'
+}
+LONGEST_LABEL = max(len(label) for label in PARAGRAPH_LABELS) + 1
+
+IGNORED_TAGS = {'script', 'style'}
+
+# Elements that never have an end tag and so never open a nesting level
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+             'meta', 'param', 'source', 'track', 'wbr'}
+
+
+class SectionWalker(HTMLParser):
+    """
+    Incremental HTML parser that turns <h2> sections into tuples
+
+    Only paragraphs that are siblings of the heading belong to its section,
+    as with the DOM walk this replaces: a section ends at the next <h2> or
+    when the heading's parent element closes. Call feed() with successive
+    chunks of the page, collect finished sections with drain(), and call
+    close() once the page has been read.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = deque()
+        self.open_tags = []
+        self.section = None
+        self.section_depth = None
+        self.heading = None
+        self.paragraph = None
+        self.ignored_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        if tag == 'p' and self.open_tags and self.open_tags[-1] == 'p':
+            # An unclosed <p> is implicitly closed by the next one
+            self.handle_endtag('p')
+
+        if tag in IGNORED_TAGS:
+            self.ignored_depth += 1
+        elif tag == 'h2':
+            self._finish_paragraph()
+            self._finish_section()
+            self.heading = []
+            self.section_depth = len(self.open_tags)
+        elif tag == 'p' and self.section is not None and len(self.open_tags) == self.section_depth:
+            self.paragraph = []
+
+        self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            if self.open_tags.pop() == tag:
+                break
+
+        if tag in IGNORED_TAGS:
+            self.ignored_depth = max(0, self.ignored_depth - 1)
+        elif tag == 'h2' and self.heading is not None:
+            country = ''.join(self.heading).strip()
+            self.heading = None
+            # Sections under an empty heading are skipped, like the DOM scraper did
+            self.section = {'country': country, 'date': None, 'who': None, 'more': []} if country else None
+        elif tag == 'p':
+            self._finish_paragraph()
+
+        if self.section is not None and len(self.open_tags) < self.section_depth:
+            self._finish_paragraph()
+            self._finish_section()
+
+    def handle_data(self, data):
+        if self.ignored_depth:
+            return
+        if self.heading is not None:
+            self.heading.append(data)
+        elif self.paragraph is not None:
+            self.paragraph.append(data)
+
+    def close(self):
+        super().close()
+        self._finish_paragraph()
+        self._finish_section()
+
+    def drain(self):
+        """Yield and forget the sections completed so far"""
+        while self.sections:
+            yield self.sections.popleft()
+
+    def _finish_paragraph(self):
+        if self.paragraph is None:
+            return
+        text = ''.join(self.paragraph).strip()
+        self.paragraph = None
+
+        colon = text.find(':', 0, LONGEST_LABEL)
+        field = PARAGRAPH_LABELS.get(text[:colon]) if colon > 0 else None
+        if field == 'more':
+            self.section['more'].extend(URL_PATTERN.findall(text))
+        elif field:
+            self.section[field] = text
+
+    def _finish_section(self):
+        if self.section is not None:
+            section = self.section
+            self.sections.append((section['country'], section['date'], section['who'], section['more']))
+        self.section = None
+
+
+def iter_sections(chunks):
+    """
+    Yield (country, date, who, more) tuples from an iterable of HTML text chunks
+    """
+    walker = SectionWalker()
+    for chunk in chunks:
+        walker.feed(chunk)
+        yield from walker.drain()
+    walker.close()
+    yield from walker.drain()
+
+
+def iter_response_text(response, chunk_size=65536):
+    """
+    Decode a streamed requests response into text chunks
+
+    requests falls back to ISO-8859-1 for text/html without a charset, which
+    mangles UTF-8 pages, so UTF-8 is assumed unless a charset was declared.
+    """
+    content_type = response.headers.get('Content-Type', '')
+    encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
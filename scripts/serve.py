@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Production server for the API (gunicorn)
+
+Usage:
+    python scripts/serve.py                                  # 0.0.0.0:8000, 2 x CPUs + 1 workers
+    python scripts/serve.py --workers 8 --threads 4 --bind 127.0.0.1:9000
+
+The dataset is loaded and indexed once in the master process before any
+worker is forked, so every worker shares the same snapshot pages
+copy-on-write instead of parsing the file itself. With a binary snapshot
+(see binary_snapshot.py) the master only maps it, and the workers share
+its pages through the page cache. gc.freeze() moves the
+preloaded objects out of the garbage collector's reach, so collections in
+the workers do not write to (and so copy) those pages.
+
+A watcher thread in the master polls the data file. When it changes, the
+master loads the new snapshot and sends itself SIGHUP: gunicorn then forks
+fresh workers from the updated master and lets the old ones finish their
+in-flight requests before exiting.
+
+Each worker counts its own requests, so /metrics runs in the metrics
+registry's multiprocess mode (see metrics.py), in PROMETHEUS_MULTIPROC_DIR
+or a temporary directory; whichever worker answers a scrape reports the
+totals of all of them.
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+import api
+from metrics import MULTIPROC_ENV, REGISTRY
+
+
+class APIServer(BaseApplication):
+    """Gunicorn application that serves api.app with the dataset preloaded"""
+
+    def __init__(self, options, watch_interval=5.0):
+        self.options = options
+        self.watch_interval = watch_interval
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('when_ready', self.when_ready)
+
+    def load(self):
+        # Runs once in the master because preload_app is set
+        api.store.auto_reload = False
+        preload_dataset()
+        return api.app
+
+    def when_ready(self, server):
+        if self.watch_interval:
+            thread = threading.Thread(target=watch_dataset, args=(server, self.watch_interval), daemon=True)
+            thread.start()
+
+
+def preload_dataset():
+    """Load the dataset into the master and freeze it for copy-on-write sharing"""
+    snapshot = api.store.reload()
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded {len(snapshot.records)} records from {api.store.path}")
+
+
+def watch_dataset(server, interval):
+    """
+    Poll the data file from the master; on a change, reload it and restart the workers
+    """
+    while True:
+        time.sleep(interval)
+        if not api.store.changed():
+            continue
+        try:
+            # Unfreeze so the old snapshot can be collected once no worker needs it
+            gc.unfreeze()
+            preload_dataset()
+        except Exception as e:
+            server.log.error(f"Could not reload {api.store.path}: {e}")
+            continue
+        server.log.info("Dataset changed; gracefully restarting workers")
+        os.kill(server.pid, signal.SIGHUP)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the removals API with gunicorn')
+    parser.add_argument('--bind', default=os.environ.get('REMOVALS_API_BIND', '0.0.0.0:8000'))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('REMOVALS_API_WORKERS', multiprocessing.cpu_count() * 2 + 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('REMOVALS_API_THREADS', 1)),
+                        help='Threads per worker (more than 1 uses the gthread worker)')
+    parser.add_argument('--timeout', type=int, default=30, help='Seconds before a silent worker is restarted')
+    parser.add_argument('--watch-interval', type=float, default=5.0,
+                        help='Seconds between checks of the data file (0 disables reloading)')
+    args = parser.parse_args()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'preload_app': True,
+    }
+    metrics_dir = os.environ.get(MULTIPROC_ENV) or tempfile.mkdtemp(prefix='removals-metrics-')
+    REGISTRY.enable_multiprocess(metrics_dir, clear=True)
+    APIServer(options, watch_interval=args.watch_interval).run()
+
+
+if __name__ == "__main__":
+    main()
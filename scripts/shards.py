@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Sharded on-disk layout of the dataset
+
+Records are stored one JSON object per line in
+data/removals/<year>/<month>/<source>.jsonl, partitioned by the month of
+their date and their data_source (records without a usable date go to
+data/removals/undated/<source>.jsonl). data/removals/manifest.json lists
+every shard with its record count, SHA-256, size, month, source and
+destination countries, so readers can pick the shards a query needs
+without opening the others, and tell which shards changed since they
+last read them.
+
+write_shards() only rewrites the shards whose content changed and writes
+the manifest last, so a reader that sees a new manifest always finds the
+shards it describes. Readers fall back to the old single file,
+data/removals.json, until the dataset has been migrated:
+
+    python scripts/shards.py migrate
+"""
+
+import hashlib
+import json
+import os
+import re
+
+DATASET_DIR = 'data/removals'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+MONTH = re.compile(r'^(\d{4})-(\d{2})')
+
+
+def legacy_file(root=DATASET_DIR):
+    """The single-file dataset the shards replace: data/removals.json for data/removals"""
+    return root + '.json'
+
+
+def source_slug(source):
+    return re.sub(r'[^a-z0-9]+', '-', (source or 'unknown').lower()).strip('-') or 'unknown'
+
+
+def record_month(record):
+    """'YYYY-MM' of the record's date, or None without a usable date"""
+    match = MONTH.match(record.get('date') or '')
+    return f"{match.group(1)}-{match.group(2)}" if match else None
+
+
+def shard_name(record):
+    """Path of the shard holding record, relative to the dataset directory"""
+    month = record_month(record)
+    directory = month.replace('-', '/') if month else 'undated'
+    return f"{directory}/{source_slug(record.get('data_source'))}.jsonl"
+
+
+def partition(records):
+    """Return {shard name: [records]}, keeping the records' order within each shard"""
+    shards = {}
+    for record in records:
+        shards.setdefault(shard_name(record), []).append(record)
+    return shards
+
+
+def shard_content(records):
+    return ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+
+
+def shard_entry(records, content):
+    """Manifest entry describing one shard"""
+    return {
+        'records': len(records),
+        'sha256': hashlib.sha256(content).hexdigest(),
+        'bytes': len(content),
+        'month': record_month(records[0]),
+        'source': records[0].get('data_source'),
+        'countries': sorted({record.get('destination_country') or '' for record in records})
+    }
+
+
+def manifest_path(root=DATASET_DIR):
+    return os.path.join(root, MANIFEST_NAME)
+
+
+def load_manifest(root=DATASET_DIR):
+    """Return the manifest, or None if the dataset has not been sharded"""
+    try:
+        with open(manifest_path(root), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_shards(records, root=DATASET_DIR):
+    """
+    Store records as shards, writing only the shards whose content changed
+
+    Shards that no longer hold any record are deleted, and so is the
+    single-file dataset if it is still there. Returns the sorted names of
+    the shards written or deleted.
+    """
+    manifest = load_manifest(root) or {}
+    old_shards = manifest.get('shards', {})
+    shards = {}
+    changed = []
+
+    for name, shard_records in sorted(partition(records).items()):
+        content = shard_content(shard_records)
+        entry = shard_entry(shard_records, content)
+        path = os.path.join(root, name)
+        if old_shards.get(name, {}).get('sha256') != entry['sha256'] or not os.path.exists(path):
+            write_atomic(path, content)
+            changed.append(name)
+        shards[name] = entry
+
+    for name in sorted(set(old_shards) - set(shards)):
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            os.remove(path)
+        try:
+            os.removedirs(os.path.dirname(path))
+        except OSError:
+            pass
+        changed.append(name)
+
+    if changed or not manifest:
+        # Last, so the manifest never describes shards that are not written yet
+        write_atomic(manifest_path(root), json.dumps({
+            'version': MANIFEST_VERSION,
+            'records': len(records),
+            'shards': shards
+        }, indent=2, sort_keys=True).encode('utf-8'))
+
+    if os.path.exists(legacy_file(root)):
+        os.remove(legacy_file(root))
+
+    return sorted(changed)
+
+
+def select_shards(manifest, start=None, end=None, source=None, country=None):
+    """
+    Names of the shards that can hold records matching the filters
+
+    start and end are 'YYYY-MM' months (inclusive); undated shards only
+    match when neither is given. source and country compare without case.
+    """
+    names = []
+    for name, entry in sorted(manifest['shards'].items()):
+        month = entry.get('month')
+        if (start or end) and (month is None or (start and month < start) or (end and month > end)):
+            continue
+        if source and (entry.get('source') or '').lower() != source.lower():
+            continue
+        if country and country.lower() not in (c.lower() for c in entry.get('countries', [])):
+            continue
+        names.append(name)
+    return names
+
+
+def read_shard(root, name):
+    """Return (SHA-256 of the file, its records)"""
+    with open(os.path.join(root, name), 'rb') as f:
+        content = f.read()
+    records = [json.loads(line) for line in content.decode('utf-8').splitlines() if line.strip()]
+    return hashlib.sha256(content).hexdigest(), records
+
+
+def load_shards(root=DATASET_DIR, names=None, previous=None):
+    """
+    Return {shard name: (SHA-256, records)} for the named shards (default: all)
+
+    Shards whose hash in the manifest matches their entry in previous (a
+    dict returned by an earlier call) are reused without being read.
+    """
+    manifest = load_manifest(root)
+    if manifest is None:
+        return {}
+    previous = previous or {}
+    shards = {}
+    for name in (sorted(manifest['shards']) if names is None else names):
+        entry = manifest['shards'].get(name)
+        if entry is None:
+            continue
+        if name in previous and previous[name][0] == entry['sha256']:
+            shards[name] = previous[name]
+            continue
+        try:
+            shards[name] = read_shard(root, name)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Could not read shard {name}: {e}")
+    return shards
+
+
+def record_matches(record, start=None, end=None, source=None, country=None):
+    """The record-level version of the select_shards filters"""
+    month = record_month(record)
+    if (start or end) and (month is None or (start and month < start) or (end and month > end)):
+        return False
+    if source and (record.get('data_source') or '').lower() != source.lower():
+        return False
+    return not country or (record.get('destination_country') or '').lower() == country.lower()
+
+
+def load_records(root=DATASET_DIR, **filters):
+    """
+    Return the dataset's records, or those matching filters (see select_shards)
+
+    With filters, only the shards that can hold matching records are read.
+    Before migration, the single-file dataset is read instead.
+    """
+    manifest = load_manifest(root)
+    if manifest is None:
+        try:
+            with open(legacy_file(root), 'r') as f:
+                records = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+    else:
+        names = select_shards(manifest, **filters) if filters else None
+        records = [record for _, shard_records in load_shards(root, names).values() for record in shard_records]
+    if filters:
+        records = [record for record in records if record_matches(record, **filters)]
+    return records
+
+
+def dataset_signature(root=DATASET_DIR):
+    """(mtime_ns, size) of the manifest (or of the single file before migration); None if neither exists"""
+    for path in (manifest_path(root), legacy_file(root)):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        return (stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def migrate(root=DATASET_DIR):
+    """Split the single-file dataset into shards"""
+    if load_manifest(root) is not None:
+        print(f"Nothing to migrate: {root} is already sharded")
+        return []
+    records = load_records(root)
+    if not records:
+        print(f"Nothing to migrate: {legacy_file(root)} is missing or empty")
+        return []
+    changed = write_shards(records, root)
+    print(f"Migrated {len(records)} records from {legacy_file(root)} into {len(changed)} shards under {root}")
+    return changed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the sharded dataset layout')
+    parser.add_argument('command', choices=['migrate', 'list'])
+    parser.add_argument('--root', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        migrate(args.root)
+    else:
+        manifest = load_manifest(args.root)
+        if manifest is None:
+            print(f"{args.root} is not sharded yet")
+        else:
+            for name, entry in sorted(manifest['shards'].items()):
+                print(f"{name:<40} {entry['records']:>8} {entry['sha256'][:12]}")
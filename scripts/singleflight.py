@@ -0,0 +1,105 @@
+"""
+Coalescing of concurrent identical work
+
+SingleFlight.do(key, func) runs func once for every burst of callers that
+ask for the same key at the same time: the first caller runs it, and the
+others block until it finishes and get the same result (or exception).
+Nothing is remembered afterwards.
+
+ResponseCache adds a bounded LRU of results on top, for values that stay
+valid as long as the cache does (it is kept per dataset snapshot, so its
+entries go away with the snapshot).
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def in_flight(self, key):
+        return key in self.calls
+
+    def do(self, key, func):
+        """
+        Return func(), or the result of the identical call already running
+
+        Returns (result, shared), where shared is True for callers that
+        waited on another caller's call instead of running func.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class ResponseCache:
+    """
+    Results by key, computed once, with concurrent misses coalesced
+
+    At most max_entries results are kept, least recently used first out.
+    Errors are not cached. counter, if given, is incremented with
+    result=hit, miss or shared.
+    """
+
+    def __init__(self, max_entries=256, counter=None):
+        self.max_entries = max_entries
+        self.counter = counter
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+
+    def count(self, result):
+        if self.counter is not None:
+            self.counter.inc(result=result)
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.count('hit')
+                return self.entries[key]
+
+        def compute_and_store():
+            value = compute()
+            with self.lock:
+                self.entries[key] = value
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return value
+
+        value, shared = self.flights.do(key, compute_and_store)
+        self.count('shared' if shared else 'miss')
+        return value
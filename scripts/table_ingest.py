@@ -0,0 +1,189 @@
+"""
+Vectorized table ingestion for tabular sources such as deportationdata.org
+
+HTML tables are loaded with one pandas.read_html call and downloadable
+CSV/Parquet datasets with read_csv/read_parquet. Columns are mapped to the
+removal schema by name, and rows are grouped into removal events with
+pandas operations instead of a Python loop over every cell.
+"""
+
+import re
+from datetime import datetime
+from io import StringIO
+from urllib.parse import urljoin, urlparse
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from gazetteer import GAZETTEER
+
+DATASET_EXTENSIONS = ('.csv', '.csv.gz', '.parquet')
+
+# Normalized column name -> removal schema field. Generic names ('country',
+# 'total', 'n') are left out: in summary tables they are as likely to be a
+# citizenship column or a sum over some other dimension.
+COLUMN_ALIASES = {
+    'destination_country': ['destination_country', 'departure_country', 'country_of_removal',
+                            'removal_country', 'destination'],
+    'date': ['removal_date', 'departure_date', 'date', 'date_of_removal', 'month'],
+    'number_removed': ['number_removed', 'removals', 'count', 'people'],
+    'nationality': ['citizenship_country', 'country_of_citizenship', 'citizenship', 'nationality'],
+}
+
+# "Country Name: 123" inside a single cell: exactly one colon, digits after it
+CELL_PAIR = r'^\s*([^:]*?)\s*:[^:\d]*(\d+)[^:]*$'
+
+
+def normalize_column(name):
+    """'Departure Country' -> 'departure_country'"""
+    return re.sub(r'[^0-9a-z]+', '_', str(name).strip().lower()).strip('_')
+
+
+def map_columns(frame):
+    """
+    Return {schema field: column name} for the columns of frame that match COLUMN_ALIASES
+    """
+    normalized = {normalize_column(column): column for column in frame.columns}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            column = normalized.get(alias)
+            if column is not None and column not in mapping.values():
+                mapping[field] = column
+                break
+    return mapping
+
+
+def read_html_tables(html):
+    """Load every <table> in html into DataFrames in one call"""
+    try:
+        return pd.read_html(StringIO(html))
+    except ValueError:
+        # No tables on the page
+        return []
+
+
+def find_dataset_links(html, base_url):
+    """Return the CSV/Parquet download links on a page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for link in soup.find_all('a', href=True):
+        full_url = urljoin(base_url, link['href'])
+        if urlparse(full_url).path.lower().endswith(DATASET_EXTENSIONS):
+            links.append(full_url)
+    return list(dict.fromkeys(links))
+
+
+def load_dataset(url):
+    """
+    Load a downloadable CSV or Parquet dataset into a DataFrame
+
+    Parquet needs pyarrow (pip install pyarrow); it is optional because the
+    site's HTML tables and CSV files do not need it.
+    """
+    if urlparse(url).path.lower().endswith('.parquet'):
+        return pd.read_parquet(url)
+    return pd.read_csv(url, low_memory=False)
+
+
+def make_entry(destination, date, number, origins, source_name, source_url, notes):
+    return {
+        "destination_country": destination,
+        "date": date,
+        "date_range_end": None,
+        "number_removed": number,
+        "origin_nationalities": origins or ["Various"],
+        "source_urls": [source_url],
+        "notes": notes,
+        "data_source": source_name,
+        "source_url": source_url,
+        "scraped_at": datetime.now().isoformat()
+    }
+
+
+def frame_to_records(frame, source_name, source_url):
+    """
+    Convert a table with recognisable columns into one record per
+    (destination, date), with counts summed and nationalities collected
+
+    Without a count column each row is counted as one person, but only in
+    event-level tables (with date and citizenship columns); other tables
+    are skipped rather than guessed at.
+    """
+    mapping = map_columns(frame)
+    if 'destination_country' not in mapping:
+        return []
+    if 'number_removed' not in mapping and not {'date', 'nationality'} <= mapping.keys():
+        return []
+
+    columns = {
+        'destination_country': frame[mapping['destination_country']].astype('string').str.strip().str.upper(),
+        'date': (pd.to_datetime(frame[mapping['date']], errors='coerce').dt.strftime('%Y-%m-%d')
+                 if 'date' in mapping else pd.Series(pd.NA, index=frame.index, dtype='string')),
+        # Event-level tables have one row per person removed
+        'number_removed': (pd.to_numeric(frame[mapping['number_removed']].astype('string').str.replace(',', ''),
+                                         errors='coerce')
+                           if 'number_removed' in mapping else pd.Series(1, index=frame.index)),
+        'nationality': (frame[mapping['nationality']].astype('string').str.strip().str.title()
+                        if 'nationality' in mapping else pd.Series(pd.NA, index=frame.index, dtype='string')),
+    }
+    table = pd.DataFrame(columns).dropna(subset=['destination_country'])
+    table = table[table['destination_country'] != '']
+    if table.empty:
+        return []
+
+    # Citizenship columns hold country names; look each distinct one up once
+    demonyms = {name: (GAZETTEER.lookup(name) or (None, name))[1]
+                for name in table['nationality'].dropna().unique()}
+    table['nationality'] = table['nationality'].map(demonyms, na_action='ignore')
+
+    keys = ['destination_country', 'date']
+    totals = table.groupby(keys, dropna=False, sort=False)['number_removed'].sum(min_count=1)
+    # Ten most frequent nationalities per event, ranked with one group-size pass
+    nationality_counts = (table.dropna(subset=['nationality'])
+                          .groupby(keys + ['nationality'], dropna=False, sort=False).size()
+                          .rename('rows').reset_index()
+                          .sort_values('rows', ascending=False, kind='stable'))
+    nationalities = (nationality_counts.groupby(keys, dropna=False, sort=False).head(10)
+                     .groupby(keys, dropna=False, sort=False)['nationality'].agg(list))
+    grouped = pd.DataFrame({'number_removed': totals, 'origin_nationalities': nationalities}).reset_index()
+
+    notes = f"Extracted from {source_name} table columns: {', '.join(str(c) for c in mapping.values())}"
+    records = []
+    for destination, date, number, origins in grouped.itertuples(index=False, name=None):
+        records.append(make_entry(destination,
+                                  None if pd.isna(date) else date,
+                                  None if pd.isna(number) else int(number),
+                                  origins if isinstance(origins, list) else None,
+                                  source_name, source_url, notes))
+    return records
+
+
+def cell_pairs_to_records(frame, source_name, source_url):
+    """
+    Extract "Country: 123" cells from a table without recognisable columns
+
+    This is the old cell-by-cell heuristic (rows with at least three cells
+    only) expressed as a single vectorized string extraction.
+    """
+    if frame.shape[1] < 3:
+        return []
+
+    # Header cells count too: the old scraper read <th> and <td> alike
+    header = pd.Series([str(column) for column in frame.columns], dtype='string')
+    cells = pd.concat([header, frame.astype('string').stack()], ignore_index=True)
+    pairs = cells.str.extract(CELL_PAIR).dropna()
+    if pairs.empty:
+        return []
+
+    notes = "Extracted from deportation data table"
+    return [make_entry(country.upper(), None, int(number), None, source_name, source_url, notes)
+            for country, number in pairs.itertuples(index=False, name=None)]
+
+
+def ingest_frame(frame, source_name, source_url):
+    """Map a table to removal records, by column names if possible, else by cell pairs"""
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame = frame.copy()
+        frame.columns = [' '.join(str(part) for part in column if 'Unnamed' not in str(part)) for column in frame.columns]
+    return frame_to_records(frame, source_name, source_url) or cell_pairs_to_records(frame, source_name, source_url)
@@ -0,0 +1,206 @@
+"""
+Daily, weekly and monthly rollups of removal events
+
+Every dated record is spread over the days from its date to its
+date_range_end (inclusive): number_removed is divided evenly between those
+days, so a 31-day OHSS month contributes a 31st of its total to each day
+and all of it to its month, and a two-day flight that crosses a month
+boundary is split between both months. A record counts as one event in
+every bucket its range overlaps. Records without a usable date are only
+counted in `undated`, and so are records marked date_estimated, whose
+date is only the day they were scraped (see fingerprints.py).
+
+Rollups are kept for every interval and every grouping (none, destination
+country, data source). TimeSeries.updated() produces the rollups for a
+new version of the dataset by subtracting the records that disappeared or
+changed and adding the new ones, instead of recomputing everything.
+"""
+
+from datetime import date, timedelta
+
+from fingerprints import keyed_records
+
+INTERVALS = ('day', 'week', 'month')
+GROUPINGS = (None, 'country', 'source')
+
+# Ranges longer than this are treated as bad data and counted on their start day only
+MAX_SPAN_DAYS = 366
+
+
+def parse_day(value):
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def bucket_start(day, interval):
+    """First day of the bucket that contains day"""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_label(start, interval):
+    if interval == 'month':
+        return start.strftime('%Y-%m')
+    if interval == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    return start.isoformat()
+
+
+def record_days(record):
+    """Return (first day, number of days) covered by a record, or None if it has no usable date"""
+    if record.get('date_estimated'):
+        return None
+    start = parse_day(record.get('date'))
+    if start is None:
+        return None
+    end = parse_day(record.get('date_range_end')) or start
+    days = (end - start).days + 1
+    if days < 1 or days > MAX_SPAN_DAYS:
+        days = 1
+    return start, days
+
+
+def contributions(record):
+    """
+    Yield (interval, bucket start, events, people) for one record
+
+    events is 1 for every bucket the record overlaps; people is the share
+    of number_removed that falls on the bucket's days.
+    """
+    span = record_days(record)
+    if span is None:
+        return
+    start, days = span
+    per_day = (record.get('number_removed') or 0) / days
+
+    for interval in INTERVALS:
+        overlap = {}
+        for offset in range(days):
+            bucket = bucket_start(start + timedelta(days=offset), interval)
+            overlap[bucket] = overlap.get(bucket, 0) + 1
+        for bucket, overlap_days in overlap.items():
+            yield interval, bucket, 1, per_day * overlap_days
+
+
+def group_value(record, grouping):
+    if grouping == 'country':
+        return record.get('destination_country') or 'Unknown'
+    if grouping == 'source':
+        return record.get('data_source') or 'Unknown'
+    return None
+
+
+class TimeSeries:
+    """
+    Rollups for one version of the dataset; treat instances as read-only
+
+    tables[(interval, grouping)] maps a bucket start date to
+    {group: (events, people)} (the group is None when not grouping).
+    """
+
+    def __init__(self, tables=None, records=None, undated=0):
+        self.tables = tables if tables is not None else {(i, g): {} for i in INTERVALS for g in GROUPINGS}
+        # (merge key, occurrence) -> (content hash, record) of every record included
+        self.records = records if records is not None else {}
+        self.undated = undated
+
+    @classmethod
+    def build(cls, records):
+        return cls().updated(records)
+
+    def updated(self, records):
+        """
+        Return the rollups for a new list of records, reusing this one's
+
+        Only records whose merge key is new, gone, or whose content changed
+        are touched; everything else is carried over.
+        """
+        new_records = {key: (content_hash(record), record) for key, record in keyed_records(records)}
+
+        removed = [entry[1] for key, entry in self.records.items()
+                   if key not in new_records or new_records[key][0] != entry[0]]
+        added = [entry[1] for key, entry in new_records.items()
+                 if key not in self.records or self.records[key][0] != entry[0]]
+
+        if not removed and not added:
+            return TimeSeries(self.tables, new_records, self.undated)
+
+        # Copy the two outer levels; cells are tuples, so they are replaced rather than changed
+        tables = {name: {bucket: dict(groups) for bucket, groups in table.items()}
+                  for name, table in self.tables.items()}
+        series = TimeSeries(tables, new_records, self.undated)
+        for record in removed:
+            series.apply(record, -1)
+        for record in added:
+            series.apply(record, 1)
+        return series
+
+    def apply(self, record, sign):
+        """Add (sign=1) or subtract (sign=-1) one record's contributions"""
+        touched = False
+        for interval, bucket, events, people in contributions(record):
+            touched = True
+            for grouping in GROUPINGS:
+                table = self.tables[(interval, grouping)]
+                groups = table.setdefault(bucket, {})
+                group = group_value(record, grouping)
+                cell = groups.get(group, (0, 0.0))
+                cell = (cell[0] + sign * events, cell[1] + sign * people)
+                if cell[0] <= 0:
+                    groups.pop(group, None)
+                    if not groups:
+                        del table[bucket]
+                else:
+                    groups[group] = cell
+        if not touched:
+            self.undated += sign
+
+    def query(self, interval='month', grouping=None, start=None, end=None, country=None, source=None):
+        """
+        Return the buckets of one rollup as a list of dicts, oldest first
+
+        start and end (dates) limit the buckets by their first day. country
+        or source keep only that group: of the grouping in use, or, when not
+        grouping, of the dimension filtered on. Only one dimension is rolled
+        up per table, so filtering on both, or on the one not grouped by,
+        raises ValueError.
+        """
+        filters = [name for name, value in (('country', country), ('source', source)) if value]
+        if len(filters) > 1 or (grouping and filters and filters != [grouping]):
+            raise ValueError("filter on at most one of country and source, and only on the group_by dimension")
+        dimension = grouping or (filters[0] if filters else None)
+        table = self.tables[(interval, dimension)]
+        wanted = {'country': country, 'source': source}.get(dimension)
+
+        buckets = []
+        for bucket in sorted(table):
+            if (start and bucket < start) or (end and bucket > end):
+                continue
+            groups = table[bucket]
+            if wanted is not None:
+                groups = {name: cell for name, cell in groups.items() if name.lower() == wanted.lower()}
+                if not groups:
+                    continue
+            row = {
+                "period": bucket_label(bucket, interval),
+                "start": bucket.isoformat(),
+                "events": sum(cell[0] for cell in groups.values()),
+                "people": round(sum(cell[1] for cell in groups.values()), 2)
+            }
+            if grouping:
+                row["groups"] = {name: {"events": cell[0], "people": round(cell[1], 2)}
+                                 for name, cell in sorted(groups.items())}
+            buckets.append(row)
+        return buckets
+
+
+def content_hash(record):
+    """Hash of the fields that decide a record's contributions"""
+    return hash((record.get('date'), record.get('date_range_end'), record.get('date_estimated'),
+                 record.get('number_removed'), record.get('destination_country'), record.get('data_source')))
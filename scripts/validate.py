@@ -1,65 +1,167 @@
+import hashlib
 import json
+import os
 import sys
 from datetime import datetime
 
-def validate_removals_data(filepath):
+from shards import load_manifest, manifest_path, shard_name
+
+def validate_entries(entries):
     """
-    Validate the structure and content of removals.json
+    Validate the structure and content of (label, entry) pairs
     """
-    try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+    required_fields = {'destination_country', 'date', 'number_removed', 'origin_nationalities'}
+    optional_fields = {'date_range_end', 'date_estimated', 'agency', 'flight_numbers', 'aircraft_types',
+                      'imprisoned', 'ongoing', 'source_urls', 'notes'}
 
-        if not isinstance(data, list):
-            print("Error: Data must be a list")
-            return False
+    valid = True
+    for i, entry in entries:
+        if not isinstance(entry, dict):
+            print(f"Error: Entry {i} is not a dictionary")
+            valid = False
+            continue
 
-        required_fields = {'destination_country', 'date', 'number_removed', 'origin_nationalities'}
-        optional_fields = {'date_range_end', 'agency', 'flight_numbers', 'aircraft_types',
-                          'imprisoned', 'ongoing', 'source_urls', 'notes'}
+        # Check required fields
+        missing_fields = required_fields - set(entry.keys())
+        if missing_fields:
+            print(f"Error: Entry {i} missing required fields: {missing_fields}")
+            valid = False
 
-        valid = True
-        for i, entry in enumerate(data):
-            if not isinstance(entry, dict):
-                print(f"Error: Entry {i} is not a dictionary")
+        # Validate date format
+        if entry.get('date'):
+            try:
+                datetime.strptime(entry['date'], '%Y-%m-%d')
+            except ValueError:
+                print(f"Error: Entry {i} has invalid date format: {entry['date']}")
                 valid = False
-                continue
 
-            # Check required fields
-            missing_fields = required_fields - set(entry.keys())
-            if missing_fields:
-                print(f"Error: Entry {i} missing required fields: {missing_fields}")
+        # Validate number_removed
+        if entry.get('number_removed') is not None:
+            if not isinstance(entry['number_removed'], (int, type(None))):
+                print(f"Error: Entry {i} number_removed must be integer or null")
                 valid = False
 
-            # Validate date format
-            if entry.get('date'):
-                try:
-                    datetime.strptime(entry['date'], '%Y-%m-%d')
-                except ValueError:
-                    print(f"Error: Entry {i} has invalid date format: {entry['date']}")
-                    valid = False
+        # Validate origin_nationalities
+        if not isinstance(entry.get('origin_nationalities', []), list):
+            print(f"Error: Entry {i} origin_nationalities must be a list")
+            valid = False
+
+    return valid
+
+def shard_entries(root, name, expected):
+    """
+    Yield (label, entry) for the records of one shard, checking it against its manifest entry
+    """
+    path = os.path.join(root, name)
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    problems = []
+    if hashlib.sha256(content).hexdigest() != expected['sha256']:
+        problems.append("content does not match the manifest hash")
+
+    lines = [line for line in content.decode('utf-8').splitlines() if line.strip()]
+    if len(lines) != expected['records']:
+        problems.append(f"has {len(lines)} records, manifest says {expected['records']}")
 
-            # Validate number_removed
-            if entry.get('number_removed') is not None:
-                if not isinstance(entry['number_removed'], (int, type(None))):
-                    print(f"Error: Entry {i} number_removed must be integer or null")
+    for problem in problems:
+        print(f"Error: Shard {name} {problem}")
+        yield name, None
+
+    for number, line in enumerate(lines, 1):
+        label = f"{name}:{number}"
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Error: Entry {label} is not valid JSON: {e}")
+            yield label, None
+            continue
+        if isinstance(entry, dict) and shard_name(entry) != name:
+            print(f"Error: Entry {label} belongs in shard {shard_name(entry)}")
+            yield label, None
+            continue
+        yield label, entry
+
+def validate_shards(root, names=None):
+    """
+    Validate the shards of a sharded dataset (all of them, or only names)
+    """
+    manifest = load_manifest(root)
+    if manifest is None:
+        print(f"Error: Could not read {manifest_path(root)}")
+        return False
+
+    shards = manifest.get('shards', {})
+    valid = True
+    if names is None:
+        names = sorted(shards)
+        # Shard files the manifest does not know about would be silently ignored by readers
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                name = os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, '/')
+                if name.endswith('.jsonl') and name not in shards:
+                    print(f"Error: Shard {name} is not listed in the manifest")
                     valid = False
+        if manifest.get('records') != sum(entry['records'] for entry in shards.values()):
+            print("Error: Manifest record total does not match its shards")
+            valid = False
 
-            # Validate origin_nationalities
-            if not isinstance(entry.get('origin_nationalities', []), list):
-                print(f"Error: Entry {i} origin_nationalities must be a list")
+    for name in names:
+        if name not in shards:
+            # A shard the last write emptied and deleted is fine; one left on disk is not
+            if os.path.exists(os.path.join(root, name)):
+                print(f"Error: Shard {name} is not listed in the manifest")
                 valid = False
+            continue
+        try:
+            entries = list(shard_entries(root, name, shards[name]))
+        except (FileNotFoundError, UnicodeDecodeError) as e:
+            print(f"Error: Could not read shard {name}: {e}")
+            valid = False
+            continue
+        # Entries that failed the shard checks were reported already
+        checked = [(label, entry) for label, entry in entries if entry is not None]
+        if len(checked) != len(entries):
+            valid = False
+        if not validate_entries(checked):
+            valid = False
+
+    return valid
+
+def validate_removals_data(filepath, shards=None):
+    """
+    Validate the structure and content of the dataset
+
+    filepath is either the sharded dataset directory (data/removals), in
+    which case only the given shards are checked when shards is set, or a
+    single JSON file such as an export or the pre-migration removals.json.
+    """
+    if os.path.isdir(filepath):
+        valid = validate_shards(filepath, shards)
+    else:
+        try:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error: Could not read {filepath}: {e}")
+            return False
+
+        if not isinstance(data, list):
+            print("Error: Data must be a list")
+            return False
+
+        valid = validate_entries(enumerate(data))
 
-        if valid:
-            print("Validation passed!")
-        else:
-            print("Validation failed!")
+    if valid:
+        print("Validation passed!")
+    else:
+        print("Validation failed!")
 
-        return valid
+    return valid
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python validate.py <filepath>")
+    if len(sys.argv) < 2:
+        print("Usage: python validate.py <filepath> [shard ...]")
         sys.exit(1)
 
-    validate_removals_data(sys.argv[1])
\ No newline at end of file
+    validate_removals_data(sys.argv[1], sys.argv[2:] or None)
@@ -0,0 +1,19 @@
+from fingerprints import fingerprint_records, record_key
+
+RECORD = {
+    'destination_country': 'Ghana',
+    'number_removed': 14,
+    'origin_nationalities': ['Nigeria'],
+    'data_source': 'Hard G History',
+}
+
+
+def test_estimated_dates_do_not_change_the_fingerprint_or_merge_key():
+    monday = dict(RECORD, date='2026-10-19', date_estimated=True, scraped_at='2026-10-19T02:00:00')
+    tuesday = dict(RECORD, date='2026-10-20', date_estimated=True, scraped_at='2026-10-20T02:00:00')
+    assert fingerprint_records([monday]) == fingerprint_records([tuesday])
+    assert record_key(monday) == record_key(tuesday)
+
+
+def test_parsed_dates_still_change_the_fingerprint():
+    assert fingerprint_records([dict(RECORD, date='2025-10-07')]) != fingerprint_records([dict(RECORD, date='2025-10-08')])
@@ -0,0 +1,31 @@
+from extraction import extract_counts
+from gazetteer import GAZETTEER, origin_nationalities
+
+
+def test_offsets_survive_characters_that_grow_when_lowercased():
+    text = 'İİİİ Iran'
+    entities = GAZETTEER.tag(text)
+    assert [entity.country for entity in entities] == ['Iran']
+    assert text[entities[0].start:entities[0].end] == 'Iran'
+
+
+def test_extract_counts_after_non_ascii_text():
+    assert extract_counts('İİ İstanbul: 12 people sent to Ghana.') == [(12, 'Ghana')]
+
+
+def test_acronyms_only_match_in_capitals():
+    text = 'Car trips took the men to the airport. Us officials said 12 Venezuelans were aboard.'
+    assert origin_nationalities(text, 'PANAMA') == ['Venezuelan']
+    assert origin_nationalities('Flown out by the US and the UK to the CAR.') == ['British', 'Central African']
+
+
+def test_ambiguous_names_do_not_match_in_running_text():
+    text = 'Men from Georgia and Jordan Valley were on board; Chad Wolf signed the order.'
+    assert origin_nationalities(text, 'PANAMA') == []
+    assert origin_nationalities('The Pole at the gate waved 20 Georgians and Poles through.') == ['Georgian', 'Polish']
+
+
+def test_lookup_accepts_whole_ambiguous_names():
+    assert GAZETTEER.lookup('Jordan') == ('Jordan', 'Jordanian')
+    assert GAZETTEER.lookup('DRC') == ('Democratic Republic of the Congo', 'Congolese')
+    assert origin_nationalities('Chadians and Sudanese', 'CHAD') == ['Sudanese']
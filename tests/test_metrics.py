@@ -0,0 +1,30 @@
+import os
+
+from metrics import Registry
+
+
+def test_multiprocess_mode_sums_counters_over_processes(tmp_path):
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ['route'])
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    records = registry.gauge('records', 'Records')
+    registry.enable_multiprocess(str(tmp_path), clear=True)
+    requests.inc(route='/a')
+    records.set(5)
+
+    pid = os.fork()
+    if pid == 0:
+        # The child starts from zero and writes its own file
+        requests.inc(2, route='/a')
+        latency.observe(0.5)
+        records.set(7)
+        registry.flush()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert f'records{{pid="{os.getpid()}"}} 5' in text
+    # The child exited: its gauge is gone, its counts stay
+    assert f'pid="{pid}"' not in text
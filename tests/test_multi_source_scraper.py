@@ -0,0 +1,13 @@
+from multi_source_scraper import MultiSourceScraper
+
+
+def test_parse_date_range_strips_the_dates_label():
+    scraper = MultiSourceScraper()
+    assert scraper.parse_date_range('Date(s): Oct. 7, 2025') == ['2025-10-07']
+    assert scraper.parse_date_range('Date(s): Feb. 12-13, 2025') == ['2025-02-12', '2025-02-13']
+
+
+def test_unparseable_dates_fall_back_to_the_run_day_with_a_flag():
+    fields = MultiSourceScraper().extract_tracker_section('GHANA', 'Date(s): to be confirmed', '14 people')
+    assert fields['used_fallback']
+    assert len(fields['dates']) == 1
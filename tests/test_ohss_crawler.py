@@ -0,0 +1,58 @@
+from ohss_crawler import OHSSCrawler, latest_rows
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    """Serves one report body, honouring If-None-Match"""
+
+    def __init__(self, content, etag):
+        self.content = content
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers or {})
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.content, {'ETag': self.etag})
+
+
+def row(table, month, count, url, country='Mexico'):
+    return {'table': table, 'country': country, 'month': month, 'count': count, 'url': url}
+
+
+def test_latest_rows_keeps_overlapping_months_once_from_the_newest_report():
+    rows = [
+        row('ohss_removals_2025_08.csv', '2025-07', 10, 'https://x/ohss_removals_2025_08.csv'),
+        row('ohss_removals_2025_08.csv', '2025-08', 20, 'https://x/ohss_removals_2025_08.csv'),
+        row('ohss_removals_2025_09.csv', '2025-08', 25, 'https://x/ohss_removals_2025_09.csv'),
+        row('ohss_removals_2025_09.csv', '2025-09', 30, 'https://x/ohss_removals_2025_09.csv'),
+    ]
+    by_month = {r['month']: r['count'] for r in latest_rows(rows)}
+    assert by_month == {'2025-07': 10, '2025-08': 25, '2025-09': 30}
+
+
+def test_download_revalidates_cached_reports(tmp_path):
+    url = 'https://x/ohss_removals.csv'
+    crawler = OHSSCrawler(cache_dir=str(tmp_path))
+    crawler.session = FakeSession(b'Country,Aug 2025\nMexico,1\n', '"v1"')
+
+    first = crawler.download(url)
+    crawler.index[url] = first
+    assert crawler.download(url) is first
+    assert crawler.session.requests[-1]['If-None-Match'] == '"v1"'
+
+    crawler.session.content, crawler.session.etag = b'Country,Aug 2025\nMexico,2\n', '"v2"'
+    revised = crawler.download(url)
+    assert revised['sha256'] != first['sha256']
+    assert (tmp_path / revised['file']).read_bytes() == crawler.session.content
@@ -0,0 +1,95 @@
+import pipeline
+from refresh_schedule import RefreshSchedule
+
+RECORD = {
+    'destination_country': 'Ghana',
+    'date': '2025-09-05',
+    'number_removed': 14,
+    'origin_nationalities': ['Nigeria'],
+    'data_source': 'hard_g_history',
+    'source_urls': ['https://example.org/flights'],
+}
+
+
+def test_quiet_runs_back_off_the_refresh_interval(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    intervals = []
+    for _ in range(3):
+        run = pipeline.update_pipeline()
+        run.stages['scrape'].func = lambda inputs: {'hard_g_history': [dict(RECORD)]}
+        run.run(skip=['snapshot', 'export'])
+        intervals.append(RefreshSchedule.load().sources['hard_g_history']['interval_days'])
+
+    assert intervals == [1.0, 1.5, 2.25]
+
+
+def test_a_repeated_failure_is_resumed_once_then_scraped_again(tmp_path):
+    scrapes = []
+    validations = []
+
+    def scrape(inputs):
+        scrapes.append(len(scrapes))
+        return {'records': len(scrapes)}
+
+    def validate(inputs):
+        validations.append(inputs['scrape'])
+        if len(validations) <= 2:
+            raise pipeline.StageFailed("validation failed")
+        return {'valid': True}
+
+    def stages():
+        return pipeline.Pipeline([
+            pipeline.Stage('scrape', scrape, cache=pipeline.ON_RESUME),
+            pipeline.Stage('validate', validate, ['scrape'], cache=pipeline.NEVER),
+        ], cache_dir=str(tmp_path))
+
+    for _ in range(2):
+        try:
+            stages().run()
+        except pipeline.StageFailed:
+            pass
+    assert len(scrapes) == 1
+
+    stages().run()
+    assert len(scrapes) == 2
+    assert validations[-1] == {'records': 2}
+
+
+def test_old_unfinished_runs_are_not_resumed(tmp_path):
+    from datetime import datetime, timedelta
+
+    run = pipeline.Pipeline([], cache_dir=str(tmp_path))
+    now = datetime.now()
+    recent = {'status': 'failed', 'started': (now - timedelta(hours=1)).isoformat()}
+    assert run.resumable(recent, now)
+    assert not run.resumable(dict(recent, resumed=True), now)
+    assert not run.resumable(dict(recent, started=(now - pipeline.MAX_RESUME_AGE * 2).isoformat()), now)
+
+
+def test_a_failed_write_does_not_log_its_changes_twice(tmp_path, monkeypatch):
+    import shards
+    from changelog import ChangeLog
+
+    monkeypatch.chdir(tmp_path)
+    write_shards = shards.write_shards
+    attempts = []
+
+    def failing_once(records, *args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        return write_shards(records, *args, **kwargs)
+
+    monkeypatch.setattr(shards, 'write_shards', failing_once)
+    scraped = {'hard_g_history': [dict(RECORD)]}
+    for _ in range(2):
+        run = pipeline.update_pipeline()
+        run.stages['scrape'].func = lambda inputs: scraped
+        try:
+            run.run(skip=['snapshot', 'export'])
+        except pipeline.StageFailed:
+            pass
+
+    assert len(attempts) == 2
+    assert [change['op'] for change in ChangeLog.load().changes] == ['insert']
@@ -0,0 +1,19 @@
+from search_index import SearchIndex
+
+RECORD = {
+    'destination_country': 'Ghana',
+    'date': '2025-09-05',
+    'number_removed': 14,
+    'notes': 'Flight with West African nationals',
+    'data_source': 'Hard G History',
+}
+
+
+def test_updated_stores_records_whose_indexed_fields_did_not_change():
+    index = SearchIndex.build([RECORD])
+    revised = dict(RECORD, number_removed=16)
+
+    updated = index.updated([revised])
+    assert updated.search('ghana')[1][0][1]['number_removed'] == 16
+    assert index.search('ghana')[1][0][1]['number_removed'] == 14
+    assert updated.postings['ghana'] == index.postings['ghana']
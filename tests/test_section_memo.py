@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from section_memo import SectionMemo
+
+
+def test_only_fallback_dates_are_stored_as_none(tmp_path):
+    today = [datetime.now().strftime('%Y-%m-%d')]
+    memo = SectionMemo(str(tmp_path / 'source.json'))
+    memo.put('parsed', {'dates': today, 'used_fallback': False})
+    memo.put('fallback', {'dates': today, 'used_fallback': True})
+    memo.save()
+
+    stored = SectionMemo.load('source', memo_dir=str(tmp_path))
+    assert stored.get('parsed')['dates'] == today
+    assert stored.get('fallback')['dates'] is None
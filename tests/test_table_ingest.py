@@ -0,0 +1,20 @@
+import pandas as pd
+
+from table_ingest import frame_to_records, map_columns
+
+
+def test_event_tables_count_one_person_per_row():
+    frame = pd.DataFrame({'Departure Country': ['Ghana', 'Ghana'], 'Removal Date': ['2025-09-05', '2025-09-05'],
+                          'Citizenship Country': ['Nigeria', 'Gambia']})
+    records = frame_to_records(frame, 'Test', 'http://localhost/')
+    assert [(record['destination_country'], record['number_removed']) for record in records] == [('GHANA', 2)]
+
+
+def test_tables_without_a_count_column_are_skipped():
+    frame = pd.DataFrame({'Destination': ['Ghana', 'Rwanda'], 'FY2025 Removals (thousands)': ['1.2', '0.4']})
+    assert frame_to_records(frame, 'Test', 'http://localhost/') == []
+
+
+def test_generic_column_names_are_not_mapped():
+    frame = pd.DataFrame({'Country': ['Mexico'], 'Total': [12], 'N': [3]})
+    assert map_columns(frame) == {}
@@ -0,0 +1,35 @@
+import pytest
+
+from timeseries import TimeSeries
+
+RECORDS = [
+    {'destination_country': 'Ghana', 'date': '2025-09-05', 'number_removed': 14, 'data_source': 'Hard G History'},
+    {'destination_country': 'Ghana', 'date': '2025-09-12', 'number_removed': 10, 'data_source': 'DHS OHSS'},
+    {'destination_country': 'Rwanda', 'date': '2025-09-20', 'number_removed': 7, 'data_source': 'DHS OHSS'},
+]
+
+
+def test_single_filter_keeps_its_group():
+    buckets = TimeSeries.build(RECORDS).query('month', country='ghana')
+    assert [(bucket['events'], bucket['people']) for bucket in buckets] == [(2, 24.0)]
+
+
+@pytest.mark.parametrize('grouping, country, source', [
+    (None, 'Ghana', 'DHS OHSS'),
+    ('source', 'Ghana', None),
+    ('country', None, 'DHS OHSS'),
+])
+def test_filters_that_cannot_all_apply_are_rejected(grouping, country, source):
+    with pytest.raises(ValueError):
+        TimeSeries.build(RECORDS).query('month', grouping, country=country, source=source)
+
+
+def test_estimated_dates_are_counted_as_undated():
+    estimated = dict(RECORDS[0], date='2026-10-18', date_estimated=True)
+    series = TimeSeries.build(RECORDS + [estimated])
+    assert series.undated == 1
+    assert [bucket['start'] for bucket in series.query('month')] == ['2025-09-01']
+
+    # Once the real date is known the record moves into its bucket
+    dated = TimeSeries.build(RECORDS + [estimated]).updated(RECORDS + [dict(estimated, date_estimated=False)])
+    assert dated.undated == 0